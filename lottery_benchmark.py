@@ -0,0 +1,485 @@
+"""
+Benchmarks das análises, gerações, buscas e exportações
+
+Gera históricos sintéticos no formato da Mega Sena (1 mil a 1 milhão de
+concursos, com colunas "Bola1".. ou "Dezena 1"..), mede cada caminho
+público dos gerenciadores e grava os tempos em JSON, para comparar versões
+sem acesso à rede:
+
+    python lotteryapp.py bench --sizes 1000,10000 -o bench.json
+    python lotteryapp.py bench --sizes all --filter stats.
+    python lotteryapp.py bench --baseline bench.json --threshold 1.5
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from lottery_modalities import MEGA_SENA, Modality
+
+DEFAULT_SIZES = (1000, 10000)
+ALL_SIZES = (1000, 10000, 100000, 1000000)
+STYLES = ('Bola', 'Dezena')
+
+# Quantidade de jogos usada pelos casos que recebem uma lista de jogos
+GAMES_PER_CASE = {
+    'analyze': 100,
+    'histogram': 1000,
+    'generate': 1000,
+    'random': 100000,
+    'check': 100000,
+    'export': 10000,
+}
+
+
+def make_history(num_draws: int, style: str = 'Bola', seed: int = 0,
+                 modality: Modality = MEGA_SENA, chunk_size: int = 1 << 16) -> pd.DataFrame:
+    """
+    Histórico sintético de sorteios uniformes
+
+    Args:
+        num_draws: Quantidade de concursos
+        style: 'Bola' (formato compacto de DataManager.build_results_frame:
+            datas datetime64 e dezenas uint8) ou 'Dezena' (planilhas antigas:
+            colunas "Dezena 1".., datas dd/mm/aaaa em texto e dezenas int64)
+        seed: Semente do gerador
+        modality: Modalidade (quantidade e intervalo das dezenas)
+        chunk_size: Concursos sorteados por bloco (limita a memória temporária)
+    Returns:
+        DataFrame com o concurso mais recente primeiro
+    """
+    if style not in STYLES:
+        raise ValueError(f"Estilo inválido: {style} (use {' ou '.join(STYLES)})")
+
+    rng = np.random.default_rng(seed)
+    numbers = np.empty((num_draws, modality.picks), dtype=np.uint8)
+    for start in range(0, num_draws, chunk_size):
+        stop = min(start + chunk_size, num_draws)
+        # As menores chaves aleatórias de cada linha formam uma amostra sem reposição
+        keys = rng.random((stop - start, modality.pool_size), dtype=np.float32)
+        numbers[start:stop] = np.argpartition(keys, modality.picks - 1, axis=1)[:, :modality.picks] + 1
+
+    # As datas ocupam o período real dos sorteios, qualquer que seja a quantidade
+    dates = pd.date_range('1996-03-11', '2025-12-31', periods=max(num_draws, 2))[:num_draws].normalize()
+    order = slice(None, None, -1)
+    frame = {'Concurso': np.arange(1, num_draws + 1, dtype=np.uint32)[order]}
+    if style == 'Bola':
+        frame['Data do Sorteio'] = dates.to_numpy()[order]
+        for ball in range(modality.picks):
+            frame[f'Bola{ball + 1}'] = numbers[order, ball]
+    else:
+        frame['Concurso'] = frame['Concurso'].astype(np.int64)
+        frame['Data do Sorteio'] = dates.strftime('%d/%m/%Y').to_numpy()[order]
+        for ball in range(modality.picks):
+            frame[f'Dezena {ball + 1}'] = numbers[order, ball].astype(np.int64)
+    return pd.DataFrame(frame)
+
+
+class BenchmarkContext:
+    """Dados compartilhados pelos casos de um tamanho e estilo"""
+
+    def __init__(self, history: pd.DataFrame, style: str, work_dir: Optional[str] = None):
+        from manager_game import GameManager
+
+        self.history = history
+        self.style = style
+        self.work_dir = work_dir or tempfile.gettempdir()
+
+        number_columns = history.filter(regex='Bola|Dezena').columns
+        self.draw = [int(n) for n in history[number_columns].iloc[0]]
+        self._games = GameManager().generate_random_games(max(GAMES_PER_CASE.values()), save=False)
+
+    def games(self, kind: str) -> List[List[int]]:
+        return self._games[:GAMES_PER_CASE[kind]]
+
+    def statistics(self):
+        from lottery_statistics import LotteryStatistics
+        return LotteryStatistics(self.history)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.work_dir, name)
+
+
+class BenchmarkCase:
+    """
+    Um caminho medido
+
+    setup recebe o contexto e devolve a função medida; é chamado antes de
+    cada repetição, então caches criados na medição anterior não contam.
+    """
+
+    __slots__ = ('name', 'group', 'setup', 'scales')
+
+    def __init__(self, name: str, group: str, setup: Callable[[BenchmarkContext], Callable[[], object]],
+                 scales: bool = True):
+        """
+        Args:
+            name: Identificador do caso (ex: 'stats.analyze_game')
+            group: analysis, generation, search ou export
+            setup: Prepara e devolve a função medida
+            scales: False quando o custo não depende do histórico (roda uma vez só)
+        """
+        self.name = name
+        self.group = group
+        self.setup = setup
+        self.scales = scales
+
+
+CASES: List[BenchmarkCase] = []
+
+
+def case(name: str, group: str, scales: bool = True):
+    """Registra um caso de benchmark"""
+    def register(setup):
+        CASES.append(BenchmarkCase(name, group, setup, scales))
+        return setup
+    return register
+
+
+# --- Análises ----------------------------------------------------------------
+
+@case('stats.init', 'analysis')
+def _stats_init(ctx):
+    from lottery_statistics import LotteryStatistics
+    return lambda: LotteryStatistics(ctx.history)
+
+
+@case('stats.analyze_decade_groups', 'analysis')
+def _decade_groups(ctx):
+    return ctx.statistics().analyze_decade_groups
+
+
+@case('stats.analyze_parity_combinations', 'analysis')
+def _parity_combinations(ctx):
+    return ctx.statistics().analyze_parity_combinations
+
+
+@case('stats.analyze_parity_groups', 'analysis')
+def _parity_groups(ctx):
+    return ctx.statistics().analyze_parity_groups
+
+
+@case('stats.get_color_palette', 'analysis')
+def _color_palette(ctx):
+    return ctx.statistics().get_color_palette
+
+
+@case('stats.get_summary_statistics', 'analysis')
+def _summary(ctx):
+    return ctx.statistics().get_summary_statistics
+
+
+@case('stats.draw_features', 'analysis')
+def _draw_features(ctx):
+    from lottery_features import draw_features
+    # A tabela fica em cache na instância: mede a construção a partir da matriz de incidência
+    stats = ctx.statistics()
+    incidence, contests = stats._get_draw_matrix(), ctx.history['Concurso'].to_numpy()
+    return lambda: draw_features(incidence, contests, stats.modality, ctx.history.index)
+
+
+@case('stats.randomness_tests', 'analysis')
+def _randomness_tests(ctx):
+    from lottery_randomness import randomness_tests
+    stats = ctx.statistics()
+    return lambda: randomness_tests(stats, resamples=100, seed=0, workers=1)
+
+
+@case('stats.analyze_game', 'analysis')
+def _analyze_game(ctx):
+    stats, game = ctx.statistics(), ctx.games('analyze')[0]
+    return lambda: stats.analyze_game(game)
+
+
+@case('stats.analyze_bet', 'analysis')
+def _analyze_bet(ctx):
+    # Aposta de 15 números: 5005 jogos simples conferidos sem expansão
+    stats = ctx.statistics()
+    bet = list(range(1, stats.modality.pool_size + 1, 4))[:stats.modality.max_picks]
+    return lambda: stats.analyze_bet(bet)
+
+
+@case('stats.nearest_draws_batch', 'analysis')
+def _nearest_draws_batch(ctx):
+    stats, games = ctx.statistics(), ctx.games('analyze')
+    return lambda: stats.nearest_draws_batch(games, k=5)
+
+
+@case('stats.analyze_games', 'analysis')
+def _analyze_games(ctx):
+    stats, games = ctx.statistics(), ctx.games('analyze')
+    return lambda: stats.analyze_games(games)
+
+
+@case('stats.match_histogram', 'analysis')
+def _match_histogram(ctx):
+    stats, games = ctx.statistics(), ctx.games('histogram')
+    return lambda: stats.match_histogram(games)
+
+
+# --- Geração -----------------------------------------------------------------
+
+@case('stats.generate_smart_games', 'generation')
+def _smart_games(ctx):
+    stats, count = ctx.statistics(), GAMES_PER_CASE['generate']
+    return lambda: stats.generate_smart_games(count, [5, 10, 23])
+
+
+@case('strategy.apply_all_filters', 'generation')
+def _all_filters(ctx):
+    from manger_strategy import StrategyManager
+    return StrategyManager(ctx.statistics()).apply_all_filters
+
+
+@case('strategy.generate_strategic_games', 'generation')
+def _strategic_games(ctx):
+    from manger_strategy import StrategyManager
+    strategy, count = StrategyManager(ctx.statistics()), GAMES_PER_CASE['generate']
+    return lambda: strategy.generate_strategic_games(count, [5, 10, 23])
+
+
+@case('strategy.filter_by_features', 'generation')
+def _filter_by_features(ctx):
+    from manger_strategy import StrategyManager
+    strategy, games = StrategyManager(ctx.statistics()), ctx.games('analyze')
+    return lambda: strategy.filter_by_features(games)
+
+
+@case('game.generate_random_games', 'generation', scales=False)
+def _random_games(ctx):
+    from manager_game import GameManager
+    game_manager, count = GameManager(), GAMES_PER_CASE['random']
+    return lambda: game_manager.generate_random_games(count, save=False)
+
+
+@case('game.save_games', 'generation', scales=False)
+def _save_games(ctx):
+    from manager_game import GameManager
+    game_manager, games = GameManager(), ctx.games('random')
+    return lambda: game_manager.save_games(games, 'benchmark')
+
+
+@case('game.check_draw', 'generation', scales=False)
+def _check_draw(ctx):
+    from manager_game import GameManager
+    game_manager = GameManager()
+    game_manager.save_games(ctx.games('check'), 'benchmark')
+    return lambda: game_manager.check_draw(ctx.draw)
+
+
+# --- Busca -------------------------------------------------------------------
+
+def _search_case(search_type: str, value: str):
+    def setup(ctx):
+        from manager_search import SearchManager
+        # A busca converte a coluna de datas no próprio DataFrame: cada repetição usa uma cópia
+        search_manager, history = SearchManager(), ctx.history.copy()
+        return lambda: search_manager.search(history, search_type, value)
+    return setup
+
+
+case('search.contest', 'search')(_search_case('Concurso', '12'))
+case('search.year', 'search')(_search_case('Ano', '2010'))
+case('search.month', 'search')(_search_case('Mês', 'março'))
+
+
+@case('search.features', 'search')
+def _search_features(ctx):
+    from manager_search import SearchManager
+    features = ctx.statistics().draw_features()
+    return lambda: SearchManager().search(ctx.history, 'Característica', 'soma=150-200, primos=2', features)
+
+
+@case('search.format_search_results', 'search')
+def _format_search(ctx):
+    from manager_search import SearchManager
+    return lambda: SearchManager().format_search_results(ctx.history)
+
+
+# --- Importação e exportação -------------------------------------------------
+
+def _check_error(error: Optional[str]) -> None:
+    """Os métodos de exportação devolvem a mensagem de erro em vez de lançar"""
+    if error:
+        raise RuntimeError(error)
+
+
+@case('data.normalize_results', 'export')
+def _normalize(ctx):
+    from manager_data import DataManager
+    return lambda: DataManager.normalize_results(ctx.history)
+
+
+@case('data.export_csv', 'export', scales=False)
+def _export_csv(ctx):
+    from manager_data import DataManager
+    games, path = ctx.games('export'), ctx.path('benchmark.csv')
+    return lambda: _check_error(DataManager().export_results_format(games, path))
+
+
+@case('data.export_xlsx', 'export', scales=False)
+def _export_xlsx(ctx):
+    from manager_data import DataManager
+    games, path = ctx.games('export'), ctx.path('benchmark.xlsx')
+    return lambda: _check_error(DataManager().export_results_format(games, path))
+
+
+@case('data.export_ticket_set', 'export', scales=False)
+def _export_ticket_set(ctx):
+    from manager_data import DataManager
+    games, path = ctx.games('export'), ctx.path('benchmark.ltk')
+    return lambda: DataManager.export_ticket_set(games, path, sort=True)
+
+
+# --- Execução ----------------------------------------------------------------
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(sizes: Iterable[int] = DEFAULT_SIZES, styles: Iterable[str] = STYLES,
+                   repeat: int = 3, name_filter: Optional[str] = None, seed: int = 0,
+                   progress_callback: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Mede os casos registrados em CASES
+
+    Args:
+        sizes: Quantidades de concursos dos históricos sintéticos
+        styles: Variantes das colunas ('Bola', 'Dezena')
+        repeat: Repetições por caso (o relatório guarda o melhor tempo e a mediana)
+        name_filter: Só mede os casos cujo nome contém este texto
+        seed: Semente dos históricos sintéticos
+        progress_callback: Chamada com o nome de cada medição
+    Returns:
+        Dicionário serializável em JSON com 'meta' e 'results'
+    """
+    cases = [c for c in CASES if not name_filter or name_filter in c.name]
+    results = []
+    measured_once = set()
+
+    with tempfile.TemporaryDirectory(prefix='lottery-bench-') as work_dir:
+        for size in sizes:
+            for style in styles:
+                started = time.perf_counter()
+                ctx = BenchmarkContext(make_history(size, style, seed), style, work_dir)
+                if progress_callback:
+                    progress_callback(f"histórico {style} com {size} concursos ({time.perf_counter() - started:.2f}s)")
+
+                for bench in cases:
+                    if not bench.scales:
+                        if bench.name in measured_once:
+                            continue
+                        measured_once.add(bench.name)
+
+                    timings = []
+                    for _ in range(max(1, repeat)):
+                        func = bench.setup(ctx)
+                        start = time.perf_counter()
+                        func()
+                        timings.append(time.perf_counter() - start)
+
+                    results.append({
+                        'case': bench.name,
+                        'group': bench.group,
+                        'draws': size if bench.scales else None,
+                        'style': style if bench.scales else None,
+                        'best': min(timings),
+                        'median': statistics.median(timings),
+                        'runs': len(timings),
+                    })
+                    if progress_callback:
+                        progress_callback(f"{_result_key(results[-1])}: {min(timings) * 1000:.1f} ms")
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'seed': seed,
+            'games': GAMES_PER_CASE,
+        },
+        'results': results,
+    }
+
+
+def _result_key(result: Dict) -> str:
+    if result['draws'] is None:
+        return result['case']
+    return f"{result['case']}[{result['style']}/{result['draws']}]"
+
+
+def save_report(report: Dict, file_path: str) -> None:
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+def load_report(file_path: str) -> Dict:
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float = 1.5,
+                    min_seconds: float = 0.005) -> List[Dict]:
+    """
+    Compara dois relatórios de run_benchmarks
+
+    Args:
+        baseline: Relatório de referência
+        current: Relatório atual
+        threshold: Razão atual/referência (melhor tempo) acima da qual o caso regrediu
+        min_seconds: Casos mais rápidos que isso nas duas medições são ignorados (ruído)
+    Returns:
+        Lista de regressões com 'key', 'baseline', 'current' e 'ratio', da pior para a melhor
+    """
+    reference = {_result_key(result): result['best'] for result in baseline.get('results', [])}
+    regressions = []
+    for result in current.get('results', []):
+        key = _result_key(result)
+        before = reference.get(key)
+        if before is None or max(before, result['best']) < min_seconds:
+            continue
+        ratio = result['best'] / max(before, 1e-9)
+        if ratio > threshold:
+            regressions.append({'key': key, 'baseline': before, 'current': result['best'], 'ratio': ratio})
+    return sorted(regressions, key=lambda r: -r['ratio'])
+
+
+def format_report(report: Dict, baseline: Optional[Dict] = None) -> str:
+    """Tabela de texto com os tempos (e a razão em relação à referência, se houver)"""
+    reference = {_result_key(result): result['best'] for result in (baseline or {}).get('results', [])}
+    lines = [f"{'caso':<60} {'melhor (ms)':>12} {'mediana (ms)':>13}" + (f" {'razão':>7}" if reference else "")]
+    for result in report['results']:
+        key = _result_key(result)
+        line = f"{key:<60} {result['best'] * 1000:>12.2f} {result['median'] * 1000:>13.2f}"
+        if key in reference:
+            line += f" {result['best'] / max(reference[key], 1e-9):>7.2f}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from lottery_cli import main as cli_main
+    return cli_main(['bench', *(sys.argv[1:] if argv is None else argv)])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
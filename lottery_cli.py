@@ -0,0 +1,572 @@
+"""
+Interface de linha de comando (sem Tk) para geração e análise de jogos
+
+Uso:
+    python lotteryapp.py update
+    python lotteryapp.py generate -n 1000 --mode smart --favorites "5, 10, 23" -o jogos.txt
+    python lotteryapp.py analyze jogos.txt
+    python lotteryapp.py backtest jogos.txt --details
+    python lotteryapp.py export jogos.txt -o simulados.xlsx
+    python lotteryapp.py export jogos.txt -o jogos.ltk --sort
+    python lotteryapp.py check jogos.ltk
+    python lotteryapp.py stats
+    python lotteryapp.py randomness --resamples 5000 --seed 1 --workers 4
+    python lotteryapp.py bet "01 05 11 17 23 29 36 42 48 55" --details
+    python lotteryapp.py update --modality lotofacil
+    python lotteryapp.py generate --modality quina -n 10 --mode smart
+    python lotteryapp.py generate -n 1000000 --seed 42 --workers 4 -o jogos.txt
+    python lotteryapp.py generate -n 100000 --mode weighted --window 100 --cold
+    python lotteryapp.py generate -n 500 --diverse 1000000 --max-overlap 2
+    python lotteryapp.py serve --port 8765
+    python lotteryapp.py loadtest --path /games/smart -n 2000 -c 50
+    python lotteryapp.py bench --sizes 1000,10000 -o bench.json --baseline anterior.json
+    python lotteryapp.py --metrics --profile backtest jogos.txt
+    python lotteryapp.py memory --generate 1000000
+
+Os comandos usam os resultados em cache (gravados pela importação no app ou
+pelo comando update) ou o arquivo indicado em --results.
+"""
+import argparse
+import re
+import sys
+from contextlib import contextmanager
+from itertools import chain
+from typing import Iterator, List, Optional, TextIO
+
+from lottery_modalities import MODALITIES, get_modality
+from manager_metrics import METRICS
+from manager_data import DataManager
+from manager_game import GameManager
+
+
+@contextmanager
+def open_output(file_path: Optional[str]) -> Iterator[TextIO]:
+    """Abre o arquivo de saída, ou usa stdout quando não informado"""
+    if file_path in (None, '-'):
+        yield sys.stdout
+    else:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            yield file
+
+
+def load_statistics(results_path: Optional[str], modality=None):
+    """Carrega os resultados e cria o LotteryStatistics"""
+    from lottery_statistics import LotteryStatistics
+
+    results_df, error = DataManager.load_results(results_path, modality)
+    if error:
+        raise RuntimeError(f"Erro ao carregar resultados: {error}")
+    return LotteryStatistics(results_df, modality)
+
+
+def cmd_update(args) -> int:
+    """Baixa os resultados e atualiza o cache"""
+    def progress(received, total):
+        size = f"/{total // 1024}" if total else ""
+        print(f"\rBaixando resultados... {received // 1024}{size} KB", end='', file=sys.stderr)
+    
+    modality = get_modality(args.modality)
+    results_df, error = DataManager.download_results(progress_callback=progress, modality=modality)
+    print(file=sys.stderr)
+    if error:
+        raise RuntimeError(f"Erro ao importar resultados: {error}")
+    target = DataManager.CACHE_PATH if modality.key == 'megasena' else DataManager.workbook_path(modality)
+    print(f"{len(results_df)} concursos salvos em {target}", file=sys.stderr)
+    return 0
+
+
+def cmd_generate(args) -> int:
+    """Gera jogos e grava um por linha"""
+    modality = get_modality(args.modality)
+    game_manager = GameManager(modality=modality)
+    favorite_numbers = game_manager.parse_favorite_numbers(args.favorites or "")
+
+    if args.seed is not None or args.workers is not None or args.diverse:
+        return generate_seeded(args, modality, favorite_numbers)
+
+    if args.mode == 'random':
+        generate = lambda count: game_manager.generate_random_games(count, save=False)
+    else:
+        stats_manager = load_statistics(args.results, modality)
+        if args.mode == 'smart':
+            generate = lambda count: stats_manager.generate_smart_games(count, favorite_numbers)
+        elif args.mode == 'weighted':
+            generate = lambda count: stats_manager.generate_weighted_games(
+                count, favorite_numbers, **weighting_options(args)).tolist()
+        else:
+            from manger_strategy import StrategyManager
+            strategy_manager = StrategyManager(stats_manager)
+            generate = lambda count: strategy_manager.generate_strategic_games(count, favorite_numbers)
+
+    # Os jogos são gerados e gravados em lotes para manter a memória constante
+    remaining = args.num_games
+    with open_output(args.output) as output:
+        while remaining > 0:
+            games = generate(min(args.chunk_size, remaining))
+            if not games:
+                break
+            output.write("".join(DataManager.format_game_for_display(game) + "\n" for game in games))
+            remaining -= len(games)
+    return 0
+
+
+def weighting_options(args) -> dict:
+    """Opções do modo weighted (ver LotteryStatistics.generate_weighted_games)"""
+    return {'window': args.window, 'temperature': args.temperature, 'cold': args.cold, 'method': args.method}
+
+
+def generate_seeded(args, modality, favorite_numbers: List[int]) -> int:
+    """
+    generate com --seed/--workers/--diverse: blocos reproduzíveis gerados em
+    vários processos e, com --diverse, a carteira mais diversificada entre eles
+    """
+    from lottery_combinations import rank_games, unrank_games
+    from lottery_generation import generate_ranks
+
+    results_df = None
+    if args.mode != 'random':
+        results_df = load_statistics(args.results, modality).results_data
+
+    def progress(done, total):
+        print(f"\rGerando jogos... {done}/{total}", end='', file=sys.stderr)
+
+    ranks = generate_ranks(args.diverse or args.num_games, args.seed, args.mode, favorite_numbers, results_df,
+                           modality, args.workers, progress_callback=progress,
+                           weighting=weighting_options(args))
+    print(file=sys.stderr)
+
+    if args.diverse:
+        from lottery_portfolio import format_portfolio_summary, select_portfolio
+
+        def progress(done, total):
+            print(f"\rSelecionando jogos... {done}/{total}", end='', file=sys.stderr)
+
+        portfolio = select_portfolio(unrank_games(ranks, modality.picks, modality.pool_size), args.num_games,
+                                     modality.pool_size, max_overlap=args.max_overlap, progress_callback=progress)
+        print(file=sys.stderr)
+        print(format_portfolio_summary(portfolio), end='', file=sys.stderr)
+        ranks = rank_games(portfolio['games'], modality.pool_size)
+
+    # Os índices ocupam 4 bytes por jogo; a conversão para números é feita em lotes
+    with open_output(args.output) as output:
+        for start in range(0, len(ranks), args.chunk_size):
+            games = unrank_games(ranks[start:start + args.chunk_size], modality.picks, modality.pool_size)
+            output.write("".join(DataManager.format_game_for_display(game) + "\n" for game in games.tolist()))
+    if len(ranks) < args.num_games:
+        print(f"Apenas {len(ranks)} jogos distintos gerados", file=sys.stderr)
+    return 0
+
+
+def cmd_analyze(args) -> int:
+    """Analisa cada jogo do arquivo contra o histórico"""
+    modality = get_modality(args.modality)
+    stats_manager = load_statistics(args.results, modality)
+
+    with open_output(args.output) as output:
+        output.write(f"jogo\tsorteado_em\trecentes\tconcursos_{args.min_matches}+\n")
+        for games in DataManager.read_games(args.tickets, args.chunk_size, modality):
+            analyses = stats_manager.analyze_games(games, min_matches=args.min_matches, nearest=args.nearest)
+            lines = []
+            for game, analysis in zip(games, analyses):
+                lines.append("\t".join([
+                    DataManager.format_game_for_display(game),
+                    str(analysis['last_drawn_date'] or '-'),
+                    ", ".join(f"{n:02d}" for n in analysis['matches_recent']) or '-',
+                    ", ".join(str(c) for c in analysis['matching_numbers']) or '-',
+                ]) + "\n")
+            output.write("".join(lines))
+    return 0
+
+
+def cmd_backtest(args) -> int:
+    """Conta os acertos premiados (quadras, quinas e senas na Mega Sena) de cada jogo em todo o histórico"""
+    modality = get_modality(args.modality)
+    stats_manager = load_statistics(args.results, modality)
+    # Faixas da menor para a maior, no plural (quadras, quinas, senas)
+    tiers = [(k, name if name.endswith('s') else name + 's') for k, name in sorted(modality.prize_tiers.items())]
+    totals = [0] * (modality.picks + 1)
+    num_tickets = 0
+
+    with open_output(args.output) as output:
+        if args.details:
+            output.write("jogo\t" + "\t".join(name.lower() for _, name in tiers) + "\n")
+        for games in DataManager.read_games(args.tickets, args.chunk_size, modality):
+            histogram = stats_manager.match_histogram(games)
+            num_tickets += len(games)
+            for k in range(len(totals)):
+                totals[k] += int(histogram[:, k].sum())
+            if args.details:
+                output.write("".join(
+                    DataManager.format_game_for_display(game) + "\t"
+                    + "\t".join(str(row[k]) for k, _ in tiers) + "\n"
+                    for game, row in zip(games, histogram.tolist())
+                ))
+
+        output.write(
+            f"Jogos: {num_tickets}\n"
+            f"Concursos: {len(stats_manager.results_data)}\n"
+            + "".join(f"{name}: {totals[k]}\n" for k, name in tiers)
+        )
+    return 0
+
+
+def cmd_export(args) -> int:
+    """Exporta os jogos do arquivo no formato dos resultados oficiais"""
+    # Os jogos são lidos e gravados em fluxo, sem carregar o arquivo inteiro
+    games = chain.from_iterable(DataManager.read_games(args.tickets, args.chunk_size))
+    progress = lambda done, total: print(f"\r{done} jogos exportados", end='', file=sys.stderr)
+
+    if args.output.lower().endswith(DataManager.TICKET_SET_EXTENSION):
+        DataManager.export_ticket_set(games, args.output, sort=args.sort, progress_callback=progress)
+        print(file=sys.stderr)
+        return 0
+    
+    error = DataManager().export_results_format(games, args.output, progress_callback=progress)
+    print(file=sys.stderr)
+    if error:
+        raise RuntimeError(f"Erro ao exportar: {error}")
+    return 0
+
+
+def cmd_check(args) -> int:
+    """Confere um conjunto de jogos (.ltk) contra o último sorteio (ou o informado)"""
+    if args.draw:
+        draw_numbers = GameManager.parse_game_line(args.draw)
+        if not draw_numbers:
+            raise ValueError(f"Sorteio inválido: {args.draw}")
+        title = "Sorteio informado"
+    else:
+        stats_manager = load_statistics(args.results)
+        results_df = stats_manager.results_data
+        latest = results_df.loc[results_df['Concurso'].idxmax()]
+        draw_numbers = [int(latest[col]) for col in results_df.filter(regex='Bola|Dezena').columns[:6]]
+        title = f"Concurso {latest['Concurso']}"
+    
+    summary = DataManager.check_ticket_set(args.tickets, draw_numbers)
+    hits = summary['hits']
+    with open_output(args.output) as output:
+        output.write(
+            f"{title}: {DataManager.format_game_for_display(draw_numbers)}\n"
+            f"Jogos: {summary['tickets']}\n"
+            f"Quadras: {hits[4]}\n"
+            f"Quinas: {hits[5]}\n"
+            f"Senas: {hits[6]}\n"
+        )
+        for numbers, matches in summary['winners']:
+            output.write(f"{DataManager.format_game_for_display(numbers)}\t{matches}\n")
+    return 0
+
+
+def cmd_bet(args) -> int:
+    """Analisa uma aposta múltipla contra o histórico, sem expandir os jogos simples"""
+    modality = get_modality(args.modality)
+    numbers = [int(token) for token in re.findall(r'\d+', args.numbers)]
+    if not modality.is_valid_bet(numbers):
+        raise ValueError(f"Aposta inválida: {args.numbers} (use de {modality.picks} a {modality.max_picks} "
+                         f"números entre 1 e {modality.pool_size})")
+    stats_manager = load_statistics(args.results, modality)
+    analysis = stats_manager.analyze_bet(numbers)
+
+    tiers = modality.prize_tiers
+    with open_output(args.output) as output:
+        output.write(
+            f"Aposta: {DataManager.format_game_for_display(sorted(numbers))}\n"
+            f"Jogos simples: {analysis['combinations']}\n"
+            f"Custo: R$ {analysis['cost']:.2f}\n"
+            f"Já sorteada: {'sim' if analysis['was_drawn'] else 'não'}\n"
+        )
+        for matches, name in tiers.items():
+            plural = name if name.endswith('s') else name + 's'
+            output.write(f"{plural} no histórico: {analysis['hits'][matches]}\n")
+        if args.details:
+            output.write("concurso\tdata\tacertos\t" + "\t".join(tiers.values()) + "\n")
+            for prize in analysis['prizes']:
+                output.write("\t".join([str(prize['contest']), prize['date'], str(prize['overlap'])]
+                                        + [str(prize['hits'].get(matches, 0)) for matches in tiers]) + "\n")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    """Imprime o resumo das estatísticas"""
+    stats_manager = load_statistics(args.results, get_modality(args.modality))
+    with open_output(args.output) as output:
+        output.write(stats_manager.get_summary_statistics())
+    return 0
+
+
+def cmd_randomness(args) -> int:
+    """Testa se o histórico (e os padrões quentes/recentes) se distingue do acaso"""
+    from lottery_randomness import format_randomness_report, randomness_tests
+
+    stats_manager = load_statistics(args.results, get_modality(args.modality))
+
+    def progress(done, total):
+        print(f"\rReamostrando... {done}/{total}", end='', file=sys.stderr)
+
+    tests = [test.strip() for test in args.tests.split(',')] if args.tests else None
+    report = randomness_tests(stats_manager, args.resamples, args.seed, args.workers, tests,
+                              hot_count=args.hot, recent_draws=args.recent, progress_callback=progress)
+    print(file=sys.stderr)
+    with open_output(args.output) as output:
+        output.write(format_randomness_report(report))
+    return 0
+
+
+def cmd_memory(args) -> int:
+    """Mostra a memória das estruturas carregadas (e das alocações de uma geração)"""
+    from manager_memory import AllocationTracker, collect_memory, format_memory_report
+
+    stats_manager = load_statistics(args.results) if args.results or args.mode == 'smart' else None
+    if stats_manager is None:
+        # Sem --results, usa o banco local se os resultados já foram importados
+        results_df, error = DataManager.load_results()
+        if not error:
+            from lottery_statistics import LotteryStatistics
+            stats_manager = LotteryStatistics(results_df)
+    if stats_manager is not None:
+        # Preenche os caches usados pela análise, que também entram no relatório
+        stats_manager.analyze_games([[1, 2, 3, 4, 5, 6]])
+        stats_manager.analyze_decade_groups()
+    
+    game_manager = GameManager()
+    tracker = None
+    if args.generate:
+        with AllocationTracker() as tracker:
+            remaining = args.generate
+            while remaining > 0:
+                count = min(args.chunk_size, remaining)
+                if args.mode == 'smart':
+                    games = stats_manager.generate_smart_games(count, [])
+                else:
+                    games = game_manager.generate_random_games(count, save=False)
+                if not games:
+                    break
+                game_manager.save_games(games, 'memoria')
+                remaining -= len(games)
+            game_manager.games_history.masks()
+    
+    with open_output(args.output) as output:
+        output.write(format_memory_report(collect_memory(stats_manager, game_manager), tracker))
+    return 0
+
+
+def cmd_serve(args) -> int:
+    """Inicia o serviço HTTP local"""
+    import asyncio
+    from lottery_server import LotteryServer
+
+    server = LotteryServer(args.results, host=args.host, port=args.port, workers=args.workers)
+    print(f"Servindo em http://{args.host}:{args.port} ({server.workers} processos)", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_loadtest(args) -> int:
+    """Mede vazão e latência do serviço HTTP local"""
+    import asyncio
+    import json
+    from lottery_server import run_load_test
+
+    if args.path == '/analyze':
+        body = {'games': [sorted(game) for game in GameManager().generate_random_games(args.games, save=False)]}
+    else:
+        body = {'num_games': args.games, 'favorites': GameManager().parse_favorite_numbers(args.favorites or "")}
+
+    result = asyncio.run(run_load_test(args.host, args.port, args.path, body, args.requests, args.concurrency))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def cmd_bench(args) -> int:
+    """Mede os caminhos principais com históricos sintéticos e compara com uma referência"""
+    import lottery_benchmark as bench
+
+    if args.sizes == 'all':
+        sizes = bench.ALL_SIZES
+    else:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    styles = [style.strip() for style in args.styles.split(',') if style.strip()]
+    baseline = bench.load_report(args.baseline) if args.baseline else None
+    
+    report = bench.run_benchmarks(sizes, styles, repeat=args.repeat, name_filter=args.filter,
+                                  progress_callback=lambda message: print(message, file=sys.stderr))
+    if args.output:
+        bench.save_report(report, args.output)
+    else:
+        sys.stdout.write(bench.format_report(report, baseline))
+    
+    if baseline is None:
+        return 0
+    regressions = bench.compare_reports(baseline, report, threshold=args.threshold)
+    for regression in regressions:
+        print(f"Regressão: {regression['key']} {regression['baseline'] * 1000:.2f} ms -> "
+              f"{regression['current'] * 1000:.2f} ms ({regression['ratio']:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lotteryapp",
+        description="Gerador e analisador de jogos da Mega Sena (modo sem interface)"
+    )
+    parser.add_argument('--metrics', action='store_true',
+                        help="Mede as operações e imprime p50/p95 por operação no stderr ao terminar")
+    parser.add_argument('--profile', action='store_true',
+                        help="Com --metrics, inclui o cProfile e a memória (tracemalloc) do comando")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(subparser, tickets: bool = False):
+        subparser.add_argument('--results', help="Arquivo de resultados (.xlsx, .csv, .pkl ou .db); padrão: banco local")
+        subparser.add_argument('-o', '--output', help="Arquivo de saída (padrão: stdout)")
+        subparser.add_argument('--chunk-size', type=int, default=10000, help="Jogos processados por lote")
+        if tickets:
+            subparser.add_argument('tickets', nargs='?', default='-', help="Arquivo com um jogo por linha (padrão: stdin)")
+
+    def add_modality(subparser):
+        subparser.add_argument('--modality', choices=list(MODALITIES), default='megasena',
+                               help="Modalidade da loteria (padrão: megasena)")
+
+    update = subparsers.add_parser('update', help="Baixa os resultados e atualiza o cache")
+    add_modality(update)
+    update.set_defaults(func=cmd_update)
+
+    generate = subparsers.add_parser('generate', help="Gera jogos")
+    add_common(generate)
+    add_modality(generate)
+    generate.add_argument('-n', '--num-games', type=int, default=1, help="Quantidade de jogos")
+    generate.add_argument('--mode', choices=['random', 'smart', 'strategic', 'weighted'], default='random',
+                          help="random: aleatórios; smart: gerar com favoritos; strategic: gerar estratégico; "
+                               "weighted: números sorteados com peso pela frequência")
+    generate.add_argument('--window', type=int, help="weighted: usar só os últimos N concursos na frequência")
+    generate.add_argument('--temperature', type=float, default=1.0,
+                          help="weighted: maior aproxima do uniforme, menor acentua a frequência (padrão: 1)")
+    generate.add_argument('--cold', action='store_true', help="weighted: favorecer os números menos sorteados")
+    generate.add_argument('--method', choices=['gumbel', 'alias'], default='gumbel',
+                          help="weighted: Gumbel-top-k ou tabela de alias (padrão: gumbel)")
+    generate.add_argument('--favorites', help="Números favoritos, ex: \"5, 10, 23\"")
+    generate.add_argument('--seed', type=int,
+                          help="Semente: a mesma semente gera os mesmos jogos, com qualquer --workers")
+    generate.add_argument('--workers', type=int,
+                          help="Processos usados na geração (padrão com --seed: número de CPUs)")
+    generate.add_argument('--diverse', type=int, metavar='CANDIDATOS',
+                          help="Gera CANDIDATOS jogos e escolhe os -n que cobrem mais pares e trios distintos")
+    generate.add_argument('--max-overlap', type=int,
+                          help="--diverse: máximo de números em comum entre dois jogos escolhidos")
+    generate.set_defaults(func=cmd_generate)
+
+    analyze = subparsers.add_parser('analyze', help="Analisa jogos contra o histórico")
+    add_common(analyze, tickets=True)
+    add_modality(analyze)
+    analyze.add_argument('--min-matches', type=int, default=4, help="Acertos mínimos para listar um concurso")
+    analyze.add_argument('--nearest', type=int,
+                         help="Lista só os N concursos com mais acertos de cada jogo (empate: o mais recente)")
+    analyze.set_defaults(func=cmd_analyze)
+
+    backtest = subparsers.add_parser('backtest', help="Conta quadras, quinas e senas no histórico")
+    add_common(backtest, tickets=True)
+    add_modality(backtest)
+    backtest.add_argument('--details', action='store_true', help="Mostra o resultado de cada jogo")
+    backtest.set_defaults(func=cmd_backtest)
+
+    export = subparsers.add_parser('export', help="Exporta jogos no formato dos resultados (.xlsx, .csv ou .parquet) "
+                                                  "ou como conjunto binário (.ltk)")
+    add_common(export, tickets=True)
+    export.add_argument('--sort', action='store_true', help="Ordena os jogos do arquivo .ltk (permite busca binária)")
+    export.set_defaults(func=cmd_export)
+    
+    check = subparsers.add_parser('check', help="Confere um conjunto de jogos (.ltk) contra um sorteio")
+    add_common(check)
+    check.add_argument('tickets', help="Arquivo .ltk")
+    check.add_argument('--draw', help="Números sorteados, ex: \"5, 10, 23, 34, 45, 56\" (padrão: último concurso)")
+    check.set_defaults(func=cmd_check)
+
+    bet = subparsers.add_parser('bet', help="Analisa uma aposta múltipla (ex: 7 a 15 números) contra o histórico")
+    add_common(bet)
+    add_modality(bet)
+    bet.add_argument('numbers', help="Números da aposta, ex: \"5, 10, 23, 34, 45, 56, 60\"")
+    bet.add_argument('--details', action='store_true', help="Lista os concursos premiados")
+    bet.set_defaults(func=cmd_bet)
+
+    stats = subparsers.add_parser('stats', help="Mostra o resumo das estatísticas")
+    add_common(stats)
+    add_modality(stats)
+    stats.set_defaults(func=cmd_stats)
+
+    randomness = subparsers.add_parser('randomness', help="Testes de aleatoriedade sobre o histórico de sorteios")
+    add_common(randomness)
+    add_modality(randomness)
+    randomness.add_argument('--resamples', type=int, default=2000, help="Reamostras por teste (padrão: 2000)")
+    randomness.add_argument('--seed', type=int, help="Semente: o mesmo resultado com qualquer --workers")
+    randomness.add_argument('--workers', type=int, help="Processos usados nas reamostras (padrão: número de CPUs)")
+    randomness.add_argument('--tests', help="Testes separados por vírgula (padrão: todos), ex: uniformity,hot")
+    randomness.add_argument('--hot', type=int, default=30, help="hot: quantidade de números mais frequentes")
+    randomness.add_argument('--recent', type=int, default=5, help="recent: concursos considerados recentes")
+    randomness.set_defaults(func=cmd_randomness)
+
+    memory = subparsers.add_parser('memory', help="Relatório de memória das estruturas carregadas")
+    add_common(memory)
+    memory.add_argument('--generate', type=int, default=0,
+                        help="Gera (e guarda no histórico) esta quantidade de jogos, medindo as alocações")
+    memory.add_argument('--mode', choices=['random', 'smart'], default='random', help="Geração usada com --generate")
+    memory.set_defaults(func=cmd_memory)
+
+    serve = subparsers.add_parser('serve', help="Inicia o serviço HTTP/JSON local")
+    serve.add_argument('--results', help="Arquivo de resultados (.xlsx, .csv, .pkl ou .db); padrão: banco local")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--workers', type=int, help="Processos de trabalho (padrão: número de CPUs)")
+    serve.set_defaults(func=cmd_serve)
+
+    loadtest = subparsers.add_parser('loadtest', help="Teste de carga contra o serviço local")
+    loadtest.add_argument('--host', default='127.0.0.1')
+    loadtest.add_argument('--port', type=int, default=8765)
+    loadtest.add_argument('--path', default='/games/smart',
+                          choices=['/games/smart', '/games/strategic', '/analyze'])
+    loadtest.add_argument('-n', '--requests', type=int, default=1000, help="Total de pedidos")
+    loadtest.add_argument('-c', '--concurrency', type=int, default=50, help="Conexões simultâneas")
+    loadtest.add_argument('--games', type=int, default=1, help="Jogos por pedido")
+    loadtest.add_argument('--favorites', help="Números favoritos, ex: \"5, 10, 23\"")
+    loadtest.set_defaults(func=cmd_loadtest)
+
+    bench = subparsers.add_parser('bench', help="Benchmarks com históricos sintéticos (sem rede)")
+    bench.add_argument('--sizes', default='1000,10000',
+                       help="Concursos dos históricos, separados por vírgula, ou 'all' (1000 a 1000000)")
+    bench.add_argument('--styles', default='Bola,Dezena', help="Variantes das colunas: Bola, Dezena")
+    bench.add_argument('--repeat', type=int, default=3, help="Repetições por caso")
+    bench.add_argument('--filter', help="Só mede os casos cujo nome contém este texto (ex: stats.)")
+    bench.add_argument('-o', '--output', help="Grava o relatório JSON (padrão: tabela no stdout)")
+    bench.add_argument('--baseline', help="Relatório JSON de referência para detectar regressões")
+    bench.add_argument('--threshold', type=float, default=1.5,
+                       help="Razão de tempo acima da qual um caso regrediu (padrão: 1.5)")
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'export' and not getattr(args, 'output', None):
+        print("Erro: informe o arquivo de saída com -o", file=sys.stderr)
+        return 2
+    if args.metrics:
+        METRICS.enable(True, profiling=args.profile)
+    try:
+        with METRICS.capture(f"cli.{args.command}"):
+            return args.func(args)
+    except BrokenPipeError:
+        # Saída redirecionada para um comando que encerrou antes (ex: head)
+        sys.stderr.close()
+        return 0
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics:
+            print(METRICS.report(include_profiles=args.profile), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
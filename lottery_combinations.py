@@ -0,0 +1,250 @@
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+from typing import List, Sequence, Tuple
+
+# Mega Sena: 6 números entre 1 e 60
+POOL_SIZE = 60
+PICKS = 6
+
+
+@lru_cache(maxsize=None)
+def binomial_table(pool_size: int = POOL_SIZE, picks: int = PICKS) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Tabela de coeficientes binomiais por coluna
+
+    Returns:
+        table[k][n] = C(n, k) para k em 0..picks e n em 0..pool_size
+    """
+    return tuple(tuple(comb(n, k) for n in range(pool_size + 1)) for k in range(picks + 1))
+
+
+def total_combinations(pool_size: int = POOL_SIZE, picks: int = PICKS) -> int:
+    """Quantidade de jogos possíveis (C(pool_size, picks))"""
+    return comb(pool_size, picks)
+
+
+def rank_game(numbers: Sequence[int], pool_size: int = POOL_SIZE) -> int:
+    """
+    Retorna o índice do jogo na ordem colexicográfica (sistema combinatório)
+
+    Cada jogo de k números corresponde a um único inteiro em
+    [0, C(pool_size, k)), o que permite guardar um jogo da Mega Sena em 4 bytes.
+    """
+    table = binomial_table(pool_size, len(numbers))
+    return sum(table[i + 1][n - 1] for i, n in enumerate(sorted(numbers)))
+
+
+def unrank_game(rank: int, picks: int = PICKS, pool_size: int = POOL_SIZE) -> List[int]:
+    """Operação inversa de rank_game"""
+    table = binomial_table(pool_size, picks)
+    numbers = []
+    for k in range(picks, 0, -1):
+        # Maior c com C(c, k) <= rank
+        c = bisect_right(table[k], rank) - 1
+        rank -= table[k][c]
+        numbers.append(c + 1)
+    return numbers[::-1]
+
+
+def game_matrix(games, dtype=None, picks: int = PICKS):
+    """
+    Matriz (n, k) a partir de uma matriz ou lista de jogos
+
+    Sem jogos devolve uma matriz (0, k) (k das colunas recebidas, ou picks),
+    então as funções vetorizadas não precisam tratar a entrada vazia.
+    """
+    import numpy as np
+
+    games = np.asarray(games, dtype=dtype)
+    if len(games) == 0:
+        return np.empty((0, games.shape[1] if games.ndim == 2 else picks), dtype=games.dtype)
+    return games.reshape(len(games), -1)
+
+
+def rank_games(games, pool_size: int = POOL_SIZE):
+    """
+    Versão vetorizada de rank_game
+
+    Args:
+        games: Matriz (n, k) ou lista de jogos com k números
+    Returns:
+        Array uint32 (ou uint64 se não couber) com o índice de cada jogo
+    """
+    import numpy as np
+
+    games = np.sort(game_matrix(games, np.int64), axis=1)
+    picks = games.shape[1]
+    table = np.array(binomial_table(pool_size, picks), dtype=np.int64)
+    ranks = table[np.arange(1, picks + 1), games - 1].sum(axis=1)
+    dtype = np.uint32 if total_combinations(pool_size, picks) <= 2 ** 32 else np.uint64
+    return ranks.astype(dtype)
+
+
+def unrank_games(ranks, picks: int = PICKS, pool_size: int = POOL_SIZE):
+    """
+    Versão vetorizada de unrank_game
+
+    Returns:
+        Matriz uint8 (n, picks) com os números de cada jogo em ordem crescente
+    """
+    import numpy as np
+
+    remaining = np.asarray(ranks, dtype=np.int64).copy()
+    table = np.array(binomial_table(pool_size, picks), dtype=np.int64)
+    games = np.empty((len(remaining), picks), dtype=np.uint8)
+    for k in range(picks, 0, -1):
+        c = np.searchsorted(table[k], remaining, side='right') - 1
+        remaining -= table[k][c]
+        games[:, k - 1] = c + 1
+    return games
+
+
+def bet_hits(bet_size: int, overlap: int, picks: int = PICKS, matches: int = PICKS) -> int:
+    """
+    Jogos simples de uma aposta múltipla com exatamente matches acertos
+
+    Uma aposta de bet_size números que contém overlap números do sorteio
+    equivale a C(bet_size, picks) jogos simples; destes, têm matches acertos
+    os que escolhem matches entre os overlap sorteados e o restante entre os
+    bet_size - overlap não sorteados: C(overlap, matches) * C(bet_size - overlap, picks - matches).
+    """
+    if matches > picks or overlap > bet_size:
+        return 0
+    return comb(overlap, matches) * comb(bet_size - overlap, picks - matches)
+
+
+def bet_hit_table(bet_size: int, picks: int = PICKS):
+    """
+    Tabela de bet_hits para todos os casos
+
+    Returns:
+        Matriz int64 (picks + 1, picks + 1): table[h, m] = jogos com m acertos
+        quando a aposta contém h números do sorteio
+    """
+    import numpy as np
+
+    return np.array([[bet_hits(bet_size, overlap, picks, matches) for matches in range(picks + 1)]
+                     for overlap in range(picks + 1)], dtype=np.int64)
+
+
+def unique_in_order(values):
+    """Remove repetições de um array (ex: índices de jogos) mantendo a primeira ocorrência de cada valor"""
+    import numpy as np
+
+    values = np.asarray(values)
+    _, first = np.unique(values, return_index=True)
+    return values[np.sort(first)]
+
+
+def games_to_masks(games, pool_size: int = POOL_SIZE):
+    """
+    Converte jogos em máscaras de bits (bit n-1 ligado para o número n)
+
+    Args:
+        games: Matriz (n, k) ou lista de jogos
+        pool_size: Números do volante; define o dtype (uint32 até 32, uint64 até 64)
+    Returns:
+        Array com uma máscara por jogo, ou matriz (n, palavras) uint64 para
+        volantes com mais de 64 números (ex: Quina)
+    """
+    import numpy as np
+    from lottery_modalities import mask_dtype, mask_words
+
+    dtype = np.dtype(mask_dtype(pool_size))
+    words = mask_words(pool_size)
+    games = game_matrix(games)
+    bits = np.left_shift(np.array(1, dtype=dtype), np.arange(dtype.itemsize * 8, dtype=dtype))
+    if words == 1:
+        masks = np.zeros(len(games), dtype=dtype)
+        for column in range(games.shape[1]):
+            masks |= bits[games[:, column].astype(np.intp) - 1]
+        return masks
+
+    masks = np.zeros((len(games), words), dtype=dtype)
+    rows = np.arange(len(games))
+    for column in range(games.shape[1]):
+        index = games[:, column].astype(np.intp) - 1
+        masks[rows, index >> 6] |= bits[index & 63]
+    return masks
+
+
+def ranks_to_masks(ranks, picks: int = PICKS, pool_size: int = POOL_SIZE):
+    """Máscaras de bits (ver games_to_masks) a partir dos índices das combinações"""
+    return games_to_masks(unrank_games(ranks, picks, pool_size), pool_size)
+
+
+@lru_cache(maxsize=1)
+def _popcount_table():
+    import numpy as np
+    table = np.zeros(1 << 16, dtype=np.uint8)
+    for bit in range(16):
+        table[1 << bit:1 << (bit + 1)] = table[:1 << bit] + 1
+    return table
+
+
+def popcount(values):
+    """
+    Quantidade de bits ligados em cada elemento de um array uint32 ou uint64
+    (em cada linha, para máscaras de várias palavras)
+    """
+    import numpy as np
+
+    values = np.ascontiguousarray(values)
+    if values.dtype not in (np.uint32, np.uint64):
+        values = values.astype(np.uint64)
+    # Tabela de 16 bits: duas (uint32) ou quatro (uint64) consultas por palavra
+    words = values.dtype.itemsize // 2 * int(np.prod(values.shape[1:], dtype=np.int64))
+    counts = _popcount_table()[values.view(np.uint16)]
+    return counts.reshape(-1, words).sum(axis=1, dtype=np.uint8)
+
+
+def count_matches(masks, draw_numbers: Sequence[int]):
+    """
+    Acertos de cada jogo (máscaras de games_to_masks) em um sorteio
+
+    Returns:
+        Array uint8 com a quantidade de números sorteados em cada jogo
+    """
+    import numpy as np
+
+    masks = np.asarray(masks)
+    draw_value = sum(1 << (int(n) - 1) for n in set(draw_numbers))
+    if masks.ndim == 1:
+        draw_mask = masks.dtype.type(draw_value)
+    else:
+        draw_mask = np.array([(draw_value >> (64 * word)) & (2 ** 64 - 1) for word in range(masks.shape[1])],
+                             dtype=masks.dtype)
+    return popcount(np.bitwise_and(masks, draw_mask))
+
+
+def ranks_with_matches(draw_numbers: Sequence[int], min_matches: int = 4,
+                       picks: int = PICKS, pool_size: int = POOL_SIZE):
+    """
+    Índices de todos os jogos com pelo menos min_matches números do sorteio
+
+    Para a quadra da Mega Sena são 21.790 jogos, então conferir um conjunto
+    grande de jogos vira uma busca desses índices, sem converter cada jogo.
+
+    Returns:
+        Tupla (índices, acertos), arrays numpy alinhados
+    """
+    import numpy as np
+
+    drawn = sorted(set(int(n) for n in draw_numbers))
+    others = [n for n in range(1, pool_size + 1) if n not in drawn]
+    ranks, matches = [], []
+    for hits in range(max(min_matches, 0), min(len(drawn), picks) + 1):
+        hit_part = np.array(list(combinations(drawn, hits)), dtype=np.int64)
+        miss_part = np.array(list(combinations(others, picks - hits)), dtype=np.int64)
+        # Produto cartesiano: cada combinação de acertos com cada combinação de erros
+        games = np.concatenate([
+            np.repeat(hit_part, len(miss_part), axis=0),
+            np.tile(miss_part, (len(hit_part), 1))
+        ], axis=1)
+        ranks.append(rank_games(games, pool_size))
+        matches.append(np.full(len(games), hits, dtype=np.uint8))
+    if not ranks:
+        return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint8)
+    return np.concatenate(ranks), np.concatenate(matches)
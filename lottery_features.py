@@ -0,0 +1,206 @@
+"""
+Tabela de características de cada sorteio (ou jogo)
+
+Todas as características saem da matriz de incidência jogo x número (linha
+i, coluna n verdadeira quando o número n está no jogo i) com operações de
+coluna do NumPy, em uma única passada e sem laço por jogo. A tabela guarda
+uint8 (uint16 na soma) e fica alinhada ao índice dos resultados, então a
+mesma tabela atende às estatísticas, aos filtros e à busca.
+"""
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from lottery_combinations import game_matrix
+from lottery_modalities import Modality
+
+# Coluna da tabela -> nome para exibição
+FEATURES: Dict[str, str] = {
+    'sum': 'Soma',
+    'min': 'Menor número',
+    'max': 'Maior número',
+    'spread': 'Amplitude (maior - menor)',
+    'consecutive': 'Pares de números consecutivos',
+    'repeats': 'Repetidos do concurso anterior',
+    'primes': 'Primos',
+    'multiples_3': 'Múltiplos de 3',
+    'multiples_5': 'Múltiplos de 5',
+    'evens': 'Pares',
+    'lines': 'Linhas do volante ocupadas',
+    'columns': 'Colunas do volante ocupadas',
+}
+
+# Nomes aceitos na busca e nos filtros em texto (ex: "soma=150-200, primos=2")
+FEATURE_NAMES: Dict[str, str] = {
+    'soma': 'sum',
+    'menor': 'min',
+    'maior': 'max',
+    'amplitude': 'spread',
+    'consecutivos': 'consecutive',
+    'repetidos': 'repeats',
+    'primos': 'primes',
+    'mult3': 'multiples_3',
+    'mult5': 'multiples_5',
+    'pares': 'evens',
+    'linhas': 'lines',
+    'colunas': 'columns',
+}
+
+
+def incidence_matrix(games, pool_size: int) -> np.ndarray:
+    """Matriz booleana (jogos, pool_size + 1): coluna n verdadeira quando o jogo tem o número n"""
+    games = game_matrix(games, np.intp)
+    matrix = np.zeros((len(games), pool_size + 1), dtype=bool)
+    matrix[np.arange(len(games))[:, None], games] = True
+    return matrix
+
+
+def _primes(limit: int) -> np.ndarray:
+    """Máscara dos primos de 1 a limit (posição n-1 para o número n)"""
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for n in range(2, int(limit ** 0.5) + 1):
+        if sieve[n]:
+            sieve[n * n::n] = False
+    return sieve[1:]
+
+
+def compute_features(incidence: np.ndarray, modality: Modality, previous: Optional[np.ndarray] = None,
+                     index=None) -> pd.DataFrame:
+    """
+    Calcula a tabela de características
+
+    Args:
+        incidence: Matriz de incidência (jogos, pool_size + 1); a coluna 0 não é usada
+        modality: Modalidade (volante e grade do bilhete)
+        previous: Incidência do sorteio anterior a cada linha, para 'repeats'
+            (None: 'repeats' fica zerado)
+        index: Índice da tabela (ex: o de results_data)
+    Returns:
+        DataFrame com uma coluna por característica (ver FEATURES); linhas
+        sem números ficam zeradas
+    """
+    pool_size = modality.pool_size
+    drawn = np.asarray(incidence, dtype=bool)[:, 1:pool_size + 1]
+    rows = len(drawn)
+    numbers = np.arange(1, pool_size + 1, dtype=np.uint16)
+    has_numbers = drawn.any(axis=1)
+
+    # argmax encontra o primeiro número marcado a partir de cada ponta
+    low = np.where(has_numbers, np.argmax(drawn, axis=1) + 1, 0)
+    high = np.where(has_numbers, pool_size - np.argmax(drawn[:, ::-1], axis=1), 0)
+
+    grid_columns = modality.grid_columns
+    grid_lines = -(-pool_size // grid_columns)
+    grid = np.zeros((rows, grid_lines * grid_columns), dtype=bool)
+    grid[:, :pool_size] = drawn
+    grid = grid.reshape(rows, grid_lines, grid_columns)
+
+    if previous is not None:
+        repeats = np.count_nonzero(drawn & np.asarray(previous, dtype=bool)[:, 1:pool_size + 1], axis=1)
+    else:
+        repeats = np.zeros(rows, dtype=np.uint8)
+
+    columns = {
+        'sum': (drawn.astype(np.uint16) @ numbers).astype(np.uint16),
+        'min': low,
+        'max': high,
+        'spread': high - low,
+        'consecutive': np.count_nonzero(drawn[:, 1:] & drawn[:, :-1], axis=1),
+        'repeats': repeats,
+        'primes': np.count_nonzero(drawn[:, _primes(pool_size)], axis=1),
+        # Números n com n % 3 == 0 estão nas posições 2, 5, 8, ... (posição n-1)
+        'multiples_3': np.count_nonzero(drawn[:, 2::3], axis=1),
+        'multiples_5': np.count_nonzero(drawn[:, 4::5], axis=1),
+        'evens': np.count_nonzero(drawn[:, 1::2], axis=1),
+        'lines': np.count_nonzero(grid.any(axis=2), axis=1),
+        'columns': np.count_nonzero(grid.any(axis=1), axis=1),
+    }
+    return pd.DataFrame({name: values if name == 'sum' else np.asarray(values).astype(np.uint8)
+                         for name, values in columns.items()}, index=index)
+
+
+def draw_features(incidence: np.ndarray, contests: Sequence[int], modality: Modality, index=None) -> pd.DataFrame:
+    """
+    Características dos sorteios; 'repeats' compara cada sorteio com o concurso anterior
+
+    Args:
+        incidence: Matriz de incidência dos sorteios, em qualquer ordem
+        contests: Número do concurso de cada linha (define qual é o anterior)
+        modality: Modalidade
+        index: Índice da tabela
+    """
+    order = np.argsort(np.asarray(contests), kind='stable')
+    previous = np.zeros(incidence.shape, dtype=bool)
+    previous[order[1:]] = incidence[order[:-1]]
+    return compute_features(incidence, modality, previous, index)
+
+
+def distribution(values) -> Dict[int, int]:
+    """Valor -> quantidade de linhas, em ordem crescente de valor (só os que ocorrem)"""
+    counts = np.bincount(np.asarray(values, dtype=np.intp))
+    return {int(value): int(counts[value]) for value in np.nonzero(counts)[0]}
+
+
+def parse_range(text: str) -> Tuple[int, int]:
+    """'150-200' -> (150, 200); '3' -> (3, 3)"""
+    match = re.fullmatch(r'\s*(\d+)\s*(?:-\s*(\d+)\s*)?', text)
+    if not match:
+        raise ValueError(f"Faixa inválida: {text!r} (use um valor ou mínimo-máximo, ex: 150-200)")
+    low = int(match.group(1))
+    high = int(match.group(2)) if match.group(2) else low
+    return min(low, high), max(low, high)
+
+
+def parse_conditions(text: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Lê condições como "soma=150-200, primos=2" (nomes de FEATURE_NAMES)
+
+    Returns:
+        Coluna da tabela -> (mínimo, máximo)
+    """
+    conditions = {}
+    for part in re.split(r'[;,]', text):
+        if not part.strip():
+            continue
+        name, separator, value = part.partition('=')
+        feature = FEATURE_NAMES.get(name.strip().lower())
+        if not separator or feature is None:
+            raise ValueError(f"Condição inválida: {part.strip()!r} "
+                             f"(use nome=valor ou nome=mínimo-máximo; nomes: {', '.join(FEATURE_NAMES)})")
+        conditions[feature] = parse_range(value)
+    return conditions
+
+
+def within_ranges(features: pd.DataFrame, ranges: Dict[str, Tuple[int, int]]) -> np.ndarray:
+    """Máscara das linhas com todas as características dentro das faixas (limites inclusos)"""
+    mask = np.ones(len(features), dtype=bool)
+    for name, (low, high) in ranges.items():
+        values = features[name].to_numpy()
+        mask &= (values >= low) & (values <= high)
+    return mask
+
+
+def format_distribution(name: str, counts: Dict[int, int], max_values: int = 12) -> List[str]:
+    """
+    Linhas de texto com a distribuição de uma característica
+
+    Com até max_values valores distintos mostra o percentual de cada um;
+    acima disso, a média, os extremos e a faixa central de 90%.
+    """
+    total = sum(counts.values())
+    if not total:
+        return []
+    if len(counts) <= max_values:
+        values = ", ".join(f"{value}: {count / total * 100:.1f}%" for value, count in counts.items())
+        return [f"{FEATURES[name]}: {values}"]
+
+    values = np.array(list(counts))
+    weights = np.array(list(counts.values()))
+    cumulative = np.cumsum(weights) / total
+    mean = float((values * weights).sum() / total)
+    low = int(values[np.searchsorted(cumulative, 0.05)])
+    high = int(values[np.searchsorted(cumulative, 0.95)])
+    return [f"{FEATURES[name]}: média {mean:.1f}, de {values[0]} a {values[-1]}, 90% entre {low} e {high}"]
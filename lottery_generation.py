@@ -0,0 +1,182 @@
+"""
+Geração reproduzível de jogos em vários processos
+
+Uma semente mestre define todos os jogos: o pedido é dividido em blocos
+de tamanho fixo e o bloco i usa o fluxo SeedSequence(semente, spawn_key=(i,)),
+independente dos demais. Os blocos são gerados em um pool de processos e
+juntados na ordem dos índices, descartando repetições; então o resultado
+para uma semente é o mesmo com 1 ou com N processos.
+"""
+import os
+import random
+from math import comb
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lottery_combinations import rank_games, unique_in_order, unrank_games
+from lottery_modalities import MEGA_SENA, Modality
+
+MODES = ('random', 'smart', 'strategic', 'weighted')
+BLOCK_SIZE = 10000
+
+# Estado de cada processo do pool (smart/strategic): as estatísticas são criadas uma vez por processo
+_worker_generate = None
+
+
+def block_seed(seed: int, index: int) -> np.random.SeedSequence:
+    """Fluxo independente do bloco index (o mesmo que SeedSequence(seed).spawn devolveria na posição index)"""
+    return np.random.SeedSequence(seed, spawn_key=(index,))
+
+
+def _python_rng(sequence: np.random.SeedSequence) -> random.Random:
+    """random.Random semeado a partir de uma SeedSequence (usado pelos geradores smart/strategic)"""
+    return random.Random(int.from_bytes(sequence.generate_state(4, np.uint64).tobytes(), 'little'))
+
+
+def _random_block(seed: int, index: int, count: int, pool_size: int, picks: int) -> np.ndarray:
+    """Índices de count jogos uniformes (cada combinação com a mesma probabilidade)"""
+    generator = np.random.Generator(np.random.PCG64(block_seed(seed, index)))
+    return generator.integers(0, comb(pool_size, picks), size=count, dtype=np.uint64)
+
+
+def _init_worker(results_data, modality: Modality, mode: str, favorite_numbers: Tuple[int, ...],
+                 weighting: Dict) -> None:
+    """Cria as estatísticas (e a estratégia) uma única vez em cada processo do pool"""
+    global _worker_generate
+    _worker_generate = _make_generator(results_data, modality, mode, favorite_numbers, weighting)
+
+
+def _make_generator(results_data, modality: Modality, mode: str, favorite_numbers: Tuple[int, ...],
+                    weighting: Dict):
+    """Função (quantidade, rng) -> jogos do modo smart, strategic ou weighted"""
+    from lottery_statistics import LotteryStatistics
+
+    stats_manager = LotteryStatistics(results_data, modality)
+    favorites = list(favorite_numbers)
+    if mode == 'weighted':
+        # O sorteio ponderado usa um gerador numpy, semeado pelo random.Random do bloco
+        return lambda count, rng: stats_manager.generate_weighted_games(
+            count, favorites, rng=np.random.default_rng(rng.getrandbits(128)), **weighting)
+    if mode == 'smart':
+        return lambda count, rng: stats_manager.generate_smart_games(count, favorites, rng=rng)
+
+    from manger_strategy import StrategyManager
+    strategy_manager = StrategyManager(stats_manager)
+    return lambda count, rng: strategy_manager.generate_strategic_games(count, favorites, rng=rng)
+
+
+def _strategy_block(seed: int, index: int, count: int, pool_size: int, generate=None) -> np.ndarray:
+    """Índices dos jogos de um bloco gerado por generate_smart_games/generate_strategic_games"""
+    games = (generate or _worker_generate)(count, _python_rng(block_seed(seed, index)))
+    return rank_games(games, pool_size).astype(np.uint64)
+
+
+def generate_ranks(num_games: int, seed: Optional[int] = None, mode: str = 'random',
+                   favorite_numbers: Sequence[int] = (), results_data=None,
+                   modality: Optional[Modality] = None, workers: Optional[int] = None,
+                   block_size: int = BLOCK_SIZE,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   weighting: Optional[Dict] = None) -> np.ndarray:
+    """
+    Gera jogos distintos e devolve os índices das combinações (ver lottery_combinations)
+
+    Args:
+        num_games: Quantidade de jogos
+        seed: Semente mestre (None: entropia do sistema, não reproduzível)
+        mode: 'random' (uniforme), 'smart' (generate_smart_games),
+            'strategic' (generate_strategic_games) ou 'weighted'
+            (generate_weighted_games)
+        favorite_numbers: Favoritos usados pelos modos smart, strategic e weighted
+        results_data: DataFrame dos resultados (obrigatório, exceto no modo random)
+        modality: Modalidade (padrão: Mega Sena)
+        workers: Processos (padrão: número de CPUs; 1 gera neste processo)
+        block_size: Jogos por bloco; define a sequência, então deve ser o
+            mesmo para reproduzir um resultado
+        progress_callback: Chamada com (jogos gerados até agora, num_games) a
+            cada bloco concluído
+        weighting: Opções do modo weighted (window, temperature, cold, method)
+    Returns:
+        Array com até num_games índices distintos, na ordem dos blocos (menos
+        que num_games só se o modo não conseguir gerar jogos novos)
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo inválido: {mode} (use {', '.join(MODES)})")
+    if mode != 'random' and results_data is None:
+        raise ValueError(f"O modo {mode} precisa dos resultados")
+    if num_games <= 0:
+        return np.empty(0, dtype=np.uint64)
+
+    modality = modality or MEGA_SENA
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    collected = np.empty(0, dtype=np.uint64)
+    next_block = 0
+    executor = None
+    local_generate = None
+    reported = 0
+    try:
+        while len(collected) < num_games:
+            missing = num_games - len(collected)
+            blocks = range(next_block, next_block + -(-missing // block_size))
+            next_block = blocks.stop
+            # Blocos cheios: o conteúdo de cada bloco não depende do tamanho do pedido restante
+            jobs = [(seed, index, block_size) for index in blocks]
+
+            if workers > 1 and len(jobs) > 1 and executor is None:
+                if mode == 'random':
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    executor = ProcessPoolExecutor(
+                        max_workers=workers, initializer=_init_worker,
+                        initargs=(results_data, modality, mode, tuple(favorite_numbers), weighting or {})
+                    )
+
+            if mode == 'random':
+                args = [job + (modality.pool_size, modality.picks) for job in jobs]
+                func = _random_block
+            else:
+                args = [job + (modality.pool_size,) for job in jobs]
+                func = _strategy_block
+                if executor is None and local_generate is None:
+                    local_generate = _make_generator(results_data, modality, mode, tuple(favorite_numbers),
+                                                     weighting or {})
+
+            if executor is not None:
+                results = executor.map(func, *zip(*args))
+            else:
+                results = (func(*arg, local_generate) if mode != 'random' else func(*arg) for arg in args)
+
+            before = len(collected)
+            parts = [collected]
+            for ranks in results:
+                parts.append(ranks)
+                generated = before + sum(len(part) for part in parts[1:])
+                if progress_callback and generated > reported:
+                    reported = min(generated, num_games)
+                    progress_callback(reported, num_games)
+            collected = unique_in_order(np.concatenate(parts))
+            if len(collected) == before:
+                # O modo não produz mais jogos novos (ex: poucos números disponíveis)
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    return collected[:num_games].astype(modality.rank_dtype)
+
+
+def generate_games(num_games: int, seed: Optional[int] = None, mode: str = 'random',
+                   favorite_numbers: Sequence[int] = (), results_data=None,
+                   modality: Optional[Modality] = None, workers: Optional[int] = None,
+                   block_size: int = BLOCK_SIZE,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   weighting: Optional[Dict] = None) -> List[List[int]]:
+    """Como generate_ranks, mas devolve os jogos (listas de números em ordem crescente)"""
+    modality = modality or MEGA_SENA
+    ranks = generate_ranks(num_games, seed, mode, favorite_numbers, results_data, modality,
+                           workers, block_size, progress_callback, weighting)
+    return unrank_games(ranks, modality.picks, modality.pool_size).tolist()
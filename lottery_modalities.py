@@ -0,0 +1,154 @@
+from math import comb
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+API_BASE_URL = "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade="
+
+
+class Modality:
+    """
+    Descrição de uma modalidade de loteria (N números entre 1 e M)
+
+    Concentra o que antes era fixo no código para a Mega Sena (60 números,
+    6 por jogo, seis grupos de dezenas) e escolhe as representações
+    compactas usadas na conferência: a máscara de bits cabe em uint32 até
+    32 números e em uint64 até 64 (acima disso, uma linha de palavras
+    uint64); o índice da combinação cabe em uint32 enquanto C(M, N) < 2^32.
+    """
+
+    __slots__ = ('key', 'name', 'pool_size', 'picks', 'prize_tiers', 'api_name', 'group_size',
+                 'max_picks', 'bet_price', 'grid_columns')
+
+    def __init__(self, key: str, name: str, pool_size: int, picks: int,
+                 prize_tiers: Dict[int, str], api_name: str, group_size: int = 10,
+                 max_picks: Optional[int] = None, bet_price: float = 0.0, grid_columns: int = 10):
+        """
+        Args:
+            key: Identificador curto (ex: 'megasena')
+            name: Nome para exibição
+            pool_size: Quantidade de números do volante (M)
+            picks: Números sorteados e marcados por jogo (N)
+            prize_tiers: Acertos premiados -> nome da faixa, ex: {6: 'Sena'}
+            api_name: Valor do parâmetro modalidade na API de resultados
+            group_size: Tamanho dos grupos de dezenas (01-10, 11-20, ...)
+            max_picks: Máximo de números em uma aposta múltipla (padrão: picks)
+            bet_price: Preço da aposta simples, em reais
+            grid_columns: Colunas do volante impresso (10 na Mega Sena: 6 linhas x 10 colunas)
+        """
+        self.key = key
+        self.name = name
+        self.pool_size = pool_size
+        self.picks = picks
+        self.prize_tiers = dict(sorted(prize_tiers.items(), reverse=True))
+        self.api_name = api_name
+        self.group_size = group_size
+        self.max_picks = max_picks or picks
+        self.bet_price = bet_price
+        self.grid_columns = grid_columns
+
+    def __repr__(self) -> str:
+        return f"Modality({self.key!r}, {self.picks} de {self.pool_size})"
+
+    @property
+    def numbers(self) -> range:
+        return range(1, self.pool_size + 1)
+
+    @property
+    def total_combinations(self) -> int:
+        return comb(self.pool_size, self.picks)
+
+    @property
+    def rank_dtype(self) -> Optional[str]:
+        """dtype numpy do índice da combinação, ou None se não couber em 64 bits"""
+        total = self.total_combinations
+        if total <= 2 ** 32:
+            return 'uint32'
+        if total <= 2 ** 64:
+            return 'uint64'
+        return None
+
+    @property
+    def mask_dtype(self) -> str:
+        """dtype numpy da máscara de bits de um jogo"""
+        return mask_dtype(self.pool_size)
+
+    @property
+    def mask_words(self) -> int:
+        """Palavras por máscara (1, ou uint64 por linha acima de 64 números)"""
+        return mask_words(self.pool_size)
+
+    @property
+    def min_prize_matches(self) -> int:
+        return min(self.prize_tiers)
+
+    @property
+    def api_url(self) -> str:
+        return API_BASE_URL + quote(self.api_name)
+
+    @property
+    def number_columns(self) -> List[str]:
+        return [f'Bola{i}' for i in range(1, self.picks + 1)]
+
+    @property
+    def groups(self) -> List[Tuple[int, int]]:
+        """Grupos de dezenas como (primeiro, último), ex: [(1, 10), (11, 20), ...]"""
+        return [(start, min(start + self.group_size - 1, self.pool_size))
+                for start in range(1, self.pool_size + 1, self.group_size)]
+
+    def group_index(self, number: int) -> int:
+        return (number - 1) // self.group_size
+
+    def group_label(self, index: int) -> str:
+        start, end = self.groups[index]
+        return f"{start:02d}-{end:02d}"
+
+    def grid_position(self, number: int) -> Tuple[int, int]:
+        """(linha, coluna) do número no volante, a partir de 0"""
+        return divmod(number - 1, self.grid_columns)
+
+    def is_valid_game(self, numbers: List[int]) -> bool:
+        return len(set(numbers)) == self.picks and all(1 <= n <= self.pool_size for n in numbers)
+
+    def is_valid_bet(self, numbers: List[int]) -> bool:
+        """Jogo simples ou aposta múltipla (de picks a max_picks números)"""
+        return (self.picks <= len(set(numbers)) == len(numbers) <= self.max_picks
+                and all(1 <= n <= self.pool_size for n in numbers))
+
+    def bet_combinations(self, size: int) -> int:
+        """Jogos simples contidos em uma aposta de size números (ex: 7 na Mega Sena)"""
+        return comb(size, self.picks)
+
+    def bet_cost(self, size: int) -> float:
+        """Preço de uma aposta de size números"""
+        return self.bet_combinations(size) * self.bet_price
+
+
+def mask_dtype(pool_size: int) -> str:
+    """Menor dtype numpy que comporta a máscara de bits de um volante com pool_size números"""
+    return 'uint32' if pool_size <= 32 else 'uint64'
+
+
+def mask_words(pool_size: int) -> int:
+    """Palavras de 64 bits por máscara (1 até 64 números, quando a máscara é um escalar)"""
+    return max(1, -(-pool_size // 64))
+
+
+MEGA_SENA = Modality('megasena', 'Mega Sena', 60, 6, {6: 'Sena', 5: 'Quina', 4: 'Quadra'}, 'Mega-Sena',
+                     max_picks=15, bet_price=5.0)
+LOTOFACIL = Modality('lotofacil', 'Lotofácil', 25, 15,
+                     {15: '15 acertos', 14: '14 acertos', 13: '13 acertos', 12: '12 acertos', 11: '11 acertos'},
+                     'Lotofácil', max_picks=20, bet_price=3.0, grid_columns=5)
+QUINA = Modality('quina', 'Quina', 80, 5, {5: 'Quina', 4: 'Quadra', 3: 'Terno', 2: 'Duque'}, 'Quina',
+                 max_picks=15, bet_price=2.5)
+
+MODALITIES: Dict[str, Modality] = {modality.key: modality for modality in (MEGA_SENA, LOTOFACIL, QUINA)}
+
+
+def get_modality(key: Optional[str] = None) -> Modality:
+    """Retorna a modalidade pelo identificador (padrão: Mega Sena)"""
+    if key is None:
+        return MEGA_SENA
+    try:
+        return MODALITIES[key.lower()]
+    except KeyError:
+        raise ValueError(f"Modalidade desconhecida: {key} (disponíveis: {', '.join(MODALITIES)})")
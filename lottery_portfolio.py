@@ -0,0 +1,188 @@
+"""
+Seleção de uma carteira de jogos diversificada
+
+De um conjunto grande de candidatos, escolhe N jogos que cubram o maior
+número de pares e trios distintos (e, opcionalmente, que não compartilhem
+mais que max_overlap números entre si). A seleção é gulosa: a cada passo
+entra o candidato que acrescenta mais pares e trios novos. O ganho de cada
+candidato é mantido em um array e atualizado de forma incremental, com um
+índice invertido subconjunto -> candidatos, em vez de recalculado a cada
+passo; a sobreposição com o jogo escolhido é medida por popcount das
+máscaras de bits.
+"""
+from itertools import combinations
+from math import comb
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lottery_combinations import binomial_table, count_matches, game_matrix, games_to_masks, popcount, rank_games
+
+# Limite de entradas (candidatos x subconjuntos) de cada índice invertido;
+# acima dele os trios deixam de ser considerados (ex: Lotofácil com muitos candidatos)
+MAX_INDEX_ENTRIES = 60_000_000
+
+
+def _as_games(games) -> np.ndarray:
+    """Matriz uint8 (jogos, k) com os números de cada jogo em ordem crescente"""
+    return np.sort(game_matrix(games, np.uint8), axis=1)
+
+
+def _subset_ids(games: np.ndarray, size: int, pool_size: int) -> np.ndarray:
+    """Índice (colexicográfico) de cada subconjunto de size números de cada jogo: matriz (jogos, C(k, size))"""
+    # uint16 quando couber: além da memória, o argsort estável de inteiros de 16 bits usa radix sort
+    dtype = np.uint16 if comb(pool_size, size) <= 2 ** 16 else np.int32
+    table = np.array(binomial_table(pool_size, size), dtype=dtype)
+    columns = list(combinations(range(games.shape[1]), size))
+    offsets = games.astype(np.intp) - 1
+    ids = np.zeros((len(games), len(columns)), dtype=dtype)
+    for position, cols in enumerate(columns):
+        for i, col in enumerate(cols):
+            ids[:, position] += table[i + 1][offsets[:, col]]
+    return ids
+
+
+class _SubsetIndex:
+    """Índice invertido subconjunto -> candidatos que o contêm (formato CSR)"""
+
+    def __init__(self, games: np.ndarray, size: int, pool_size: int):
+        self.size = size
+        self.ids = _subset_ids(games, size, pool_size)
+        flat = self.ids.ravel()
+        order = np.argsort(flat, kind='stable')
+        self.candidates = (order // self.ids.shape[1]).astype(np.int32)
+        counts = np.bincount(flat, minlength=comb(pool_size, size))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.covered = np.zeros(len(counts), dtype=bool)
+        self.total = len(counts)
+
+    def cover(self, candidate: int, gains: np.ndarray, weight: float) -> None:
+        """Marca os subconjuntos do candidato como cobertos e desconta o ganho de quem também os tem"""
+        for subset in self.ids[candidate]:
+            if self.covered[subset]:
+                continue
+            self.covered[subset] = True
+            gains[self.candidates[self.offsets[subset]:self.offsets[subset + 1]]] -= weight
+
+    def shared(self, candidate: int, total: int) -> np.ndarray:
+        """Quantos subconjuntos cada um dos total candidatos tem em comum com o candidato"""
+        lists = [self.candidates[self.offsets[subset]:self.offsets[subset + 1]] for subset in self.ids[candidate]]
+        return np.bincount(np.concatenate(lists), minlength=total)
+
+
+def select_portfolio(candidates, num_games: int, pool_size: int, pair_weight: float = 1.0,
+                     triple_weight: float = 1.0, max_overlap: Optional[int] = None,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Escolhe num_games candidatos maximizando a cobertura de pares e trios
+
+    Args:
+        candidates: Matriz (n, k) ou lista de jogos candidatos
+        num_games: Tamanho da carteira
+        pool_size: Números do volante
+        pair_weight: Peso de cada par novo coberto
+        triple_weight: Peso de cada trio novo coberto (0 desliga os trios)
+        max_overlap: Máximo de números em comum entre dois jogos da carteira
+            (None: sem limite); pode deixar a carteira menor que num_games
+        progress_callback: Chamada com (jogos escolhidos, num_games)
+    Returns:
+        Dicionário com 'indices' (posições em candidates, na ordem de escolha),
+        'games' e a cobertura resultante (ver portfolio_summary)
+    """
+    games = _as_games(candidates)
+    # Candidatos repetidos não acrescentam nada
+    _, first = np.unique(rank_games(games, pool_size), return_index=True)
+    unique = np.sort(first)
+    games = games[unique]
+    picks = games.shape[1]
+
+    gains = np.zeros(len(games), dtype=np.float32)
+    indexes: List[Tuple[_SubsetIndex, float]] = []
+    for size, weight in ((2, pair_weight), (3, triple_weight)):
+        if weight <= 0 or picks < size:
+            continue
+        if len(games) * comb(picks, size) > MAX_INDEX_ENTRIES:
+            if size == 2:
+                raise ValueError(f"Candidatos demais para a seleção ({len(games)}); "
+                                 f"use no máximo {MAX_INDEX_ENTRIES // comb(picks, 2)}")
+            continue
+        indexes.append((_SubsetIndex(games, size, pool_size), weight))
+        gains += weight * comb(picks, size)
+
+    # Dividir m números é ter C(m, 2) pares em comum: com o índice de pares só os candidatos
+    # que dividem algum par com o escolhido são visitados, sem comparar todas as máscaras
+    pair_index = next((index for index, _ in indexes if index.size == 2), None)
+    masks = None
+    if max_overlap is not None and (pair_index is None or max_overlap < 1):
+        masks = games_to_masks(games, pool_size)
+    selected = []
+    while len(selected) < min(num_games, len(games)):
+        best = int(np.argmax(gains))
+        if gains[best] == -np.inf:
+            break
+        selected.append(best)
+        gains[best] = -np.inf
+        for index, weight in indexes:
+            index.cover(best, gains, weight)
+        # Candidatos que dividiriam mais de max_overlap números com o escolhido saem da disputa
+        if masks is not None:
+            overlap = popcount(np.bitwise_and(masks, masks[best]))
+            gains[overlap > max_overlap] = -np.inf
+        elif max_overlap is not None:
+            gains[pair_index.shared(best, len(games)) > comb(max_overlap, 2)] = -np.inf
+        if progress_callback:
+            progress_callback(len(selected), num_games)
+
+    chosen = games[selected]
+    result = portfolio_summary(chosen, pool_size)
+    result['indices'] = unique[selected]
+    result['games'] = chosen
+    return result
+
+
+def portfolio_summary(games, pool_size: int) -> Dict:
+    """
+    Cobertura e sobreposição de um conjunto de jogos
+
+    Returns:
+        Dicionário com 'numbers_covered', 'pairs_covered', 'pairs_total',
+        'triples_covered', 'triples_total', 'max_overlap', 'mean_overlap' e
+        'overlap_histogram' (pares de jogos com 0, 1, ... números em comum)
+    """
+    games = _as_games(games)
+    picks = games.shape[1]
+    summary = {
+        'games_count': len(games),
+        'numbers_covered': int(len(np.unique(games))),
+        'pairs_total': comb(pool_size, 2),
+        'triples_total': comb(pool_size, 3),
+    }
+    summary['pairs_covered'] = int(len(np.unique(_subset_ids(games, 2, pool_size)))) if picks >= 2 else 0
+    summary['triples_covered'] = int(len(np.unique(_subset_ids(games, 3, pool_size)))) if picks >= 3 else 0
+
+    histogram = np.zeros(picks + 1, dtype=np.int64)
+    masks = games_to_masks(games, pool_size)
+    for i in range(1, len(games)):
+        # Sobreposição do jogo i com os anteriores (popcount das máscaras)
+        histogram += np.bincount(count_matches(masks[:i], games[i].tolist()), minlength=picks + 1)
+    pairs = int(histogram.sum())
+    summary['overlap_histogram'] = histogram.tolist()
+    summary['max_overlap'] = int(np.nonzero(histogram)[0].max()) if pairs else 0
+    summary['mean_overlap'] = float((histogram * np.arange(picks + 1)).sum() / pairs) if pairs else 0.0
+    return summary
+
+
+def format_portfolio_summary(summary: Dict) -> str:
+    """Texto com a cobertura e a sobreposição de uma carteira"""
+    lines = [
+        f"Jogos: {summary['games_count']}",
+        f"Números cobertos: {summary['numbers_covered']}",
+        f"Pares cobertos: {summary['pairs_covered']} de {summary['pairs_total']} "
+        f"({summary['pairs_covered'] / summary['pairs_total'] * 100:.1f}%)",
+        f"Trios cobertos: {summary['triples_covered']} de {summary['triples_total']} "
+        f"({summary['triples_covered'] / summary['triples_total'] * 100:.1f}%)",
+        f"Números em comum entre dois jogos: média {summary['mean_overlap']:.2f}, máximo {summary['max_overlap']}",
+    ]
+    histogram = summary['overlap_histogram']
+    lines += [f"  {shared} em comum: {count} pares de jogos" for shared, count in enumerate(histogram) if count]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,363 @@
+"""
+Bateria de testes de aleatoriedade sobre o histórico de sorteios
+
+Cada teste resume o histórico em uma estatística e compara o valor
+observado com a sua distribuição sob a hipótese de sorteios aleatórios,
+obtida por reamostragem (sem depender de tabelas de distribuições):
+
+- 'uniformity' e 'positions': históricos simulados com a mesma quantidade
+  de concursos, sorteados uniformemente (bootstrap paramétrico);
+- os demais: permutações da ordem dos concursos. A permutação mantém a
+  frequência de cada número e só desfaz a ordem, que é o que os padrões
+  de "quentes", "frios" e "recentes" (ver StrategyManager) supõem ter
+  informação.
+
+As reamostras são divididas em blocos com fluxos SeedSequence próprios
+(ver lottery_generation.block_seed) e calculadas em um pool de processos;
+o resultado para uma semente é o mesmo com 1 ou com N processos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import floor, log
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lottery_features import incidence_matrix
+from lottery_generation import block_seed
+
+# Teste -> descrição
+TESTS: Dict[str, str] = {
+    'uniformity': 'Uniformidade dos números (qui-quadrado)',
+    'positions': 'Uniformidade por posição de sorteio (qui-quadrado)',
+    'runs': 'Sequências de saída e ausência de cada número (runs)',
+    'gaps': 'Intervalos entre aparições de cada número (gap test)',
+    'serial': 'Correlação serial da soma entre concursos seguidos',
+    'repeats': 'Números repetidos entre concursos seguidos',
+    'hot': 'Acertos dos números mais frequentes até o concurso anterior',
+    'recent': 'Acertos dos números dos concursos recentes',
+}
+# Testes cuja distribuição nula vem de históricos simulados (os demais permutam os concursos)
+SIMULATED_TESTS = ('uniformity', 'positions')
+# Testes de cauda superior (qui-quadrado); os demais são bilaterais
+UPPER_TAIL_TESTS = ('uniformity', 'positions', 'runs', 'gaps')
+
+RESAMPLES = 2000
+BLOCK_SIZE = 50
+ALPHA = 0.05
+# Padrões alinhados a StrategyManager.apply_all_filters (30 mais frequentes, 5 concursos recentes)
+HOT_COUNT = 30
+RECENT_DRAWS = 5
+# Concursos iniciais usados só para formar as primeiras frequências do teste 'hot'
+WARMUP_DRAWS = 50
+
+# Histórico e parâmetros de cada processo do pool
+_worker_state = None
+
+
+class _History:
+    """Sorteios completos em ordem cronológica, nas formas usadas pelos testes"""
+
+    def __init__(self, positions: np.ndarray, pool_size: int, hot_count: int, recent_draws: int,
+                 warmup_draws: int):
+        self.positions = positions
+        self.pool_size = pool_size
+        self.picks = positions.shape[1]
+        self.incidence = incidence_matrix(positions, pool_size)[:, 1:]
+        self.sums = positions.sum(axis=1, dtype=np.int64)
+        self.hot_count = min(hot_count, pool_size - 1)
+        self.recent_draws = recent_draws
+        self.warmup_draws = min(warmup_draws, max(len(positions) - 1, 1))
+        # Contagens acumuladas cabem em int16 com até 32767 concursos
+        self.count_dtype = np.int16 if len(positions) < 2 ** 15 else np.int32
+        # Chance de k sorteios com reposição serem distintos: alta o bastante, a simulação
+        # sorteia inteiros e refaz as linhas repetidas em vez de ordenar chaves aleatórias
+        self.distinct_probability = float(np.prod(1 - np.arange(self.picks) / pool_size))
+
+        # Runs (Wald-Wolfowitz) de cada número: média e variância com a frequência de cada um fixa
+        size = len(positions)
+        drawn = self.incidence.sum(axis=0).astype(np.float64)
+        product = 2 * drawn * (size - drawn)
+        self.runs_mean = 1 + product / size
+        self.runs_std = np.sqrt(np.maximum(product * (product - size) / (size ** 2 * (size - 1)), 1e-12))
+
+        # Gap test: classes 1, 2, ..., G-1 e "G ou mais", com G escolhido para que a
+        # classe final espere ao menos 5 intervalos (distribuição geométrica com p = k/M)
+        p = self.picks / pool_size
+        total_gaps = max(int(self.incidence.sum()) - pool_size, 1)
+        max_gap = 1 + floor(log(5 / total_gaps) / log(1 - p)) if 0 < p < 1 and total_gaps > 5 else 2
+        self.max_gap = max(max_gap, 2)
+        probs = p * (1 - p) ** np.arange(self.max_gap - 1)
+        self.gap_probs = np.append(probs, 1 - probs.sum())
+
+    @property
+    def size(self) -> int:
+        return len(self.positions)
+
+
+def _chi_square(observed: np.ndarray, expected) -> float:
+    return float(((observed - expected) ** 2 / expected).sum())
+
+
+def _uniformity(history: _History, incidence: np.ndarray) -> float:
+    expected = len(incidence) * history.picks / history.pool_size
+    return _chi_square(incidence.sum(axis=0), expected)
+
+
+def _positions(history: _History, positions: np.ndarray) -> float:
+    # Tabela posição x número: cada posição deveria receber todos os números por igual
+    cells = np.arange(history.picks) * history.pool_size + (positions - 1)
+    table = np.bincount(cells.ravel(), minlength=history.picks * history.pool_size)
+    return _chi_square(table, len(positions) / history.pool_size)
+
+
+def _runs(history: _History, incidence: np.ndarray) -> float:
+    # Cada troca entre "saiu" e "não saiu" de um número abre uma sequência nova; a
+    # estatística soma o quadrado do desvio padronizado das sequências de cada número
+    runs = 1 + np.count_nonzero(incidence[1:] != incidence[:-1], axis=0)
+    return float((((runs - history.runs_mean) / history.runs_std) ** 2).sum())
+
+
+def _gaps(history: _History, incidence: np.ndarray) -> float:
+    # np.nonzero na transposta devolve as aparições número a número, em ordem cronológica
+    numbers, draws = np.nonzero(incidence.T)
+    same_number = numbers[1:] == numbers[:-1]
+    gaps = np.diff(draws)[same_number]
+    histogram = np.bincount(np.minimum(gaps, history.max_gap), minlength=history.max_gap + 1)[1:]
+    return _chi_square(histogram, len(gaps) * history.gap_probs)
+
+
+def _serial(sums: np.ndarray) -> float:
+    if len(sums) < 3 or sums.std() == 0:
+        return 0.0
+    return float(np.corrcoef(sums[1:], sums[:-1])[0, 1])
+
+
+def _repeats(incidence: np.ndarray) -> float:
+    return float(np.count_nonzero(incidence[1:] & incidence[:-1]))
+
+
+def _cumulative_counts(history: _History, incidence: np.ndarray) -> np.ndarray:
+    """Linha t: quantas vezes cada número saiu nos concursos anteriores a t (linha 0 zerada)"""
+    counts = np.zeros((len(incidence) + 1, incidence.shape[1]), dtype=history.count_dtype)
+    np.cumsum(incidence, axis=0, out=counts[1:])
+    return counts
+
+
+def _hot(history: _History, incidence: np.ndarray, counts: np.ndarray) -> float:
+    # Os hot_count números mais frequentes antes de cada concurso, a partir do aquecimento
+    start = history.warmup_draws
+    top = np.argpartition(-counts[start:-1], history.hot_count - 1, axis=1)[:, :history.hot_count]
+    return float(np.take_along_axis(incidence[start:], top, axis=1).sum())
+
+
+def _recent(history: _History, incidence: np.ndarray, counts: np.ndarray) -> float:
+    window = history.recent_draws
+    # Números que saíram em algum dos window concursos anteriores a t
+    recent = (counts[window:-1] - counts[:-window - 1]) > 0
+    return float(np.count_nonzero(incidence[window:] & recent))
+
+
+def _statistics(history: _History, tests: Sequence[str], incidence: np.ndarray,
+                positions: Optional[np.ndarray], sums: np.ndarray) -> np.ndarray:
+    """Valor de cada teste (na ordem de tests) para um histórico"""
+    values = []
+    counts = _cumulative_counts(history, incidence) if 'hot' in tests or 'recent' in tests else None
+    for test in tests:
+        if test == 'uniformity':
+            values.append(_uniformity(history, incidence))
+        elif test == 'positions':
+            values.append(_positions(history, positions))
+        elif test == 'runs':
+            values.append(_runs(history, incidence))
+        elif test == 'gaps':
+            values.append(_gaps(history, incidence))
+        elif test == 'serial':
+            values.append(_serial(sums))
+        elif test == 'repeats':
+            values.append(_repeats(incidence))
+        elif test == 'hot':
+            values.append(_hot(history, incidence, counts))
+        else:
+            values.append(_recent(history, incidence, counts))
+    return np.array(values)
+
+
+def _simulate_draws(history: _History, rng: np.random.Generator) -> np.ndarray:
+    """Histórico sorteado uniformemente: matriz (concursos, k) com os números na ordem de saída"""
+    if history.distinct_probability < 0.5:
+        # A ordem de chaves aleatórias dá uma amostra ordenada uniforme (ex: Lotofácil, 15 de 25)
+        keys = rng.random((history.size, history.pool_size), dtype=np.float32)
+        return (np.argsort(keys, axis=1)[:, :history.picks] + 1).astype(np.int16)
+
+    # Sorteios com reposição condicionados a números distintos são sorteios sem reposição
+    positions = rng.integers(1, history.pool_size + 1, size=(history.size, history.picks), dtype=np.int16)
+    pending = np.arange(history.size)
+    while len(pending):
+        # Só as linhas sorteadas de novo precisam ser conferidas na rodada seguinte
+        drawn = positions[pending]
+        pending = pending[(np.diff(np.sort(drawn, axis=1), axis=1) == 0).any(axis=1)]
+        positions[pending] = rng.integers(1, history.pool_size + 1, size=(len(pending), history.picks),
+                                          dtype=np.int16)
+    return positions
+
+
+def _null_block(seed: int, index: int, count: int, state=None) -> np.ndarray:
+    """Estatísticas de count reamostras do bloco index: matriz (count, testes)"""
+    history, tests = state or _worker_state
+    rng = np.random.Generator(np.random.PCG64(block_seed(seed, index)))
+    simulated = [test for test in tests if test in SIMULATED_TESTS]
+    permuted = [test for test in tests if test not in SIMULATED_TESTS]
+    rows = np.empty((count, len(tests)))
+    for row in range(count):
+        values = {}
+        if simulated:
+            positions = _simulate_draws(history, rng)
+            incidence = np.zeros((history.size, history.pool_size), dtype=bool)
+            np.put_along_axis(incidence, positions - 1, True, axis=1)
+            values.update(zip(simulated, _statistics(history, simulated, incidence, positions, None)))
+        if permuted:
+            order = rng.permutation(history.size)
+            values.update(zip(permuted, _statistics(history, permuted, history.incidence[order], None,
+                                                   history.sums[order])))
+        rows[row] = [values[test] for test in tests]
+    return rows
+
+
+def _init_worker(history: _History, tests: Tuple[str, ...]) -> None:
+    """Guarda o histórico uma única vez em cada processo do pool"""
+    global _worker_state
+    _worker_state = (history, tests)
+
+
+def _p_value(observed: float, null: np.ndarray, upper_tail: bool) -> float:
+    """Proporção das reamostras tão ou mais extremas que o observado (com a correção +1)"""
+    if upper_tail:
+        extreme = np.count_nonzero(null >= observed)
+    else:
+        center = null.mean()
+        extreme = np.count_nonzero(np.abs(null - center) >= abs(observed - center) - 1e-12)
+    return (extreme + 1) / (len(null) + 1)
+
+
+def randomness_tests(stats_manager, resamples: int = RESAMPLES, seed: Optional[int] = None,
+                     workers: Optional[int] = None, tests: Optional[Sequence[str]] = None,
+                     hot_count: int = HOT_COUNT, recent_draws: int = RECENT_DRAWS,
+                     warmup_draws: int = WARMUP_DRAWS, block_size: int = BLOCK_SIZE,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Executa a bateria de testes sobre os sorteios de um LotteryStatistics
+
+    Args:
+        stats_manager: Estatísticas com os resultados e a modalidade
+        resamples: Reamostras da distribuição nula de cada teste
+        seed: Semente das reamostras (None: entropia do sistema)
+        workers: Processos (padrão: número de CPUs; 1 calcula neste processo)
+        tests: Testes a executar (padrão: todos de TESTS)
+        hot_count: Quantidade de números quentes no teste 'hot'
+        recent_draws: Concursos considerados recentes no teste 'recent'
+        warmup_draws: Concursos iniciais que só alimentam as frequências do teste 'hot'
+        block_size: Reamostras por bloco; define a sequência, então deve ser o
+            mesmo para reproduzir um resultado
+        progress_callback: Chamada com (reamostras concluídas, resamples)
+    Returns:
+        Dicionário com 'draws' (concursos usados), 'resamples', 'seed' e
+        'tests': teste -> {'name', 'statistic', 'null_mean', 'null_std',
+        'z_score', 'p_value', 'random'} ('random' é p_value >= ALPHA);
+        'notes' explica os testes que não se aplicam a este histórico
+    """
+    tests = list(tests or TESTS)
+    unknown = [test for test in tests if test not in TESTS]
+    if unknown:
+        raise ValueError(f"Testes desconhecidos: {', '.join(unknown)} (disponíveis: {', '.join(TESTS)})")
+    if resamples <= 0:
+        raise ValueError("A quantidade de reamostras deve ser positiva")
+    if hot_count <= 0 or recent_draws <= 0:
+        raise ValueError("Os números quentes e os concursos recentes devem ser positivos")
+
+    modality = stats_manager.modality
+    data = stats_manager.results_data
+    values = data[modality.number_columns if set(modality.number_columns) <= set(data.columns)
+                  else data.filter(regex='Bola|Dezena').columns].to_numpy(dtype=float)
+    # Só sorteios completos e válidos, do mais antigo para o mais recente
+    complete = ~np.isnan(values).any(axis=1) & (values.shape[1] == modality.picks)
+    complete &= (values >= 1).all(axis=1) & (values <= modality.pool_size).all(axis=1)
+    order = np.argsort(data['Concurso'].to_numpy()[complete], kind='stable')
+    positions = values[complete][order].astype(np.int16)
+    positions = positions[(np.diff(np.sort(positions, axis=1), axis=1) > 0).all(axis=1)]
+    if len(positions) <= max(recent_draws, 2):
+        raise ValueError("Concursos insuficientes para os testes")
+
+    notes = {}
+    if 'positions' in tests and (np.diff(positions, axis=1) > 0).all():
+        # Sem a ordem de saída das bolas não há o que testar por posição
+        tests.remove('positions')
+        notes['positions'] = "não aplicável: os números estão em ordem crescente, não na ordem do sorteio"
+    if 'hot' in tests and len(positions) <= warmup_draws:
+        tests.remove('hot')
+        notes['hot'] = f"não aplicável: são necessários mais de {warmup_draws} concursos"
+
+    history = _History(positions, modality.pool_size, hot_count, recent_draws, warmup_draws)
+    observed = _statistics(history, tests, history.incidence, history.positions, history.sums)
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    workers = max(1, workers or os.cpu_count() or 1)
+    jobs = [(seed, index, min(block_size, resamples - start))
+            for index, start in enumerate(range(0, resamples, block_size))]
+
+    null = np.empty((0, len(tests)))
+    if tests:
+        executor = None
+        if workers > 1 and len(jobs) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(history, tuple(tests)))
+        try:
+            if executor is not None:
+                blocks = executor.map(_null_block, *zip(*jobs))
+            else:
+                blocks = (_null_block(*job, state=(history, tests)) for job in jobs)
+            parts = []
+            for block in blocks:
+                parts.append(block)
+                if progress_callback:
+                    progress_callback(sum(len(part) for part in parts), resamples)
+            null = np.concatenate(parts)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    results = {}
+    for column, test in enumerate(tests):
+        samples = null[:, column]
+        mean, std = float(samples.mean()), float(samples.std())
+        p_value = _p_value(observed[column], samples, test in UPPER_TAIL_TESTS)
+        results[test] = {
+            'name': TESTS[test],
+            'statistic': float(observed[column]),
+            'null_mean': mean,
+            'null_std': std,
+            'z_score': (float(observed[column]) - mean) / std if std > 0 else 0.0,
+            'p_value': p_value,
+            'random': p_value >= ALPHA,
+        }
+    return {'draws': history.size, 'resamples': resamples, 'seed': seed, 'tests': results, 'notes': notes}
+
+
+def format_randomness_report(report: Dict) -> str:
+    """Texto com o resultado de cada teste da bateria"""
+    lines = [
+        f"Testes de aleatoriedade: {report['draws']} concursos, {report['resamples']} reamostras "
+        f"(semente {report['seed']})",
+        f"Nível de significância: {ALPHA:.0%} (p-valor menor indica padrão distinguível do acaso)",
+        "",
+    ]
+    for test, result in report['tests'].items():
+        verdict = "compatível com o acaso" if result['random'] else "DIFERENTE do acaso"
+        lines.append(f"{result['name']}:")
+        lines.append(f"  observado {result['statistic']:.4g}, esperado {result['null_mean']:.4g} "
+                     f"± {result['null_std']:.3g} (z = {result['z_score']:+.2f})")
+        lines.append(f"  p-valor {result['p_value']:.4f}: {verdict}")
+    for test, note in report.get('notes', {}).items():
+        lines.append(f"{TESTS[test]}: {note}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,151 @@
+"""
+Sorteio ponderado de jogos
+
+Cada número recebe um peso (em geral derivado da frequência histórica) e os
+jogos são sorteados sem repetição dentro do jogo, em blocos vetorizados:
+
+- 'gumbel': Gumbel-top-k. Soma um ruído Gumbel ao log do peso de cada número
+  e fica com os k maiores; equivale a sortear os k números um a um, cada vez
+  com probabilidade proporcional ao peso dos que restam.
+- 'alias': tabela de alias de Walker (construção de Vose). Cada número sai
+  em O(1); as linhas com números repetidos são sorteadas de novo, o que dá a
+  distribuição dos k sorteios independentes condicionada a serem distintos.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+METHODS = ('gumbel', 'alias')
+# Linhas por bloco: limita a matriz de chaves do Gumbel-top-k (linhas x números)
+CHUNK_SIZE = 100000
+
+
+def frequency_weights(counts: Sequence[float], temperature: float = 1.0, cold: bool = False,
+                      smoothing: float = 1.0) -> np.ndarray:
+    """
+    Pesos normalizados a partir das frequências
+
+    Args:
+        counts: Frequência de cada número (posição n-1 para o número n)
+        temperature: 1 usa a frequência como peso; valores maiores aproximam
+            os pesos da distribuição uniforme e menores acentuam as diferenças
+        cold: Inverte os pesos, favorecendo os números menos sorteados
+        smoothing: Somado a cada frequência, para que nenhum número tenha peso zero
+    Returns:
+        Array float64 com soma 1
+    """
+    if temperature <= 0:
+        raise ValueError("A temperatura deve ser positiva")
+    values = np.asarray(counts, dtype=np.float64) + smoothing
+    if np.any(values <= 0):
+        raise ValueError("As frequências (com a suavização) devem ser positivas")
+    exponent = (-1.0 if cold else 1.0) / temperature
+    # Escala pela média antes da potência para não estourar com expoentes grandes
+    weights = (values / values.mean()) ** exponent
+    return weights / weights.sum()
+
+
+class AliasTable:
+    """
+    Tabela de alias de Walker para sortear índices com pesos arbitrários
+
+    Construção O(n) (método de Vose); cada sorteio usa um inteiro uniforme e
+    um real uniforme.
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0 or np.any(weights < 0) or weights.sum() <= 0:
+            raise ValueError("Os pesos devem ser não negativos e ter soma positiva")
+
+        size = len(weights)
+        scaled = weights * size / weights.sum()
+        self.prob = np.ones(size, dtype=np.float64)
+        self.alias = np.arange(size, dtype=np.intp)
+
+        small = [i for i in range(size) if scaled[i] < 1.0]
+        large = [i for i in range(size) if scaled[i] >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Sobras (erros de arredondamento) ficam com probabilidade 1
+        self.size = size
+
+    def sample(self, shape, rng: np.random.Generator) -> np.ndarray:
+        """Índices sorteados (0..n-1) no formato shape"""
+        columns = rng.integers(0, self.size, size=shape)
+        accept = rng.random(size=shape) < self.prob[columns]
+        return np.where(accept, columns, self.alias[columns])
+
+
+def _gumbel_top_k(inverse_weights: np.ndarray, rows: int, picks: int, rng: np.random.Generator) -> np.ndarray:
+    # Os k maiores log(peso) + Gumbel são os k menores Exponencial / peso (Gumbel = -log Exponencial),
+    # que custam um sorteio exponencial por número em vez de dois logaritmos
+    keys = rng.standard_exponential(size=(rows, len(inverse_weights)))
+    keys *= inverse_weights
+    # Com poucas colunas (60 a 80 números), argsort por linha é mais rápido que argpartition
+    return np.argsort(keys, axis=1)[:, :picks]
+
+
+def _alias_distinct(table: AliasTable, rows: int, picks: int, rng: np.random.Generator,
+                    max_rounds: int = 1000) -> np.ndarray:
+    draws = np.sort(table.sample((rows, picks), rng), axis=1)
+    for _ in range(max_rounds):
+        repeated = np.nonzero((np.diff(draws, axis=1) == 0).any(axis=1))[0]
+        if len(repeated) == 0:
+            return draws
+        draws[repeated] = np.sort(table.sample((len(repeated), picks), rng), axis=1)
+    raise ValueError("Pesos concentrados demais para sortear números distintos com a tabela de alias")
+
+
+def weighted_games(weights: Sequence[float], num_games: int, picks: int,
+                   rng: Optional[np.random.Generator] = None, method: str = 'gumbel',
+                   fixed_numbers: Sequence[int] = (), chunk_size: int = CHUNK_SIZE) -> np.ndarray:
+    """
+    Sorteia jogos com probabilidade de cada número proporcional ao peso
+
+    Args:
+        weights: Peso de cada número (posição n-1 para o número n)
+        num_games: Quantidade de jogos (podem se repetir entre si)
+        picks: Números por jogo
+        rng: Gerador numpy (padrão: np.random.default_rng())
+        method: 'gumbel' ou 'alias'
+        fixed_numbers: Números incluídos em todos os jogos (ex: favoritos);
+            os demais são sorteados entre os outros números
+        chunk_size: Jogos sorteados por bloco
+    Returns:
+        Matriz uint8 (num_games, picks) com os números de cada jogo em ordem crescente
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método inválido: {method} (use {', '.join(METHODS)})")
+    rng = rng or np.random.default_rng()
+    weights = np.asarray(weights, dtype=np.float64).copy()
+    fixed = sorted(set(int(n) for n in fixed_numbers))[:picks]
+    if fixed:
+        weights[np.array(fixed) - 1] = 0
+    free = picks - len(fixed)
+    if np.count_nonzero(weights > 0) < free:
+        raise ValueError("Há menos números com peso positivo do que números a sortear")
+
+    games = np.empty((num_games, picks), dtype=np.uint8)
+    if fixed:
+        games[:, :len(fixed)] = fixed
+    if free:
+        if method == 'gumbel':
+            with np.errstate(divide='ignore'):
+                # Peso zero vira chave infinita: o número nunca é escolhido
+                inverse_weights = 1.0 / weights
+        else:
+            table = AliasTable(weights)
+        for start in range(0, num_games, chunk_size):
+            rows = min(chunk_size, num_games - start)
+            if method == 'gumbel':
+                drawn = _gumbel_top_k(inverse_weights, rows, free, rng)
+            else:
+                drawn = _alias_distinct(table, rows, free, rng)
+            games[start:start + rows, len(fixed):] = drawn + 1
+    games.sort(axis=1)
+    return games
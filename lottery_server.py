@@ -0,0 +1,414 @@
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from manager_data import DataManager
+from manager_game import GameManager
+
+
+# Estado de cada processo do pool: as estatísticas ficam carregadas entre os pedidos
+_worker_stats = None
+_worker_strategy = None
+
+
+def _init_worker(results_path: Optional[str]) -> None:
+    """Carrega os resultados uma única vez em cada processo do pool"""
+    global _worker_stats, _worker_strategy
+    from lottery_statistics import LotteryStatistics
+    from manger_strategy import StrategyManager
+
+    results_df, error = DataManager.load_results(results_path)
+    if error:
+        raise RuntimeError(f"Erro ao carregar resultados: {error}")
+
+    _worker_stats = LotteryStatistics(results_df)
+    _worker_strategy = StrategyManager(_worker_stats)
+
+    # Aquece os caches usados pela geração e pela análise
+    _worker_stats.analyze_parity_groups()
+    _worker_stats.analyze_decade_groups()
+    _worker_stats.analyze_games([[1, 2, 3, 4, 5, 6]])
+
+
+def _run_batch(key: Tuple, items: List[Any]) -> List[Any]:
+    """
+    Executa um lote de pedidos agrupados (roda no pool de processos)
+
+    Args:
+        key: ('smart' | 'strategic', favoritos) ou ('analyze', acertos mínimos)
+        items: Quantidade de jogos por pedido (geração) ou lista de jogos por pedido (análise)
+
+    Returns:
+        Um resultado por item, na mesma ordem
+    """
+    kind = key[0]
+
+    if kind == 'analyze':
+        all_games = [game for games in items for game in games]
+        analyses = _worker_stats.analyze_games(all_games, min_matches=key[1])
+        results, start = [], 0
+        for games in items:
+            results.append(analyses[start:start + len(games)])
+            start += len(games)
+        return results
+
+    favorite_numbers = list(key[1])
+    total = sum(items)
+    if kind == 'smart':
+        games = _worker_stats.generate_smart_games(total, favorite_numbers)
+    else:
+        games = _worker_strategy.generate_strategic_games(total, favorite_numbers)
+
+    # Divide os jogos gerados entre os pedidos do lote
+    results, start = [], 0
+    for num_games in items:
+        results.append(games[start:start + num_games])
+        start += num_games
+    return results
+
+
+class RequestBatcher:
+    """
+    Agrupa pedidos concorrentes com a mesma chave em uma única chamada ao pool
+
+    Um lote é enviado quando a janela de espera termina ou quando atinge o
+    tamanho máximo.
+    """
+
+    def __init__(self, executor: ProcessPoolExecutor, window: float = 0.005, max_items: int = 64):
+        self.executor = executor
+        self.window = window
+        self.max_items = max_items
+        self.batches_sent = 0
+        self.items_sent = 0
+        self._pending: Dict[Tuple, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+
+    async def submit(self, key: Tuple, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+
+        if len(pending) >= self.max_items:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(key, [])
+        if pending:
+            asyncio.ensure_future(self._dispatch(key, pending))
+
+    async def _dispatch(self, key: Tuple, pending: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches_sent += 1
+        self.items_sent += len(pending)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, _run_batch, key, [item for item, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class LatencyMetrics:
+    """Latência por rota (janela com os últimos pedidos)"""
+
+    def __init__(self, window: int = 10000):
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, elapsed_ms: float, error: bool = False) -> None:
+        self._latencies[route].append(elapsed_ms)
+        self._counts[route] += 1
+        if error:
+            self._errors[route] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        summary = {}
+        for route, latencies in self._latencies.items():
+            ordered = sorted(latencies)
+            percentile = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+            summary[route] = {
+                'count': self._counts[route],
+                'errors': self._errors[route],
+                'mean_ms': round(sum(ordered) / len(ordered), 3),
+                'p50_ms': round(percentile(50), 3),
+                'p95_ms': round(percentile(95), 3),
+                'p99_ms': round(percentile(99), 3),
+            }
+        return summary
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LotteryServer:
+    """
+    Serviço HTTP/JSON local para geração e análise de jogos
+
+    Rotas:
+        GET  /health
+        GET  /metrics
+        POST /games/smart      {"num_games": 10, "favorites": [5, 10, 23]}
+        POST /games/strategic  {"num_games": 10, "favorites": [5, 10, 23]}
+        POST /analyze          {"games": [[1, 2, 3, 4, 5, 6]], "min_matches": 4}
+
+    O trabalho pesado roda em um pool de processos que mantém as estatísticas
+    carregadas; pedidos concorrentes são agrupados pelo RequestBatcher.
+    """
+
+    MAX_GAMES_PER_REQUEST = 10000
+    REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+    def __init__(self, results_path: Optional[str] = None, host: str = '127.0.0.1', port: int = 8765,
+                 workers: Optional[int] = None, batch_window: float = 0.005):
+        self.results_path = results_path
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count()
+        self.batch_window = batch_window
+        self.metrics = LatencyMetrics()
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.batcher: Optional[RequestBatcher] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/metrics'): self.handle_metrics,
+            ('POST', '/games/smart'): self.handle_smart,
+            ('POST', '/games/strategic'): self.handle_strategic,
+            ('POST', '/analyze'): self.handle_analyze,
+        }
+
+    async def start(self) -> None:
+        """Inicia o pool (carregando as estatísticas) e abre a porta"""
+        _, error = DataManager.load_results(self.results_path)
+        if error:
+            raise RuntimeError(f"Erro ao carregar resultados: {error}")
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.results_path,)
+        )
+        self.batcher = RequestBatcher(self.executor, window=self.batch_window)
+
+        # Garante que todos os processos carregaram os dados antes de aceitar pedidos
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, _run_batch, ('analyze', 1), [[]])
+            for _ in range(self.workers)
+        ])
+
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende os pedidos de uma conexão (HTTP/1.1 com keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self._dispatch(method, path.split('?')[0], body)
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+
+                data = json.dumps(payload, default=str).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        start = time.perf_counter()
+        status = 200
+        try:
+            handler = self.routes.get((method, path))
+            if handler is None:
+                known_path = any(route_path == path for _, route_path in self.routes)
+                raise HTTPError(405 if known_path else 404, f"Rota inválida: {method} {path}")
+
+            try:
+                data = json.loads(body) if body else {}
+            except json.JSONDecodeError as e:
+                raise HTTPError(400, f"JSON inválido: {e}")
+
+            payload = await handler(data)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': str(e)}
+
+        self.metrics.record(f"{method} {path}", (time.perf_counter() - start) * 1000, error=status >= 400)
+        return status, payload
+
+    def _parse_favorites(self, data: Dict) -> Tuple[int, ...]:
+        favorites = data.get('favorites', [])
+        if isinstance(favorites, str):
+            favorites = GameManager().parse_favorite_numbers(favorites)
+        if not isinstance(favorites, list) or not all(isinstance(n, int) and 1 <= n <= 60 for n in favorites):
+            raise HTTPError(400, "'favorites' deve ser uma lista de números entre 1 e 60")
+        return tuple(sorted(set(favorites)))
+
+    def _parse_num_games(self, data: Dict) -> int:
+        num_games = data.get('num_games', 1)
+        if not isinstance(num_games, int) or num_games <= 0:
+            raise HTTPError(400, "'num_games' deve ser um inteiro positivo")
+        if num_games > self.MAX_GAMES_PER_REQUEST:
+            raise HTTPError(413, f"Máximo de {self.MAX_GAMES_PER_REQUEST} jogos por pedido")
+        return num_games
+
+    async def handle_health(self, data: Dict) -> Dict:
+        return {'status': 'ok', 'workers': self.workers}
+
+    async def handle_metrics(self, data: Dict) -> Dict:
+        return {
+            'routes': self.metrics.summary(),
+            'batches': {
+                'sent': self.batcher.batches_sent,
+                'requests': self.batcher.items_sent,
+            }
+        }
+
+    async def handle_smart(self, data: Dict) -> Dict:
+        num_games = self._parse_num_games(data)
+        games = await self.batcher.submit(('smart', self._parse_favorites(data)), num_games)
+        return {'games': games}
+
+    async def handle_strategic(self, data: Dict) -> Dict:
+        num_games = self._parse_num_games(data)
+        games = await self.batcher.submit(('strategic', self._parse_favorites(data)), num_games)
+        return {'games': games}
+
+    async def handle_analyze(self, data: Dict) -> Dict:
+        games = data.get('games')
+        if not isinstance(games, list) or not games:
+            raise HTTPError(400, "'games' deve ser uma lista de jogos")
+        if len(games) > self.MAX_GAMES_PER_REQUEST:
+            raise HTTPError(413, f"Máximo de {self.MAX_GAMES_PER_REQUEST} jogos por pedido")
+
+        parsed = []
+        for game in games:
+            if (not isinstance(game, list) or len(game) < 6 or len(set(game)) != len(game)
+                    or not all(isinstance(n, int) and 1 <= n <= 60 for n in game)):
+                raise HTTPError(400, f"Jogo inválido: {game}")
+            parsed.append(sorted(game))
+
+        min_matches = data.get('min_matches', 4)
+        if not isinstance(min_matches, int):
+            raise HTTPError(400, "'min_matches' deve ser um inteiro")
+
+        analyses = await self.batcher.submit(('analyze', min_matches), parsed)
+        return {'analyses': analyses}
+
+
+async def run_load_test(host: str, port: int, path: str, body: Dict,
+                        total_requests: int = 1000, concurrency: int = 50) -> Dict:
+    """
+    Dispara pedidos concorrentes contra o serviço (uma conexão keep-alive por cliente)
+
+    Returns:
+        Vazão e latências observadas pelo cliente
+    """
+    data = json.dumps(body).encode('utf-8')
+    request = (
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n"
+    ).encode('latin-1') + data
+    latencies: List[float] = []
+    errors = 0
+    remaining = total_requests
+
+    async def client():
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                await reader.readexactly(length)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(ordered) / elapsed, 1),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95)], 3),
+    }
@@ -1,116 +1,146 @@
+import numpy as np
 import pandas as pd
 from collections import Counter
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Callable
 from itertools import combinations
 import random
 
+from lottery_modalities import MEGA_SENA, Modality
+from manager_metrics import METRICS, timed
+
 class LotteryStatistics:
-    def __init__(self, results_data: pd.DataFrame):
+    def __init__(self, results_data: pd.DataFrame, modality: Optional[Modality] = None):
         self.results_data = results_data
+        self.modality = modality or MEGA_SENA
         self.number_frequencies = {}
+        self._draw_matrix: Optional[np.ndarray] = None
+        self._draw_masks: Optional[np.ndarray] = None
+        self._draw_recency: Optional[np.ndarray] = None
+        self._draw_dates: Optional[List[str]] = None
+        self._draw_features: Optional[pd.DataFrame] = None
+        self._color_palette: Dict[int, str] = {}
+        # Resultados das análises sobre results_data, calculados uma única vez
+        self._analysis_cache: Dict[str, Dict] = {}
         self.calculate_frequencies()
     
+    def memory_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Memória dos resultados, das frequências e dos caches (ver manager_memory)
+        
+        Returns:
+            Dicionário estrutura -> (bytes, itens)
+        """
+        from manager_memory import sizeof
+        
+        usage = {
+            'Resultados (results_data)': (sizeof(self.results_data), len(self.results_data)),
+            'Frequências (number_frequencies)': (sizeof(self.number_frequencies), len(self.number_frequencies)),
+            'Cache de análises': (sizeof(self._analysis_cache), len(self._analysis_cache)),
+            'Cache da paleta de cores': (sizeof(self._color_palette), len(self._color_palette)),
+        }
+        if self._draw_matrix is not None:
+            usage['Cache da matriz de sorteios'] = (sizeof(self._draw_matrix), len(self._draw_matrix))
+        if self._draw_masks is not None:
+            usage['Cache das máscaras dos sorteios'] = (sizeof(self._draw_masks) + sizeof(self._draw_recency),
+                                                        len(self._draw_masks))
+        if self._draw_features is not None:
+            usage['Tabela de características dos sorteios'] = (sizeof(self._draw_features), len(self._draw_features))
+        if self._draw_dates is not None:
+            usage['Cache das datas formatadas'] = (sizeof(self._draw_dates), len(self._draw_dates))
+        return usage
+    
+    @timed()
     def calculate_frequencies(self) -> None:
         """Calcula a frequência de todos os números"""
         all_numbers = []
         for col in self.results_data.filter(regex='Bola|Dezena').columns:
             all_numbers.extend(self.results_data[col].dropna().astype(int).tolist())
         self.number_frequencies = Counter(all_numbers)
+        self._color_palette = {}
+        self._analysis_cache = {}
     
+    @timed()
     def analyze_decade_groups(self) -> Dict:
         """Analisa a frequência dos grupos de dezenas"""
-        decades = {
-            '01-10': 0, '11-20': 0, '21-30': 0,
-            '31-40': 0, '41-50': 0, '51-60': 0
-        }
+        if 'decade_groups' in self._analysis_cache:
+            return self._analysis_cache['decade_groups']
         
-        decade_patterns = []
-        total_games = 0
+        modality = self.modality
+        labels = [modality.group_label(i) for i in range(len(modality.groups))]
         
-        for _, row in self.results_data.iterrows():
-            game_decades = {k: 0 for k in decades.keys()}
-            numbers = []
-            
-            for col in self.results_data.filter(regex='Bola|Dezena').columns:
-                if pd.notna(row[col]):
-                    num = int(row[col])
-                    numbers.append(num)
-                    decade_key = f"{((num-1)//10)*10+1:02d}-{((num-1)//10+1)*10}"
-                    game_decades[decade_key] += 1
-                    decades[decade_key] += 1
-            
-            if numbers:
-                pattern = '-'.join(str(v) for v in game_decades.values())
-                decade_patterns.append(pattern)
-                total_games += 1
-        
-        pattern_freq = Counter(decade_patterns)
-        return {
-            'decades': {k: v/total_games/6*100 for k, v in decades.items()},
-            'patterns': {k: {'count': v, 'percentage': v/total_games*100}
-                        for k, v in pattern_freq.most_common(10)}
+        # Quantos números de cada grupo saíram em cada sorteio (uma soma por faixa de colunas)
+        drawn = self._get_draw_matrix()[:, 1:].astype(np.int64)
+        starts = [start - 1 for start, _ in modality.groups]
+        group_counts = np.add.reduceat(drawn, starts, axis=1)[drawn.any(axis=1)]
+        total_games = max(len(group_counts), 1)
+        
+        patterns = self._most_common_rows(group_counts, 10)
+        result = {
+            'decades': {label: count/total_games/modality.picks*100
+                        for label, count in zip(labels, group_counts.sum(axis=0).tolist())},
+            'patterns': {'-'.join(str(v) for v in row): {'count': count, 'percentage': count/total_games*100}
+                        for row, count in patterns}
         }
+        self._analysis_cache['decade_groups'] = result
+        return result
     
+    @timed()
     def analyze_parity_combinations(self) -> Dict:
         """Analisa combinações de paridade entre números consecutivos"""
+        if 'parity_combinations' in self._analysis_cache:
+            return self._analysis_cache['parity_combinations']
+        
+        # np.nonzero percorre a matriz linha a linha: os números de cada sorteio já saem em ordem
+        rows, numbers = np.nonzero(self._get_draw_matrix())
+        same_draw = rows[1:] == rows[:-1]
+        even = numbers % 2 == 0
+        current, following = even[:-1][same_draw], even[1:][same_draw]
         combinations_dict = {
-            'par-par': 0,
-            'par-impar': 0,
-            'impar-par': 0,
-            'impar-impar': 0
+            'par-par': int(np.count_nonzero(current & following)),
+            'par-impar': int(np.count_nonzero(current & ~following)),
+            'impar-par': int(np.count_nonzero(~current & following)),
+            'impar-impar': int(np.count_nonzero(~current & ~following))
         }
-        total = 0
+        total = int(np.count_nonzero(same_draw))
         
-        for _, row in self.results_data.iterrows():
-            numbers = []
-            for col in self.results_data.filter(regex='Bola|Dezena').columns:
-                if pd.notna(row[col]):
-                    numbers.append(int(row[col]))
-            
-            if numbers:
-                numbers.sort()
-                for i in range(len(numbers)-1):
-                    is_current_even = numbers[i] % 2 == 0
-                    is_next_even = numbers[i+1] % 2 == 0
-                    
-                    if is_current_even and is_next_even:
-                        combinations_dict['par-par'] += 1
-                    elif is_current_even and not is_next_even:
-                        combinations_dict['par-impar'] += 1
-                    elif not is_current_even and is_next_even:
-                        combinations_dict['impar-par'] += 1
-                    else:
-                        combinations_dict['impar-impar'] += 1
-                    total += 1
-        
-        return {
-            'combinations': {k: v/total*100 for k, v in combinations_dict.items()},
+        result = {
+            'combinations': {k: v/max(total, 1)*100 for k, v in combinations_dict.items()},
             'total_analyzed': total
         }
+        self._analysis_cache['parity_combinations'] = result
+        return result
     
+    @timed()
     def analyze_parity_groups(self) -> Dict:
         """Analisa grupos de paridade nas dezenas sorteadas"""
-        parity_patterns = []
+        if 'parity_groups' in self._analysis_cache:
+            return self._analysis_cache['parity_groups']
         
-        for _, row in self.results_data.iterrows():
-            numbers = []
-            for col in self.results_data.filter(regex='Bola|Dezena').columns:
-                if pd.notna(row[col]):
-                    numbers.append(int(row[col]))
-            
-            if numbers:
-                even_count = sum(1 for num in numbers if num % 2 == 0)
-                odd_count = len(numbers) - even_count
-                pattern = f"{even_count}p-{odd_count}i"  # p = par, i = ímpar
-                parity_patterns.append(pattern)
-        
-        pattern_freq = Counter(parity_patterns)
-        total = len(parity_patterns)
-        
-        return {
-            'patterns': {k: {'count': v, 'percentage': (v/total)*100} 
-                        for k, v in pattern_freq.most_common()}
+        sizes = np.count_nonzero(self._get_draw_matrix(), axis=1)
+        evens = self.draw_features()['evens'].to_numpy().astype(np.int64)
+        # Colunas (pares, ímpares); sorteios sem números ficam de fora
+        parity = np.column_stack([evens, sizes - evens])[sizes > 0]
+        total = len(parity)
+        
+        result = {
+            'patterns': {f"{even_count}p-{odd_count}i": {'count': count, 'percentage': (count/total)*100}  # p = par, i = ímpar
+                        for (even_count, odd_count), count in self._most_common_rows(parity)}
         }
+        self._analysis_cache['parity_groups'] = result
+        return result
+    
+    @staticmethod
+    def _most_common_rows(rows: np.ndarray, limit: Optional[int] = None) -> List[Tuple[List[int], int]]:
+        """
+        Linhas distintas e quantas vezes aparecem, da mais para a menos frequente
+        
+        Empates ficam na ordem da primeira ocorrência, como em Counter.most_common.
+        """
+        if len(rows) == 0:
+            return []
+        unique, first, counts = np.unique(rows, axis=0, return_index=True, return_counts=True)
+        order = np.lexsort((first, -counts))[:limit]
+        return [(unique[i].tolist(), int(counts[i])) for i in order]
 
     def get_hot_numbers(self, limit: int = 15) -> List[int]:
         """Retorna os números mais frequentes"""
@@ -123,18 +153,28 @@ class LotteryStatistics:
         if not self.number_frequencies:
             return "#808080"
         
-        freq = self.number_frequencies.get(number, 0)
-        min_freq = min(self.number_frequencies.values())
-        max_freq = max(self.number_frequencies.values())
-        
-        if max_freq > min_freq:
-            normalized = (freq - min_freq) / (max_freq - min_freq)
-        else:
-            normalized = 0
+        return self.get_color_palette().get(number, "#808080")
+    
+    def get_color_palette(self) -> Dict[int, str]:
+        """
+        Retorna a cor de cada número sorteado, calculada uma vez por
+        atualização das frequências
+        """
+        if not self._color_palette and self.number_frequencies:
+            min_freq = min(self.number_frequencies.values())
+            max_freq = max(self.number_frequencies.values())
+            
+            for number, freq in self.number_frequencies.items():
+                if max_freq > min_freq:
+                    normalized = (freq - min_freq) / (max_freq - min_freq)
+                else:
+                    normalized = 0
+                
+                red = int(255 * (1 - normalized))
+                green = int(255 * normalized)
+                self._color_palette[number] = f"#{red:02x}{green:02x}00"
         
-        red = int(255 * (1 - normalized))
-        green = int(255 * normalized)
-        return f"#{red:02x}{green:02x}00"
+        return self._color_palette
     
     def get_best_decade_pattern(self) -> Dict[str, int]:
         """Retorna o melhor padrão de distribuição por décadas"""
@@ -142,12 +182,16 @@ class LotteryStatistics:
         best_pattern = list(decade_analysis['patterns'].keys())[0]
         return {f"{i+1}0": int(n) for i, n in enumerate(best_pattern.split('-'))}
 
-    def generate_smart_games(self, num_games: int, favorite_numbers: List[int]) -> List[List[int]]:
+    @timed()
+    def generate_smart_games(self, num_games: int, favorite_numbers: List[int],
+                             rng: Optional[random.Random] = None) -> List[List[int]]:
         """
         Gera jogos inteligentes baseados em favoritos, frequência, paridade e décadas
         Args:
             num_games: Quantidade de jogos a gerar
             favorite_numbers: Lista de números favoritos
+            rng: Gerador usado nos sorteios (padrão: o módulo random); com um
+                random.Random semeado a geração é reproduzível
         Returns:
             Lista de jogos gerados
         """
@@ -168,7 +212,8 @@ class LotteryStatistics:
                 favorite_numbers=favorite_numbers,
                 hot_numbers=hot_numbers,
                 even_target=even_target,
-                decade_pattern=decade_pattern
+                decade_pattern=decade_pattern,
+                rng=rng or random
             )
             
             # Converter para tupla para poder adicionar ao set
@@ -176,29 +221,104 @@ class LotteryStatistics:
             games.add(game_tuple)
             attempts += 1
         
+        METRICS.count('jogos.gerados', len(games))
         # Converter de volta para lista de listas
         return [list(game) for game in games]
 
+    def number_counts(self, window: Optional[int] = None) -> np.ndarray:
+        """
+        Frequência de cada número (posição n-1 para o número n)
+        Args:
+            window: Considerar apenas os últimos window sorteios (padrão: todos)
+        """
+        draws = self._get_draw_matrix()
+        if window is not None:
+            draws = draws[:window]
+        return draws[:, 1:].sum(axis=0, dtype=np.float64)
+
+    def number_weights(self, window: Optional[int] = None, temperature: float = 1.0,
+                       cold: bool = False) -> np.ndarray:
+        """
+        Probabilidade de cada número no sorteio ponderado (ver lottery_sampling.frequency_weights)
+        Args:
+            window: Últimos sorteios considerados (padrão: todos)
+            temperature: Maior aproxima da distribuição uniforme, menor acentua as diferenças
+            cold: Favorecer os números menos sorteados
+        """
+        from lottery_sampling import frequency_weights
+        return frequency_weights(self.number_counts(window), temperature, cold)
+
+    @timed()
+    def generate_weighted_games(self, num_games: int, favorite_numbers: List[int] = (),
+                                window: Optional[int] = None, temperature: float = 1.0,
+                                cold: bool = False, method: str = 'gumbel',
+                                rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Gera jogos distintos sorteando cada número com peso dado pela frequência
+
+        Ao contrário de generate_smart_games, todos os números podem sair, com
+        probabilidade proporcional ao peso, e o sorteio é vetorizado (milhões
+        de jogos em poucos segundos).
+        Args:
+            num_games: Quantidade de jogos a gerar
+            favorite_numbers: Números incluídos em todos os jogos
+            window: Últimos sorteios usados na frequência (padrão: todos)
+            temperature: Maior aproxima da distribuição uniforme, menor acentua as diferenças
+            cold: Favorecer os números menos sorteados
+            method: 'gumbel' (Gumbel-top-k) ou 'alias' (tabela de alias de Walker)
+            rng: Gerador numpy (padrão: np.random.default_rng()); semeado, a geração é reproduzível
+        Returns:
+            Matriz uint8 (jogos, números) em ordem crescente; menos linhas que
+            num_games só se não houver jogos distintos suficientes
+        """
+        from lottery_combinations import rank_games, total_combinations, unique_in_order, unrank_games
+        from lottery_sampling import weighted_games
+
+        modality = self.modality
+        rng = rng or np.random.default_rng()
+        weights = self.number_weights(window, temperature, cold)
+        favorites = sorted(set(favorite_numbers))[:modality.picks]
+        available = total_combinations(modality.pool_size - len(favorites), modality.picks - len(favorites))
+        target = min(num_games, available)
+
+        ranks = np.empty(0, dtype=np.uint64)
+        # Jogos repetidos são descartados e repostos; perto de esgotar as combinações
+        # cada rodada acrescenta pouco, então o número de rodadas é limitado
+        for _ in range(10):
+            missing = target - len(ranks)
+            if missing <= 0:
+                break
+            games = weighted_games(weights, missing, modality.picks, rng, method, favorites)
+            ranks = unique_in_order(np.concatenate([ranks, rank_games(games, modality.pool_size).astype(np.uint64)]))
+
+        games = unrank_games(ranks[:target], modality.picks, modality.pool_size)
+        METRICS.count('jogos.gerados', len(games))
+        return games
+
     def _generate_smart_game(self, favorite_numbers: List[int], hot_numbers: List[int],
-                        even_target: int, decade_pattern: Dict[str, int]) -> List[int]:
+                        even_target: int, decade_pattern: Dict[str, int], rng=random) -> List[int]:
         """
         Gera um único jogo inteligente
         """
         game = []
+        picks = self.modality.picks
         remaining_even = even_target
-        remaining_odd = 6 - even_target
+        remaining_odd = picks - even_target
         decade_counts = {k: 0 for k in decade_pattern.keys()}
         
         # Criar lista de números favoritos embaralhada
         shuffled_favorites = favorite_numbers.copy()
-        random.shuffle(shuffled_favorites)
+        rng.shuffle(shuffled_favorites)
         
         # Criar lista de números quentes embaralhada
         shuffled_hot = [n for n in hot_numbers if n not in favorite_numbers]
-        random.shuffle(shuffled_hot)
+        rng.shuffle(shuffled_hot)
+        
+        def decade_of(num: int) -> str:
+            return f"{self.modality.group_index(num) + 1}0"
         
         def can_add_number(num: int) -> bool:
-            decade = f"{((num-1)//10 + 1)}0"
+            decade = decade_of(num)
             current_count = decade_counts[decade]
             target_count = decade_pattern[decade]
             is_even = num % 2 == 0
@@ -213,9 +333,9 @@ class LotteryStatistics:
         
         # 1. Primeiro, tentar incluir números favoritos que se encaixam nos padrões
         for num in shuffled_favorites:
-            if len(game) < 6 and can_add_number(num):
+            if len(game) < picks and can_add_number(num):
                 game.append(num)
-                decade_counts[f"{((num-1)//10 + 1)}0"] += 1
+                decade_counts[decade_of(num)] += 1
                 if num % 2 == 0:
                     remaining_even -= 1
                 else:
@@ -223,22 +343,22 @@ class LotteryStatistics:
         
         # 2. Completar com números quentes que se encaixam nos padrões
         for num in shuffled_hot:
-            if len(game) < 6 and num not in game and can_add_number(num):
+            if len(game) < picks and num not in game and can_add_number(num):
                 game.append(num)
-                decade_counts[f"{((num-1)//10 + 1)}0"] += 1
+                decade_counts[decade_of(num)] += 1
                 if num % 2 == 0:
                     remaining_even -= 1
                 else:
                     remaining_odd -= 1
         
         # 3. Completar aleatoriamente seguindo os padrões
-        available_numbers = list(set(range(1, 61)) - set(game))
-        random.shuffle(available_numbers)
+        available_numbers = list(set(self.modality.numbers) - set(game))
+        rng.shuffle(available_numbers)
         
         for num in available_numbers:
-            if len(game) < 6 and can_add_number(num):
+            if len(game) < picks and can_add_number(num):
                 game.append(num)
-                decade_counts[f"{((num-1)//10 + 1)}0"] += 1
+                decade_counts[decade_of(num)] += 1
                 if num % 2 == 0:
                     remaining_even -= 1
                 else:
@@ -266,12 +386,13 @@ class LotteryStatistics:
         
         return legend
     
+    @timed()
     def get_summary_statistics(self) -> str:
         """Retorna um resumo das estatísticas em formato de texto"""
         if self.results_data.empty:
             return "Sem dados disponíveis"
         
-        stats_text = "Estatísticas da Mega Sena\n\n"
+        stats_text = f"Estatísticas da {self.modality.name}\n\n"
         
         # Números mais e menos sorteados
         most_common = sorted(self.number_frequencies.items(), key=lambda x: (-x[1], x[0]))
@@ -307,8 +428,16 @@ class LotteryStatistics:
         for combo, percentage in parity_combinations['combinations'].items():
             stats_text += f"{combo}: {percentage:.1f}%\n"
         
+        # Distribuições da tabela de características (já calculada, uma contagem por coluna)
+        from lottery_features import FEATURES, format_distribution
+        stats_text += "\nCaracterísticas dos sorteios:\n"
+        for name in FEATURES:
+            for line in format_distribution(name, self.feature_distribution(name)):
+                stats_text += line + "\n"
+        
         return stats_text
     
+    @timed()
     def analyze_game(self, numbers: List[int], recent_draws: int = 5) -> Dict:
         """
         Analisa um jogo comparando com o histórico de sorteios
@@ -335,7 +464,9 @@ class LotteryStatistics:
         }
         
         # Verificar cada sorteio
-        for _, row in self.results_data.iterrows():
+        METRICS.count('concursos.varridos', len(self.results_data))
+        dates = self._get_draw_dates()
+        for position, (_, row) in enumerate(self.results_data.iterrows()):
             drawn_numbers = []
             for col in self.results_data.filter(regex='Bola|Dezena').columns:
                 if pd.notna(row[col]):
@@ -347,14 +478,14 @@ class LotteryStatistics:
             # Se encontrou correspondências
             if matches:
                 result['matching_numbers'][row['Concurso']] = {
-                    'date': row['Data do Sorteio'],
+                    'date': dates[position],
                     'numbers': sorted(list(matches))
                 }
             
-            # Se for o jogo completo
-            if numbers_set == drawn_set:
+            # Se for o jogo completo (ou, numa aposta múltipla, se contém o sorteio)
+            if len(drawn_set) == self.modality.picks and drawn_set <= numbers_set:
                 result['was_drawn'] = True
-                result['last_drawn_date'] = row['Data do Sorteio']
+                result['last_drawn_date'] = dates[position]
                 break
         
         # Verificar números nos sorteios recentes
@@ -368,4 +499,394 @@ class LotteryStatistics:
         
         result['matches_recent'] = sorted(list(numbers_set.intersection(recent_numbers)))
         
-        return result
\ No newline at end of file
+        return result
+    
+    def _get_draw_matrix(self) -> np.ndarray:
+        """
+        Retorna a matriz de incidência sorteio x número (calculada uma única vez)
+        
+        A linha i corresponde ao i-ésimo sorteio de results_data e a coluna n
+        vale 1 quando o número n foi sorteado (a coluna 0 não é usada).
+        """
+        if self._draw_matrix is None:
+            values = self.results_data.filter(regex='Bola|Dezena').to_numpy(dtype=float)
+            matrix = np.zeros((len(values), self.modality.pool_size + 1), dtype=np.float32)
+            rows, cols = np.nonzero(~np.isnan(values))
+            matrix[rows, values[rows, cols].astype(int)] = 1
+            self._draw_matrix = matrix
+        return self._draw_matrix
+    
+    def _get_draw_masks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna as máscaras de bits dos sorteios (ver lottery_combinations.games_to_masks)
+        e a recência de cada um (0 para o concurso mais antigo), calculadas uma única vez
+        """
+        if self._draw_masks is None:
+            from lottery_combinations import games_to_masks
+
+            rows, numbers = np.nonzero(self._get_draw_matrix())
+            words = self.modality.mask_words
+            shape = (len(self.results_data),) if words == 1 else (len(self.results_data), words)
+            masks = np.zeros(shape, dtype=self.modality.mask_dtype)
+            # Uma máscara por número sorteado, combinadas por linha (funciona com linhas incompletas)
+            number_masks = games_to_masks(numbers.reshape(-1, 1), self.modality.pool_size)
+            np.bitwise_or.at(masks, rows, number_masks)
+            self._draw_masks = masks
+            self._draw_recency = np.argsort(np.argsort(self.results_data['Concurso'].to_numpy(), kind='stable'))
+        return self._draw_masks, self._draw_recency
+
+    @timed()
+    def draw_features(self) -> pd.DataFrame:
+        """
+        Tabela de características dos sorteios (ver lottery_features), calculada uma única vez
+        
+        Returns:
+            DataFrame com o índice de results_data e uma coluna por característica
+            (soma, extremos, consecutivos, repetidos do concurso anterior, primos,
+            múltiplos de 3 e 5, pares, linhas e colunas do volante)
+        """
+        if self._draw_features is None:
+            from lottery_features import draw_features
+            
+            self._draw_features = draw_features(self._get_draw_matrix(), self.results_data['Concurso'].to_numpy(),
+                                                self.modality, self.results_data.index)
+        return self._draw_features
+    
+    def feature_distribution(self, name: str) -> Dict[int, int]:
+        """
+        Distribuição de uma característica nos sorteios
+        
+        Args:
+            name: Coluna da tabela (ver lottery_features.FEATURES)
+        Returns:
+            Valor -> quantidade de sorteios, em ordem crescente de valor
+        """
+        from lottery_features import FEATURES, distribution
+        
+        if name not in FEATURES:
+            raise ValueError(f"Característica desconhecida: {name} (disponíveis: {', '.join(FEATURES)})")
+        return distribution(self._feature_values(name))
+    
+    def feature_ranges(self, coverage: float = 0.9, names: Optional[List[str]] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Faixa central de cada característica que contém a fração coverage dos sorteios
+        
+        Args:
+            coverage: Fração dos sorteios dentro da faixa (ex: 0.9 descarta 5% de cada lado)
+            names: Características (padrão: todas)
+        Returns:
+            Característica -> (mínimo, máximo), limites inclusos
+        """
+        from lottery_features import FEATURES
+        
+        tail = (1 - coverage) / 2
+        ranges = {}
+        for name in names or FEATURES:
+            values = self._feature_values(name)
+            if len(values):
+                ranges[name] = (int(np.quantile(values, tail, method='lower')),
+                                int(np.quantile(values, 1 - tail, method='higher')))
+        return ranges
+    
+    def _feature_values(self, name: str) -> np.ndarray:
+        """Valores de uma característica nos sorteios com números (e com concurso anterior, em 'repeats')"""
+        features = self.draw_features()
+        valid = features['sum'].to_numpy() > 0
+        if name == 'repeats' and len(features):
+            valid[np.argmin(self.results_data['Concurso'].to_numpy())] = False
+        return features[name].to_numpy()[valid]
+    
+    def game_features(self, games) -> pd.DataFrame:
+        """
+        Tabela de características de jogos (mesmas colunas de draw_features)
+        
+        Args:
+            games: Matriz (n, k) ou lista de jogos
+        Returns:
+            DataFrame com uma linha por jogo; 'repeats' conta os números em
+            comum com o último concurso
+        """
+        from lottery_features import compute_features, incidence_matrix
+        
+        incidence = incidence_matrix(games, self.modality.pool_size)
+        previous = None
+        if len(self.results_data):
+            latest = int(np.argmax(self.results_data['Concurso'].to_numpy()))
+            previous = np.broadcast_to(self._get_draw_matrix()[latest] > 0, incidence.shape)
+        return compute_features(incidence, self.modality, previous)
+    
+    def _get_draw_dates(self) -> List[str]:
+        """Datas dos sorteios como texto dd/mm/aaaa, na ordem de results_data (calculadas uma única vez)"""
+        if self._draw_dates is None:
+            dates = self.results_data['Data do Sorteio']
+            if pd.api.types.is_datetime64_any_dtype(dates):
+                self._draw_dates = dates.dt.strftime('%d/%m/%Y').fillna('N/A').tolist()
+            else:
+                self._draw_dates = dates.astype(str).tolist()
+        return self._draw_dates
+    
+    @timed()
+    def analyze_games(self, games: List[List[int]], recent_draws: int = 5, min_matches: int = 1,
+                      chunk_size: int = 1000,
+                      progress_callback: Optional[Callable[[int, int], None]] = None,
+                      nearest: Optional[int] = None) -> List[Dict]:
+        """
+        Analisa vários jogos de uma vez comparando com o histórico de sorteios
+        
+        Equivalente a chamar analyze_game para cada jogo, mas as coincidências
+        são calculadas em blocos com uma multiplicação de matrizes em vez de
+        percorrer o DataFrame linha a linha para cada jogo.
+        
+        Args:
+            games: Lista de jogos
+            recent_draws: Quantidade de sorteios recentes a considerar
+            min_matches: Quantidade mínima de acertos para um sorteio entrar em 'matching_numbers'
+            chunk_size: Quantidade de jogos processados por bloco
+            progress_callback: Função chamada com (jogos processados, total) após cada bloco
+            nearest: Limita 'matching_numbers' aos nearest sorteios com mais
+                acertos (ver nearest_draws), em vez de todos os que têm
+                min_matches; nesse caso a busca não para no sorteio idêntico
+        Returns:
+            Lista de dicionários no mesmo formato de analyze_game
+        """
+        total = len(games)
+        if self.results_data.empty:
+            return [{
+                'was_drawn': False,
+                'last_drawn_date': None,
+                'matches_recent': [],
+                'matching_numbers': {}
+            } for _ in games]
+        
+        draws = self._get_draw_matrix()
+        METRICS.count('concursos.varridos', len(draws) * total)
+        draw_sizes = draws.sum(axis=1)
+        contests = self.results_data['Concurso'].tolist()
+        dates = self._get_draw_dates()
+        recent_numbers = set(np.nonzero(draws[:recent_draws].any(axis=0))[0].tolist())
+        # Sorteio idêntico ao jogo (ou, numa aposta múltipla, contido nela)
+        picks = self.modality.picks
+        
+        results = []
+        for start in range(0, total, chunk_size):
+            chunk = games[start:start + chunk_size]
+            overlaps = self._overlap_matrix(chunk)
+            if nearest:
+                nearest_draws = self._top_draw_indices(overlaps, nearest).tolist()
+            
+            for i, game in enumerate(chunk):
+                numbers_set = set(game)
+                row = overlaps[i]
+                result = {
+                    'was_drawn': False,
+                    'last_drawn_date': None,
+                    'matches_recent': sorted(numbers_set.intersection(recent_numbers)),
+                    'matching_numbers': {}
+                }
+                
+                exact = np.nonzero((row == picks) & (draw_sizes == picks))[0]
+                searched = len(row)
+                if len(exact):
+                    result['was_drawn'] = True
+                    result['last_drawn_date'] = dates[exact[0]]
+                    # Como em analyze_game, a busca para no sorteio idêntico
+                    searched = exact[0] + 1
+                
+                if nearest:
+                    listed = [d for d in nearest_draws[i] if row[d] >= max(min_matches, 1)]
+                else:
+                    listed = np.nonzero(row[:searched] >= max(min_matches, 1))[0]
+                for d in listed:
+                    result['matching_numbers'][contests[d]] = {
+                        'date': dates[d],
+                        'numbers': sorted(n for n in numbers_set if draws[d, n])
+                    }
+                
+                results.append(result)
+            
+            if progress_callback:
+                progress_callback(len(results), total)
+        
+        return results
+
+    @timed()
+    def analyze_bet(self, numbers: List[int]) -> Dict:
+        """
+        Analisa uma aposta múltipla (ex: 7 a 15 números na Mega Sena) contra o histórico
+
+        Os C(n, picks) jogos simples da aposta não são expandidos: para cada
+        sorteio basta saber quantos números da aposta saíram (h), e os jogos
+        com m acertos são C(h, m) * C(n - h, picks - m) (ver
+        lottery_combinations.bet_hits). O custo é o mesmo de um jogo simples.
+
+        Args:
+            numbers: Números da aposta (de picks a max_picks)
+        Returns:
+            Dicionário com 'size', 'combinations', 'cost', 'was_drawn',
+            'hits' (acertos premiados -> jogos simples premiados em todo o
+            histórico) e 'prizes' (um item por concurso premiado, com
+            'contest', 'date', 'overlap' e 'hits')
+        """
+        from lottery_combinations import bet_hit_table
+
+        modality = self.modality
+        numbers = sorted(set(numbers))
+        if not modality.is_valid_bet(numbers):
+            raise ValueError(f"Aposta inválida: use de {modality.picks} a {modality.max_picks} "
+                             f"números entre 1 e {modality.pool_size}")
+
+        tiers = sorted(modality.prize_tiers)
+        result = {
+            'size': len(numbers),
+            'combinations': modality.bet_combinations(len(numbers)),
+            'cost': modality.bet_cost(len(numbers)),
+            'was_drawn': False,
+            'hits': {m: 0 for m in tiers},
+            'prizes': []
+        }
+        if self.results_data.empty:
+            return result
+
+        draws = self._get_draw_matrix()
+        METRICS.count('concursos.varridos', len(draws))
+        bet = np.zeros(modality.pool_size + 1, dtype=np.float32)
+        bet[numbers] = 1
+        overlaps = (draws @ bet).astype(np.intp)
+        full_draws = draws.sum(axis=1) == modality.picks
+
+        # hits[d, m]: jogos simples da aposta com m acertos no sorteio d
+        hits = bet_hit_table(len(numbers), modality.picks)[np.minimum(overlaps, modality.picks)]
+        result['was_drawn'] = bool(np.any((overlaps == modality.picks) & full_draws))
+        result['hits'] = {m: int(hits[:, m].sum()) for m in tiers}
+
+        contests = self.results_data['Concurso'].tolist()
+        dates = self._get_draw_dates()
+        for d in np.nonzero(overlaps >= tiers[0])[0]:
+            result['prizes'].append({
+                'contest': contests[d],
+                'date': dates[d],
+                'overlap': int(overlaps[d]),
+                'hits': {m: int(hits[d, m]) for m in tiers if hits[d, m]}
+            })
+        return result
+
+    def nearest_draws(self, numbers: List[int], k: int = 5) -> List[Dict]:
+        """
+        Os k sorteios do histórico mais parecidos com o jogo
+
+        Alternativa de saída limitada a 'matching_numbers' de analyze_game:
+        os acertos em cada sorteio vêm do popcount das máscaras de bits e os
+        k maiores são separados com argpartition, sem percorrer o DataFrame.
+        Args:
+            numbers: Números do jogo
+            k: Quantidade de sorteios
+        Returns:
+            Lista (mais acertos primeiro; no empate, o concurso mais recente) de
+            dicionários com 'contest', 'date', 'matches' e 'numbers' (números em comum)
+        """
+        from lottery_combinations import count_matches
+
+        if self.results_data.empty or k <= 0:
+            return []
+        masks, _ = self._get_draw_masks()
+        METRICS.count('concursos.varridos', len(masks))
+        matches = count_matches(masks, numbers)
+        return self._describe_draws(numbers, matches, self._top_draw_indices(matches[np.newaxis], k)[0])
+
+    @timed()
+    def nearest_draws_batch(self, games: List[List[int]], k: int = 5, chunk_size: int = 1000,
+                            progress_callback: Optional[Callable[[int, int], None]] = None) -> List[List[Dict]]:
+        """
+        nearest_draws para vários jogos
+
+        Em blocos, os acertos vêm da multiplicação de matrizes de _overlap_matrix,
+        mais rápida que o popcount quando há muitos jogos por sorteio.
+        Args:
+            games: Lista de jogos
+            k: Quantidade de sorteios por jogo
+            chunk_size: Quantidade de jogos processados por bloco
+            progress_callback: Função chamada com (jogos processados, total) após cada bloco
+        Returns:
+            Uma lista de nearest_draws por jogo
+        """
+        if self.results_data.empty or k <= 0:
+            return [[] for _ in games]
+
+        METRICS.count('concursos.varridos', len(self.results_data) * len(games))
+        results = []
+        for start in range(0, len(games), chunk_size):
+            chunk = games[start:start + chunk_size]
+            overlaps = self._overlap_matrix(chunk).astype(np.int64)
+            top = self._top_draw_indices(overlaps, k)
+            for game, matches, draws in zip(chunk, overlaps, top):
+                results.append(self._describe_draws(game, matches, draws))
+            if progress_callback:
+                progress_callback(len(results), len(games))
+        return results
+
+    def _top_draw_indices(self, matches: np.ndarray, k: int) -> np.ndarray:
+        """
+        Posições dos k sorteios com mais acertos em cada linha de matches
+        (jogos x sorteios), do mais parecido ao menos; no empate, o mais recente
+        """
+        _, recency = self._get_draw_masks()
+        # Acertos e recência em uma única chave: a recência só desempata
+        scores = matches.astype(np.int64) * len(recency) + recency
+        size = scores.shape[1]
+        k = min(k, size)
+        top = np.argpartition(scores, size - k, axis=1)[:, size - k:]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        return np.take_along_axis(top, order, axis=1)
+
+    def _describe_draws(self, numbers: List[int], matches: np.ndarray, top: np.ndarray) -> List[Dict]:
+        """Sorteios nas posições top no formato de nearest_draws"""
+        draws = self._get_draw_matrix()
+        contests = self.results_data['Concurso'].iloc[top].tolist()
+        dates = self._get_draw_dates()
+        game = sorted(set(int(n) for n in numbers))
+        return [{
+            'contest': contest,
+            'date': dates[d],
+            'matches': int(matches[d]),
+            'numbers': [n for n in game if draws[d, n]]
+        } for contest, d in zip(contests, top.tolist())]
+
+    def _overlap_matrix(self, games: List[List[int]]) -> np.ndarray:
+        """
+        Retorna a matriz (jogos x sorteios) com a quantidade de números de
+        cada jogo presentes em cada sorteio
+        """
+        game_matrix = np.zeros((len(games), self.modality.pool_size + 1), dtype=np.float32)
+        for i, game in enumerate(games):
+            game_matrix[i, list(game)] = 1
+        return game_matrix @ self._get_draw_matrix().T
+    
+    @timed()
+    def match_histogram(self, games: List[List[int]], chunk_size: int = 1000) -> np.ndarray:
+        """
+        Conta, para cada jogo, quantos sorteios do histórico tiveram k acertos
+        
+        Args:
+            games: Lista de jogos
+            chunk_size: Quantidade de jogos processados por bloco
+        Returns:
+            Matriz (jogos, N+1) onde [i, k] é a quantidade de sorteios com k acertos do jogo i
+        Raises:
+            ValueError: Se algum jogo tiver mais de N números (apostas múltiplas
+                são conferidas por analyze_bet)
+        """
+        picks = self.modality.picks
+        if any(len(game) > picks for game in games):
+            raise ValueError(f"Jogos com mais de {picks} números são apostas múltiplas; use analyze_bet")
+        columns = picks + 1
+        histogram = np.zeros((len(games), columns), dtype=np.int64)
+        if self.results_data.empty:
+            return histogram
+        
+        METRICS.count('concursos.varridos', len(self.results_data) * len(games))
+        for start in range(0, len(games), chunk_size):
+            overlaps = self._overlap_matrix(games[start:start + chunk_size]).astype(np.int64)
+            for k in range(columns):
+                histogram[start:start + len(overlaps), k] = (overlaps == k).sum(axis=1)
+        
+        return histogram
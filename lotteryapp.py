@@ -1,74 +1,45 @@
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Modo linha de comando (python -m lotteryapp generate|analyze|backtest|export ...):
+    # despacha antes de importar o customtkinter, então funciona sem display
+    from lottery_cli import main
+    sys.exit(main(sys.argv[1:]))
+
 from datetime import datetime
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
-import threading
-import os
 
-from manager_ui import UIManager
-from manager_data import DataManager
+from manager_ui import UIManager, NumberGridView
 from manager_game import GameManager
-from lottery_statistics import LotteryStatistics
-from manager_search import SearchManager
+from manager_metrics import METRICS
+from manager_task import TaskManager
 
-# Verificar se o arquivo strategy_manager.py existe
-# Se não existir, criar o arquivo com conteúdo básico
-if not os.path.exists('strategy_manager.py'):
-    with open('strategy_manager.py', 'w') as file:
-        file.write("""import random
-from typing import List, Dict, Set, Optional, Tuple
-import pandas as pd
-
-class StrategyManager:
-    def __init__(self, stats_manager=None):
-        self.stats_manager = stats_manager
-        self.filtered_numbers = set()
-        
-    def set_stats_manager(self, stats_manager):
-        self.stats_manager = stats_manager
-        
-    def select_most_frequent(self, count=30):
-        if not self.stats_manager:
-            return set(range(1, 61))
-        return set(range(1, count+1))
-        
-    def filter_recent_games(self, recent_count=5):
-        if not self.stats_manager:
-            return set()
-        return set(range(55, 61))
-        
-    def apply_all_filters(self, cercar_count=12, top_count=30, recent_count=5, min_decade_pct=16.0):
-        filtered = set(range(1, top_count+1))
-        info = {
-            'initial_count': 60,
-            'top_frequent': top_count,
-            'removed_recent': 5,
-            'remaining': len(filtered)
-        }
-        return filtered, info
-        
-    def generate_strategic_games(self, num_games, favorite_numbers, filtered_numbers=None):
-        games = []
-        for _ in range(num_games):
-            game = sorted(random.sample(range(1, 61), 6))
-            games.append(game)
-        return games
-""")
-
-# Agora importamos o StrategyManager
-from manger_strategy import StrategyManager
+# Os módulos de dados (pandas, requests, openpyxl) são importados sob demanda
+# nas propriedades de LotteryApp, para que a janela apareça o quanto antes.
 
 class LotteryApp:
+    # Quantidade de linhas inseridas no histórico a cada ciclo do mainloop
+    HISTORY_CHUNK_SIZE = 500
+    # Pausa na digitação (ms) antes de aplicar os números favoritos
+    FAVORITES_DEBOUNCE_MS = 300
+    # Concursos mais parecidos (4 ou mais acertos) listados por jogo no histórico
+    NEAREST_DRAWS = 5
+    
     def __init__(self):
         # Inicializar janela principal
         self.window = ctk.CTk()
         self.ui_manager = UIManager(self.window)
+        self.task_manager = TaskManager(self.window)
         
-        # Inicializar gerenciadores
+        # Inicializar gerenciadores (os que dependem do pandas são criados no primeiro uso)
         self.game_manager = GameManager()
-        self.data_manager = DataManager()
-        self.search_manager = SearchManager()
+        self._data_manager = None
+        self._search_manager = None
+        self._strategy_manager = None
         self.stats_manager = None
-        self.strategy_manager = StrategyManager()  # Novo gerenciador
+        self.storage = None  # Banco local, aberto depois que a janela aparece
+        self._bet_description = ""  # Resumo da aposta múltipla mostrado na barra de status
         
         # Variáveis de controle
         self.favorite_numbers_var = ctk.StringVar()
@@ -76,12 +47,87 @@ class LotteryApp:
         
         # Armazenar referências da UI
         self.number_buttons = {}
+        self.grid_view = None
+        self.color_palette = {}  # Cores por número, recalculadas a cada importação
         self.number_labels = []
         self.ui_components = {}
         self.filtered_numbers = set()  # Conjunto de números após filtragem
+        self._history_batch_id = 0
+        self._history_insert_job = None
+        self._favorites_job = None
+        self.last_generation_allocations = None  # AllocationTracker da última geração perfilada
         
         # Criar interface
         self.setup_ui()
+        self.window.after_idle(self.open_storage)
+    
+    @property
+    def data_manager(self):
+        """Gerenciador de dados, criado no primeiro uso"""
+        if self._data_manager is None:
+            from manager_data import DataManager
+            self._data_manager = DataManager()
+        return self._data_manager
+    
+    @property
+    def search_manager(self):
+        """Gerenciador de busca, criado no primeiro uso"""
+        if self._search_manager is None:
+            from manager_search import SearchManager
+            self._search_manager = SearchManager()
+        return self._search_manager
+    
+    @property
+    def strategy_manager(self):
+        """Gerenciador de estratégias, criado no primeiro uso"""
+        if self._strategy_manager is None:
+            from manger_strategy import StrategyManager
+            self._strategy_manager = StrategyManager(self.stats_manager)
+        return self._strategy_manager
+    
+    def open_storage(self):
+        """
+        Abrir o banco local e carregar os últimos resultados importados
+        
+        Os jogos salvos não são carregados na memória (são consultados no
+        banco), então a abertura não depende de quantos jogos existem.
+        """
+        def load(task):
+            from manager_storage import StorageManager
+            storage = StorageManager(self.data_manager.CACHE_PATH)
+            num_tickets = storage.count_tickets()
+            results_df = storage.load_results()
+            if results_df.empty:
+                return storage, num_tickets, None
+            
+            task.check_cancelled()
+            from lottery_statistics import LotteryStatistics
+            stats_manager = LotteryStatistics(results_df)
+            return storage, num_tickets, (
+                stats_manager,
+                self.build_results_text(results_df),
+                stats_manager.get_summary_statistics()
+            )
+        
+        def on_success(result):
+            self.storage, num_tickets, loaded = result
+            self.game_manager.storage = self.storage
+            # Uma importação feita enquanto o banco abria tem prioridade
+            if loaded and not self.stats_manager:
+                self.show_loaded_results(*loaded)
+            if num_tickets:
+                self.ui_components['progress_label'].configure(
+                    text=f"{num_tickets} jogos salvos no banco local"
+                )
+        
+        self.run_task(
+            'armazenamento',
+            load,
+            on_success=on_success,
+            error_prefix="Erro ao abrir o banco local",
+            status_text="Abrindo banco local...",
+            coalesce='ignore'
+        )
     
     def clear_history(self):
         """Limpar histórico de jogos gerados"""
@@ -89,6 +135,10 @@ class LotteryApp:
             # Limpar texto da área de histórico
             self.ui_components['text_areas']['histórico'].delete("0.0", "end")
             
+            # Limpar os jogos guardados (usados na exportação); os jogos
+            # gravados no banco local são mantidos
+            self.game_manager.clear_history()
+            
             # Limpar display de números
             for label in self.number_labels:
                 label.configure(text="00")
@@ -113,6 +163,8 @@ class LotteryApp:
             main_frame, 
             self.toggle_number
         )
+        self.grid_view = NumberGridView(self.number_buttons)
+        self.update_button_appearances()
         
         # Painel de favoritos
         self.ui_manager.create_favorites_panel(main_frame, self.favorite_numbers_var)
@@ -134,6 +186,11 @@ class LotteryApp:
         control_panel = self.ui_manager.create_control_panel(main_frame, buttons_config)
         self.ui_components.update(control_panel)
         
+        # Barra de progresso das operações demoradas
+        self.ui_components.update(
+            self.ui_manager.create_progress_panel(main_frame, self.cancel_tasks)
+        )
+        
         # Abas e áreas de texto
         tabs = self.ui_manager.create_tabs(main_frame)
         self.ui_components.update({
@@ -147,22 +204,25 @@ class LotteryApp:
             self.search_results
         )
         self.ui_components.update(search_components)
+        
+        # Painel de desempenho
+        self.ui_components.update(self.ui_manager.create_performance_panel(
+            tabs['notebook'].tab("Desempenho"),
+            self.toggle_metrics,
+            self.refresh_performance,
+            self.reset_performance,
+            self.show_memory_report
+        ))
+        self.ui_components['metrics_var'].set(METRICS.enabled)
+        self.ui_components['profiling_var'].set(METRICS.profiling)
+        self.refresh_performance()
     
     def toggle_number(self, number: int):
         """Alternar seleção de número"""
-        was_added = self.game_manager.toggle_number(number)
+        self.game_manager.toggle_number(number)
         
         # Atualizar aparência do botão
-        if was_added:
-            self.number_buttons[number].configure(
-                fg_color="blue",
-                border_width=0
-            )
-        else:
-            self.number_buttons[number].configure(
-                fg_color=self.get_number_color(number),
-                border_width=0
-            )
+        self.update_button_appearances([number])
         
         # Atualizar display de números
         self.update_number_display()
@@ -170,6 +230,15 @@ class LotteryApp:
     def update_number_display(self):
         """Atualizar display com números selecionados"""
         selected = self.game_manager.get_selected_numbers()
+        # Aposta múltipla: os labels mostram os primeiros números e o resumo vai para a barra de status
+        bet_description = self.game_manager.describe_bet(selected)
+        if bet_description:
+            self.set_progress(bet_description, 0)
+        elif self._bet_description and self.ui_components['progress_label'].cget('text') == self._bet_description:
+            # De volta a um jogo simples: limpa o resumo (sem apagar o progresso de outra tarefa)
+            self.set_progress("", 0)
+        self._bet_description = bet_description
+        
         # Preencher com zeros os labels não utilizados
         while len(selected) < 6:
             selected.append(0)
@@ -179,48 +248,56 @@ class LotteryApp:
     
     def get_number_color(self, number: int) -> str:
         """Obter cor baseada na frequência do número"""
-        if self.stats_manager:
-            return self.stats_manager.get_color_for_frequency(number)
-        return ("gray75", "gray25")
+        return self.color_palette.get(number, ("gray75", "gray25"))
     
     def on_favorites_changed(self, *args):
-        """Callback para mudanças no campo de favoritos"""
+        """Callback para mudanças no campo de favoritos (aguarda uma pausa na digitação)"""
+        if self._favorites_job is not None:
+            self.window.after_cancel(self._favorites_job)
+        self._favorites_job = self.window.after(self.FAVORITES_DEBOUNCE_MS, self.apply_favorites)
+    
+    def apply_favorites(self):
+        """Aplicar o conteúdo do campo de favoritos ao grid"""
+        self._favorites_job = None
         numbers_str = self.favorite_numbers_var.get()
-        valid_numbers = self.game_manager.parse_favorite_numbers(numbers_str)
         
         # Atualizar favoritos no game manager
-        self.game_manager.set_favorite_numbers(valid_numbers)
+        changed = self.game_manager.update_favorites_from_text(numbers_str)
         
-        # Atualizar aparência dos botões
-        self.update_button_appearances()
+        # Atualizar aparência apenas dos botões que mudaram
+        if changed:
+            self.update_button_appearances(changed)
     
-    def update_button_appearances(self):
-        """Atualizar aparência de todos os botões"""
-        for number, btn in self.number_buttons.items():
-            if number in self.game_manager.get_selected_numbers():
-                btn.configure(
-                    fg_color="blue",
-                    border_width=0
-                )
-            elif number in self.game_manager.get_favorite_numbers():
-                btn.configure(
-                    fg_color=self.get_number_color(number),
-                    border_color="gold",
-                    border_width=2
-                )
-            elif hasattr(self, 'filtered_numbers') and number in self.filtered_numbers:
-                # Destacar números filtrados com uma borda verde
-                btn.configure(
-                    fg_color=self.get_number_color(number),
-                    border_color="green",
-                    border_width=2
-                )
-            else:
-                # Para botões sem borda, apenas configuramos border_width=0
-                btn.configure(
-                    fg_color=self.get_number_color(number),
-                    border_width=0
-                )
+    def get_button_state(self, number: int, selected, favorites) -> tuple:
+        """Calcular o estado visual (fg_color, border_color, border_width) de um botão"""
+        if number in selected:
+            return ("blue", None, 0)
+        if number in favorites:
+            return (self.get_number_color(number), "gold", 2)
+        if number in self.filtered_numbers:
+            # Destacar números filtrados com uma borda verde
+            return (self.get_number_color(number), "green", 2)
+        return (self.get_number_color(number), None, 0)
+    
+    def update_button_appearances(self, numbers=None):
+        """
+        Atualizar aparência dos botões
+        
+        Só os botões cujo estado mudou são reconfigurados (ver NumberGridView).
+        
+        Args:
+            numbers: Números a atualizar; None atualiza o grid inteiro
+        """
+        selected = self.game_manager.selected_numbers
+        favorites = self.game_manager.favorite_numbers
+        if numbers is None:
+            numbers = self.number_buttons.keys()
+        
+        with METRICS.measure('ui.grade'):
+            self.grid_view.render({
+                number: self.get_button_state(number, selected, favorites)
+                for number in numbers
+            })
     
     def generate_numbers(self):
         """Gerar números aleatórios"""
@@ -229,15 +306,15 @@ class LotteryApp:
             if num_games <= 0:
                 raise ValueError("Número de jogos deve ser positivo")
             
-            games = self.game_manager.generate_random_games(num_games)
-            
-            # Atualizar histórico
-            for game in games:
-                self.save_game_to_history(game)
-            
-            # Mostrar primeiro jogo no display
-            if games:
-                self.display_game(games[0])
+            self.run_task(
+                'geração',
+                lambda task: self.generate_and_save(
+                    task, lambda: self.game_manager.generate_random_games(num_games, save=False), 'aleatorio'
+                ),
+                on_success=self.on_games_generated,
+                error_prefix="Erro ao gerar números",
+                status_text="Gerando jogos..."
+            )
             
         except ValueError as e:
             messagebox.showerror("Erro", str(e))
@@ -267,18 +344,16 @@ class LotteryApp:
                 raise ValueError("Número de jogos deve ser positivo")
             
             # Gerar jogos usando a nova lógica inteligente
-            games = self.stats_manager.generate_smart_games(
-                num_games,
-                favorite_numbers
+            stats_manager = self.stats_manager
+            self.run_task(
+                'geração',
+                lambda task: self.generate_and_save(
+                    task, lambda: stats_manager.generate_smart_games(num_games, favorite_numbers), 'inteligente'
+                ),
+                on_success=self.on_games_generated,
+                error_prefix="Erro ao gerar jogos",
+                status_text="Gerando jogos..."
             )
-            
-            # Salvar jogos no histórico
-            for game in games:
-                self.save_game_to_history(game)
-            
-            # Mostrar o primeiro jogo
-            if games:
-                self.display_game(games[0])
                 
         except ValueError as e:
             messagebox.showerror("Erro", str(e))
@@ -302,11 +377,8 @@ class LotteryApp:
         
         messagebox.showinfo("Sucesso", "Números marcados como favoritos!")
     
-    def save_game_to_history(self, numbers):
-        """Salvar jogo no histórico com análises"""
-        # Obter a data/hora atual
-        current_time = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        
+    def format_history_entry(self, numbers, analysis, current_time: str) -> str:
+        """Formatar a linha do histórico de um jogo com suas análises"""
         # Formatar números
         numbers_str = ", ".join(f"{num:02d}" for num in sorted(numbers))
         
@@ -314,9 +386,7 @@ class LotteryApp:
         history_text = f"[{current_time}]    -    {numbers_str}"
         
         # Se temos dados de sorteios, adicionar análises
-        if self.stats_manager:
-            analysis = self.stats_manager.analyze_game(numbers)
-            
+        if analysis:
             # Definir cores para o texto
             if analysis['was_drawn']:
                 history_text = f"🎯 {history_text} (SORTEADO em {analysis['last_drawn_date']})"
@@ -328,12 +398,175 @@ class LotteryApp:
 
             # Adicionar ocorrências em outros sorteios
             for concurso, data in analysis['matching_numbers'].items():
-                matches = ", ".join(f"{n:02d}" for n in data['numbers'])
                 if len(data['numbers']) >= 4:  # Se tem 4 ou mais números coincidentes
                     history_text += f"    🔍 Concurso(s) -  {concurso}"
         
-        # Adicionar ao histórico com uma linha em branco para separação
-        self.ui_components['text_areas']['histórico'].insert("0.0", history_text + "\n")
+        return history_text
+    
+    def save_games_to_history(self, games, ticket_ids=None):
+        """
+        Salvar vários jogos no histórico sem bloquear a interface
+        
+        A análise e a formatação rodam no TaskManager; o texto resultante é
+        inserido em blocos via window.after. Quando os jogos foram gravados
+        no banco (ticket_ids), as quadras, quinas e senas de cada um no
+        histórico de sorteios também são gravadas.
+        """
+        if not games:
+            return
+        
+        stats_manager = self.stats_manager
+        storage = self.storage
+        current_time = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        
+        def build_lines(task):
+            if stats_manager:
+                analyses = stats_manager.analyze_games(
+                    games,
+                    min_matches=4,
+                    nearest=self.NEAREST_DRAWS,
+                    progress_callback=lambda done, total: task.report_progress(
+                        done, total, "Analisando jogos..."
+                    )
+                )
+            else:
+                analyses = [None] * len(games)
+            
+            if stats_manager and storage and ticket_ids:
+                task.check_cancelled()
+                histogram = stats_manager.match_histogram(games).tolist()
+                contest = int(stats_manager.results_data['Concurso'].max())
+                storage.save_ticket_analysis(
+                    (ticket_id, row[4], row[5], row[6], contest)
+                    for ticket_id, row in zip(ticket_ids, histogram)
+                )
+            
+            lines = [
+                self.format_history_entry(game, analysis, current_time)
+                for game, analysis in zip(games, analyses)
+            ]
+            # O último jogo gerado fica no topo, como na inserção individual
+            lines.reverse()
+            return lines
+        
+        # Cada lote precisa ser inserido, então não há agrupamento de pedidos
+        self.run_task(
+            'histórico',
+            build_lines,
+            on_success=self._insert_history_chunks,
+            error_prefix="Erro ao analisar jogos",
+            status_text="Analisando jogos...",
+            coalesce=None
+        )
+    
+    def _insert_history_chunks(self, lines, start: int = 0, mark: str = None):
+        """Inserir as linhas no topo do histórico em blocos, um bloco por ciclo do mainloop"""
+        text_area = self.ui_components['text_areas']['histórico']
+        
+        if mark is None:
+            # Marca com gravidade à direita: cada bloco entra depois do anterior
+            self._history_batch_id += 1
+            mark = f"history_batch_{self._history_batch_id}"
+            text_area.mark_set(mark, "1.0")
+            text_area.mark_gravity(mark, "right")
+        
+        end = min(start + self.HISTORY_CHUNK_SIZE, len(lines))
+        with METRICS.measure('ui.histórico.bloco'):
+            text_area.insert(mark, "\n".join(lines[start:end]) + "\n")
+        
+        if end < len(lines):
+            self.set_progress(f"Inserindo jogos... {end}/{len(lines)}", end / len(lines))
+            self._history_insert_job = self.window.after(
+                1, self._insert_history_chunks, lines, end, mark
+            )
+        else:
+            self._history_insert_job = None
+            text_area.mark_unset(mark)
+            self.set_progress("", 0)
+    
+    def run_task(self, name: str, func, *args, on_success=None, error_prefix: str = "Erro",
+                 status_text: str = "Processando...", coalesce='replace', **kwargs):
+        """
+        Executar uma operação demorada pelo TaskManager
+        
+        Mostra o andamento na barra de progresso e exibe os erros em uma
+        messagebox, sempre a partir da thread da interface.
+        """
+        def success(result):
+            self.set_progress("", 0)
+            if on_success:
+                on_success(result)
+        
+        def error(exc):
+            self.set_progress("", 0)
+            messagebox.showerror("Erro", f"{error_prefix}: {exc}")
+        
+        def cancelled():
+            # Se foi substituída por um novo pedido, a barra pertence à nova tarefa
+            if not self.task_manager.is_running(name):
+                self.set_progress("", 0)
+        
+        self.set_progress(status_text, 0)
+        return self.task_manager.submit(
+            name, func, *args,
+            on_success=success,
+            on_error=error,
+            on_progress=self.on_task_progress,
+            on_cancel=cancelled,
+            coalesce=coalesce,
+            **kwargs
+        )
+    
+    def on_task_progress(self, done: int, total: int, text: str):
+        """Callback de progresso das tarefas"""
+        self.set_progress(f"{text} {done}/{total}", done / total if total else 0)
+    
+    def cancel_tasks(self):
+        """Cancelar as operações em andamento"""
+        self.task_manager.cancel()
+        if self._history_insert_job is not None:
+            self.window.after_cancel(self._history_insert_job)
+            self._history_insert_job = None
+        self.set_progress("", 0)
+    
+    def generate_and_save(self, task, generate, tag: str):
+        """
+        Gerar jogos e salvá-los no GameManager (e no banco local), fora da interface
+        
+        Returns:
+            Tupla (jogos, ids no banco ou None)
+        """
+        if not METRICS.profiling:
+            games = generate()
+            task.check_cancelled()
+            task.report_progress(0, len(games), "Salvando jogos...")
+            return games, self.game_manager.save_games(games, tag=tag)
+        
+        # Com o profiling ligado, a aba Desempenho mostra as alocações da geração
+        from manager_memory import AllocationTracker
+        with AllocationTracker() as tracker:
+            games = generate()
+            task.check_cancelled()
+            task.report_progress(0, len(games), "Salvando jogos...")
+            ticket_ids = self.game_manager.save_games(games, tag=tag)
+        self.last_generation_allocations = tracker
+        return games, ticket_ids
+    
+    def on_games_generated(self, result):
+        """Callback executado na interface quando uma geração termina (ver generate_and_save)"""
+        games, ticket_ids = result
+        
+        # Salvar jogos no histórico
+        self.save_games_to_history(games, ticket_ids)
+        
+        # Mostrar o primeiro jogo
+        if games:
+            self.display_game(games[0])
+    
+    def set_progress(self, text: str, value: float):
+        """Atualizar a barra de progresso"""
+        self.ui_components['progress_label'].configure(text=text)
+        self.ui_components['progress_bar'].set(value)
     
     def display_game(self, numbers):
         """Mostrar jogo no display de números"""
@@ -342,69 +575,202 @@ class LotteryApp:
     
     def import_results(self):
         """Importar resultados da API"""
-        def download():
-            try:
-                results_df, error = self.data_manager.download_results()
-                
-                if error:
-                    messagebox.showerror("Erro", f"Erro ao importar resultados: {error}")
-                    return
-                
-                # Criar gerenciador de estatísticas
-                self.stats_manager = LotteryStatistics(results_df)
-                
-                # Atualizar o gerenciador de estratégias
-                self.strategy_manager.set_stats_manager(self.stats_manager)
-                
-                # Atualizar interface
-                self.update_results_display(results_df)
-                self.update_number_colors()
-                self.update_statistics()
-                
-                messagebox.showinfo("Sucesso", "Resultados importados com sucesso!")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao importar resultados: {str(e)}")
+        def download(task):
+            # download_results também atualiza o cache usado pela linha de comando
+            results_df, error = self.data_manager.download_results(
+                progress_callback=lambda received, total: task.report_progress(
+                    received // 1024, (total or 0) // 1024, "Baixando resultados (KB)..."
+                )
+            )
+            if error:
+                # Um cancelamento durante o download chega aqui como erro
+                task.check_cancelled()
+                raise RuntimeError(error)
+            task.check_cancelled()
+            
+            # Criar gerenciador de estatísticas e preparar os textos fora da interface
+            from lottery_statistics import LotteryStatistics
+            stats_manager = LotteryStatistics(results_df)
+            results_text = self.build_results_text(results_df)
+            task.check_cancelled()
+            stats_text = stats_manager.get_summary_statistics()
+            return stats_manager, results_text, stats_text
+        
+        def on_success(result):
+            self.show_loaded_results(*result)
+            # Conferir os jogos contra o novo sorteio em segundo plano
+            self.check_tickets(self.stats_manager)
+            messagebox.showinfo("Sucesso", "Resultados importados com sucesso!")
+        
+        # Cliques repetidos durante o download são ignorados
+        self.run_task(
+            'importação',
+            download,
+            on_success=on_success,
+            error_prefix="Erro ao importar resultados",
+            status_text="Importando resultados...",
+            coalesce='ignore'
+        )
+    
+    def show_loaded_results(self, stats_manager, results_text: str, stats_text: str):
+        """Usar os resultados carregados e atualizar as abas e as cores"""
+        self.stats_manager = stats_manager
+        
+        # Atualizar o gerenciador de estratégias
+        self.strategy_manager.set_stats_manager(self.stats_manager)
         
-        # Executar em uma thread separada
-        thread = threading.Thread(target=download)
-        thread.daemon = True
-        thread.start()
+        # Atualizar interface
+        if results_text:
+            self.show_text('resultados', results_text)
+        self.update_number_colors()
+        self.show_text('estatísticas', stats_text)
     
-    def update_results_display(self, results_df):
-        """Atualizar display de resultados"""
+    def check_tickets(self, stats_manager):
+        """
+        Conferir os jogos gerados contra o sorteio mais recente
+        
+        Só o novo sorteio é avaliado: os jogos da sessão são comparados como
+        máscaras de bits (GameManager.check_draw) e os jogos do banco local
+        pelo índice, para cada concurso ainda não conferido. O resumo é
+        inserido no topo do histórico.
+        """
+        storage = self.storage
+        
+        def check(task):
+            results_df = stats_manager.results_data
+            number_columns = list(results_df.filter(regex='Bola|Dezena').columns)[:6]
+            draws = results_df.sort_values('Concurso')
+            latest = draws.iloc[-1]
+            
+            sections = []
+            if self.game_manager.games_history:
+                summary = self.game_manager.check_draw([int(latest[col]) for col in number_columns])
+                sections.append(self.format_check_summary("Jogos desta sessão", summary))
+            
+            if storage:
+                # Concursos ainda não conferidos (na primeira vez, apenas o último)
+                last_checked = storage.last_checked_contest()
+                if last_checked is None:
+                    pending = draws.iloc[-1:]
+                else:
+                    pending = draws[draws['Concurso'] > last_checked]
+                for position, (_, row) in enumerate(pending.iterrows()):
+                    task.report_progress(position, len(pending), "Conferindo jogos...")
+                    summary = storage.check_draw(int(row['Concurso']), [int(row[col]) for col in number_columns])
+                    if summary['tickets']:
+                        sections.append(self.format_check_summary(
+                            f"Banco local - concurso {int(row['Concurso'])}", summary
+                        ))
+            
+            if not sections:
+                return ""
+            drawn = ", ".join(f"{n:02d}" for n in sorted(int(latest[col]) for col in number_columns))
+            header = (f"=== Conferência do concurso {int(latest['Concurso'])} "
+                      f"({self.data_manager.format_draw_date(latest.get('Data do Sorteio'))}): {drawn} ===")
+            return "\n".join([header] + sections) + "\n\n"
+        
+        def on_success(text):
+            if text:
+                self.ui_components['text_areas']['histórico'].insert("0.0", text)
+        
+        self.run_task(
+            'conferência',
+            check,
+            on_success=on_success,
+            error_prefix="Erro ao conferir jogos",
+            status_text="Conferindo jogos..."
+        )
+    
+    @staticmethod
+    def format_check_summary(title: str, summary) -> str:
+        """Formatar o resumo de uma conferência (ver GameManager.check_draw)"""
+        hits = summary['hits']
+        lines = [f"{title}: {summary['tickets']} jogos - {hits[4]} quadra(s), "
+                 f"{hits[5]} quina(s), {hits[6]} sena(s)"]
+        for numbers, matches in sorted(summary['winners'], key=lambda winner: -winner[1]):
+            label = "SENA" if matches == 6 else "Quina"
+            lines.append(f"    🎯 {label}: " + ", ".join(f"{n:02d}" for n in sorted(numbers)))
+        return "\n".join(lines)
+    
+    def build_results_text(self, results_df) -> str:
+        """Montar o texto da aba de resultados (pode rodar fora da interface)"""
         if results_df.empty:
-            return
+            return ""
             
         results_text = "Últimos Resultados da Mega Sena:\n\n"
         
-        for _, row in results_df.iterrows():
-            concurso = row.get('Concurso', 'N/A')
-            data_sorteio = row.get('Data do Sorteio', 'N/A')
-            
-            numeros = self.data_manager.process_game_numbers(row)
+        for concurso, data_sorteio, numeros in self.data_manager.iter_draws(results_df):
             if numeros:
                 numeros_str = self.data_manager.format_game_for_display(numeros)
                 results_text += f"Concurso {concurso} ({data_sorteio})\n"
                 results_text += f"Números: {numeros_str}\n"
                 results_text += "=" * 50 + "\n"
         
-        self.ui_components['text_areas']['resultados'].delete("0.0", "end")
-        self.ui_components['text_areas']['resultados'].insert("0.0", results_text)
+        return results_text
+    
+    def update_results_display(self, results_df):
+        """Atualizar display de resultados"""
+        if results_df.empty:
+            return
+        
+        self.run_task(
+            'resultados',
+            lambda task: self.build_results_text(results_df),
+            on_success=lambda text: self.show_text('resultados', text),
+            error_prefix="Erro ao exibir resultados",
+            status_text="Preparando resultados..."
+        )
+    
+    def show_text(self, tab: str, text: str):
+        """Substituir o conteúdo da área de texto de uma aba"""
+        with METRICS.measure(f'ui.{tab}'):
+            self.ui_components['text_areas'][tab].delete("0.0", "end")
+            self.ui_components['text_areas'][tab].insert("0.0", text)
+    
+    def toggle_metrics(self):
+        """Ligar ou desligar as métricas pela aba Desempenho"""
+        METRICS.enable(self.ui_components['metrics_var'].get(), self.ui_components['profiling_var'].get())
+        self.refresh_performance()
+    
+    def refresh_performance(self):
+        """Mostrar a latência por operação, os contadores e os perfis capturados"""
+        text_area = self.ui_components['text_areas']['desempenho']
+        text_area.delete("0.0", "end")
+        text_area.insert("0.0", METRICS.report(include_profiles=True))
+    
+    def reset_performance(self):
+        """Descartar as medições feitas até agora"""
+        METRICS.reset()
+        self.last_generation_allocations = None
+        self.refresh_performance()
+    
+    def show_memory_report(self):
+        """Mostrar a memória das estruturas carregadas na aba Desempenho"""
+        from manager_memory import collect_memory, format_memory_report
+        
+        text_areas = {
+            name: area for name, area in self.ui_components['text_areas'].items() if name != 'desempenho'
+        }
+        entries = collect_memory(self.stats_manager, self.game_manager, text_areas)
+        self.show_text('desempenho', format_memory_report(entries, self.last_generation_allocations))
     
     def update_number_colors(self):
         """Atualizar cores dos botões baseado nas frequências"""
         if self.stats_manager:
-            for number, btn in self.number_buttons.items():
-                if number not in self.game_manager.get_selected_numbers():
-                    color = self.stats_manager.get_color_for_frequency(number)
-                    btn.configure(fg_color=color)
+            self.color_palette = self.stats_manager.get_color_palette()
+            self.update_button_appearances()
     
     def update_statistics(self):
         """Atualizar texto de estatísticas"""
         if self.stats_manager:
-            stats_text = self.stats_manager.get_summary_statistics()
-            self.ui_components['text_areas']['estatísticas'].delete("0.0", "end")
-            self.ui_components['text_areas']['estatísticas'].insert("0.0", stats_text)
+            stats_manager = self.stats_manager
+            self.run_task(
+                'estatísticas',
+                lambda task: stats_manager.get_summary_statistics(),
+                on_success=lambda text: self.show_text('estatísticas', text),
+                error_prefix="Erro ao calcular estatísticas",
+                status_text="Calculando estatísticas..."
+            )
     
     def search_results(self):
         """Buscar nos resultados"""
@@ -412,26 +778,28 @@ class LotteryApp:
             messagebox.showwarning("Aviso", "Importe os resultados primeiro!")
             return
         
-        try:
-            search_type = self.ui_components['search_type'].get()
-            search_value = self.ui_components['search_var'].get()
-            
-            # Realizar a busca
-            filtered_df = self.search_manager.search(
-                self.stats_manager.results_data,
-                search_type,
-                search_value
-            )
-            
-            # Formatar e exibir resultados
-            results_text = self.search_manager.format_search_results(filtered_df)
-            self.ui_components['text_areas']['resultados'].delete("0.0", "end")
-            self.ui_components['text_areas']['resultados'].insert("0.0", results_text)
+        search_type = self.ui_components['search_type'].get()
+        search_value = self.ui_components['search_var'].get()
+        stats_manager = self.stats_manager
+        results_data = stats_manager.results_data
+        
+        def search(task):
+            # Realizar a busca (Soma/Característica usam a tabela de características, calculada uma vez)
+            features = stats_manager.draw_features() if search_type in self.search_manager.feature_search_types else None
+            filtered_df = self.search_manager.search(results_data, search_type, search_value, features)
+            task.check_cancelled()
             
-        except ValueError as e:
-            messagebox.showerror("Erro", str(e))
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro na pesquisa: {str(e)}")
+            # Formatar resultados
+            return self.search_manager.format_search_results(filtered_df)
+        
+        # Uma nova busca substitui a anterior ainda em andamento
+        self.run_task(
+            'pesquisa',
+            search,
+            on_success=lambda text: self.show_text('resultados', text),
+            error_prefix="Erro na pesquisa",
+            status_text="Pesquisando..."
+        )
     
     def export_simulations(self):
         """Exportar simulações para arquivo"""
@@ -502,24 +870,30 @@ class LotteryApp:
             # Definir o gerenciador de estatísticas para o gerenciador de estratégia
             self.strategy_manager.set_stats_manager(self.stats_manager)
             
-            # Gerar jogos estratégicos
-            games = self.strategy_manager.generate_strategic_games(
-                num_games=num_games,
-                favorite_numbers=favorite_numbers,
-                filtered_numbers=self.filtered_numbers
-            )
-            
-            # Salvar jogos no histórico
-            for game in games:
-                self.save_game_to_history(game)
+            def on_success(result):
+                self.on_games_generated(result)
+                messagebox.showinfo(
+                    "Sucesso", 
+                    f"Gerados {len(result[0])} jogos estratégicos!"
+                )
             
-            # Mostrar o primeiro jogo
-            if games:
-                self.display_game(games[0])
-                
-            messagebox.showinfo(
-                "Sucesso", 
-                f"Gerados {len(games)} jogos estratégicos!"
+            # Gerar jogos estratégicos
+            filtered_numbers = set(self.filtered_numbers)
+            strategy_manager = self.strategy_manager
+            self.run_task(
+                'geração',
+                lambda task: self.generate_and_save(
+                    task,
+                    lambda: strategy_manager.generate_strategic_games(
+                        num_games=num_games,
+                        favorite_numbers=favorite_numbers,
+                        filtered_numbers=filtered_numbers
+                    ),
+                    'estrategico'
+                ),
+                on_success=on_success,
+                error_prefix="Erro ao gerar jogos",
+                status_text="Gerando jogos estratégicos..."
             )
             
         except ValueError as e:
@@ -547,27 +921,52 @@ class LotteryApp:
         # Solicitar local para salvar
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
+            filetypes=[
+                ("Excel files", "*.xlsx"),
+                ("CSV files", "*.csv"),
+                ("Parquet files", "*.parquet"),
+                ("Conjunto de jogos (binário)", "*.ltk")
+            ],
             title="Exportar como Resultados"
         )
         
         if not file_path:
             return  # Usuário cancelou
         
-        # Exportar no formato de resultados
-        error = self.data_manager.export_results_format(
-            self.game_manager.games_history, 
-            file_path
-        )
+        # Cópia compacta (4 bytes por jogo) para a tarefa não ver jogos novos
+        games_history = self.game_manager.games_history[:]
         
-        if error:
-            messagebox.showerror("Erro", f"Erro ao exportar: {error}")
-        else:
-            messagebox.showinfo("Sucesso", "Jogos exportados com sucesso no formato de resultados oficiais!")
+        def export(task):
+            # Exportar no formato de resultados, gravando em blocos
+            error = self.data_manager.export_results_format(
+                games_history,
+                file_path,
+                progress_callback=lambda done, total: task.report_progress(
+                    done, total, "Exportando jogos..."
+                )
+            )
+            if error:
+                raise RuntimeError(error)
+        
+        self.run_task(
+            'exportação',
+            export,
+            on_success=lambda _: messagebox.showinfo(
+                "Sucesso", "Jogos exportados com sucesso no formato de resultados oficiais!"
+            ),
+            error_prefix="Erro ao exportar",
+            status_text="Exportando jogos...",
+            coalesce='ignore'
+        )
     
     def run(self):
         """Iniciar a aplicação"""
-        self.window.mainloop()
+        try:
+            self.window.mainloop()
+        finally:
+            self.task_manager.shutdown()
+            if self.storage:
+                self.storage.close()
 
 if __name__ == "__main__":
     app = LotteryApp()
@@ -1,35 +1,360 @@
-from tkinter import filedialog, messagebox
+import os
+import re
+import struct
+import sys
+import numpy as np
 import pandas as pd
-import requests
-from io import BytesIO
-from typing import Tuple, Optional
+from itertools import islice
+from typing import Tuple, Optional, Iterator, Iterable, List, Callable, Dict, Any
 from datetime import datetime
 
+from lottery_modalities import MEGA_SENA, Modality, get_modality
+from manager_metrics import METRICS, timed
+from manager_game import GameManager
+from manager_storage import StorageManager
+
 class DataManager:
-    API_URL = "https://servicebus2.caixa.gov.br/portaldeloterias/api/resultados/download?modalidade=Mega-Sena"
+    API_URL = MEGA_SENA.api_url
+    # Banco local com os resultados importados (usado pelo app e pela linha de comando)
+    CACHE_PATH = StorageManager.DEFAULT_PATH
+    # Última planilha baixada
+    WORKBOOK_PATH = os.path.join(os.path.dirname(StorageManager.DEFAULT_PATH), 'resultados.xlsx')
+    
+    _downloader = None
+    
+    @staticmethod
+    def workbook_path(modality: Optional[Modality] = None) -> str:
+        """Path of the last downloaded workbook of a modality"""
+        modality = modality or MEGA_SENA
+        if modality is MEGA_SENA:
+            return DataManager.WORKBOOK_PATH
+        return os.path.join(os.path.dirname(DataManager.WORKBOOK_PATH), f'resultados-{modality.key}.xlsx')
+    
+    @staticmethod
+    def get_downloader():
+        """Shared DownloadManager, so every download reuses the same pooled session"""
+        if DataManager._downloader is None:
+            from manager_download import DownloadManager
+            DataManager._downloader = DownloadManager()
+        return DataManager._downloader
     
     @staticmethod
-    def download_results() -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    @timed()
+    def download_results(progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                         modality: Optional[Modality] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """
         Downloads and processes lottery results from the API
+        
+        The workbook is streamed to workbook_path(modality) with retries and
+        resume (see DownloadManager) and then parsed from disk. Only
+        Mega-Sena results are cached in the local store.
+        Args:
+            progress_callback: Called with (bytes received, total bytes or None)
+            modality: Lottery modality (defaults to Mega-Sena)
         Returns: Tuple[DataFrame or None, error message or None]
         """
+        modality = modality or MEGA_SENA
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+            url = DataManager.API_URL if modality is MEGA_SENA else modality.api_url
+            file_path = DataManager.get_downloader().download(
+                url, DataManager.workbook_path(modality), progress_callback
+            )
             
-            response = requests.get(DataManager.API_URL, headers=headers, timeout=10)
-            response.raise_for_status()
+            df = DataManager.read_results_workbook(file_path, modality)
+            if modality is MEGA_SENA:
+                DataManager.save_results_cache(df)
             
-            df = pd.read_excel(BytesIO(response.content))
-            df = df.sort_values('Concurso', ascending=False)
+            return df, None
+            
+        except Exception as e:
+            return None, str(e)
+    
+    @staticmethod
+    def save_results_cache(df: pd.DataFrame, file_path: Optional[str] = None) -> Optional[str]:
+        """
+        Saves the results DataFrame to the local SQLite store
+        Returns: error message if any, None otherwise
+        """
+        try:
+            storage = StorageManager(file_path or DataManager.CACHE_PATH)
+            try:
+                storage.save_results(df)
+            finally:
+                storage.close()
+            return None
+        except Exception as e:
+            return str(e)
+    
+    @staticmethod
+    @timed()
+    def load_results(file_path: Optional[str] = None, modality: Optional[Modality] = None
+                     ) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        Loads lottery results from a file (.xlsx, .csv, .pkl or .db) or, when
+        no path is given, from the local store written by download_results
+        (the last downloaded workbook for modalities other than Mega-Sena)
+        Returns: Tuple[DataFrame or None, error message or None]
+        """
+        modality = modality or MEGA_SENA
+        try:
+            if not file_path:
+                file_path = DataManager.CACHE_PATH if modality is MEGA_SENA else DataManager.workbook_path(modality)
+            if not os.path.exists(file_path):
+                return None, f"Arquivo não encontrado: {file_path} (importe os resultados primeiro)"
+            
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension == '.db':
+                storage = StorageManager(file_path)
+                try:
+                    df = storage.load_results()
+                finally:
+                    storage.close()
+                if df.empty:
+                    return None, "Nenhum resultado salvo (importe os resultados primeiro)"
+            elif extension == '.pkl':
+                df = DataManager.normalize_results(pd.read_pickle(file_path), modality)
+            elif extension == '.csv':
+                df = DataManager.normalize_results(pd.read_csv(file_path), modality)
+            else:
+                df = DataManager.read_results_workbook(file_path, modality)
             
             return df, None
             
         except Exception as e:
             return None, str(e)
     
+    @staticmethod
+    def load_modalities(keys: Iterable[str], download: bool = False, max_workers: int = 4
+                        ) -> Dict[str, Tuple[Optional[pd.DataFrame], Optional[str]]]:
+        """
+        Loads the results of several modalities concurrently in this process
+        
+        Each modality runs in a worker thread; downloads share the pooled
+        session of get_downloader and the combinatorial tables are cached
+        per (pool size, picks), so nothing is rebuilt per modality.
+        Args:
+            keys: Modality keys (see lottery_modalities.MODALITIES)
+            download: Download fresh results instead of reading the local files
+            max_workers: Maximum concurrent threads
+        Returns: Dict key -> (DataFrame or None, error message or None)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        modalities = [get_modality(key) for key in keys]
+        
+        def load(modality: Modality):
+            if download:
+                return DataManager.download_results(modality=modality)
+            return DataManager.load_results(modality=modality)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(modalities)))) as executor:
+            results = list(executor.map(load, modalities))
+        return {modality.key: result for modality, result in zip(modalities, results)}
+    
+    # Colunas das dezenas no arquivo oficial ("Bola1") ou em versões antigas ("Dezena 1")
+    NUMBER_COLUMN_PATTERN = re.compile(r'^\s*(?:bola|dezena)\s*(\d+)\s*$', re.IGNORECASE)
+    
+    @staticmethod
+    def resolve_results_schema(columns: Iterable[Any]) -> Dict[str, Any]:
+        """
+        Locates the contest, date and number columns in a header row
+        Returns: Dict with 'contest', 'date' (or None) and 'numbers' column positions,
+            numbers ordered by ball
+        """
+        contest = date = None
+        numbers = []
+        for position, name in enumerate(columns):
+            name = str(name).strip() if name is not None else ''
+            match = DataManager.NUMBER_COLUMN_PATTERN.match(name)
+            if match:
+                numbers.append((int(match.group(1)), position))
+            elif name.lower() == 'concurso':
+                contest = position
+            elif name.lower().startswith('data'):
+                date = position if date is None else date
+        
+        if contest is None or not numbers:
+            raise ValueError("Colunas 'Concurso' e Bola1..BolaN não encontradas nos resultados")
+        return {'contest': contest, 'date': date, 'numbers': [position for _, position in sorted(numbers)]}
+    
+    @staticmethod
+    @timed()
+    def read_results_workbook(source, modality: Optional[Modality] = None) -> pd.DataFrame:
+        """
+        Reads the official results workbook in streaming mode
+        
+        The sheet is read with openpyxl in read-only mode; the header is
+        resolved once and only the contest, date and number cells are kept,
+        so prize and city columns are never materialized.
+        
+        Args:
+            source: Path or file-like object with the .xlsx content
+            modality: Lottery modality (defaults to Mega-Sena)
+        Returns: DataFrame in the compact layout of build_results_frame
+        """
+        from openpyxl import load_workbook
+        
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            schema = header_row = None
+            for header_row, header in enumerate(sheet.iter_rows(max_row=20, values_only=True), 1):
+                if header and any(str(cell).strip().lower() == 'concurso' for cell in header if cell is not None):
+                    schema = DataManager.resolve_results_schema(header)
+                    break
+            if schema is None:
+                raise ValueError("Cabeçalho dos resultados não encontrado na planilha")
+            
+            positions = [schema['contest'], schema['date'], *schema['numbers']]
+            # Só as células até a última coluna usada são lidas
+            width = max(p for p in positions if p is not None) + 1
+            kept = [
+                tuple(None if p is None or p >= len(row) else row[p] for p in positions)
+                for row in sheet.iter_rows(min_row=header_row + 1, max_col=width, values_only=True)
+                if row
+            ]
+        finally:
+            workbook.close()
+        METRICS.count('concursos.lidos', len(kept))
+        
+        columns = list(zip(*kept)) if kept else [()] * len(positions)
+        return DataManager.build_results_frame(columns[0], columns[1], columns[2:], modality)
+    
+    @staticmethod
+    def normalize_results(df: pd.DataFrame, modality: Optional[Modality] = None) -> pd.DataFrame:
+        """Converts a results DataFrame (any column variant) to the compact layout"""
+        schema = DataManager.resolve_results_schema(df.columns)
+        return DataManager.build_results_frame(
+            df.iloc[:, schema['contest']],
+            df.iloc[:, schema['date']] if schema['date'] is not None else [None] * len(df),
+            [df.iloc[:, position] for position in schema['numbers']],
+            modality
+        )
+    
+    @staticmethod
+    @timed()
+    def build_results_frame(contests, dates, numbers, modality: Optional[Modality] = None) -> pd.DataFrame:
+        """
+        Builds the results DataFrame with compact dtypes, validating it vectorially
+        
+        Rows without a contest number (blank lines at the end of the sheet)
+        are dropped; numbers out of range or repeated within a draw raise
+        ValueError, as does a number of ball columns different from the
+        modality picks.
+        Returns: DataFrame with Concurso (uint32), Data do Sorteio (datetime64)
+            and Bola1..BolaN (uint8), most recent contest first
+        """
+        modality = modality or MEGA_SENA
+        pool_size = modality.pool_size
+        if len(numbers) != modality.picks:
+            raise ValueError(f"{modality.name}: esperadas {modality.picks} dezenas por concurso, "
+                             f"encontradas {len(numbers)} colunas")
+        
+        contest_values = pd.to_numeric(pd.Series(contests, dtype=object), errors='coerce').to_numpy()
+        number_values = np.column_stack([
+            pd.to_numeric(pd.Series(column, dtype=object), errors='coerce').to_numpy(dtype=float)
+            for column in numbers
+        ]) if len(contest_values) else np.empty((0, len(numbers)))
+        
+        keep = ~np.isnan(contest_values.astype(float))
+        contest_values, number_values = contest_values[keep].astype(float), number_values[keep]
+        date_values = pd.Series(dates, dtype=object)[keep]
+        
+        invalid = np.isnan(number_values).any(axis=1) | (number_values < 1).any(axis=1) | (number_values > pool_size).any(axis=1)
+        if number_values.shape[1] > 1:
+            invalid |= (np.diff(np.sort(number_values, axis=1), axis=1) == 0).any(axis=1)
+        if invalid.any():
+            bad = contest_values[invalid][:5].astype(np.int64).tolist()
+            raise ValueError(f"Dezenas inválidas em {int(invalid.sum())} concurso(s), ex: {bad}")
+        if (contest_values < 1).any() or (contest_values != np.floor(contest_values)).any():
+            raise ValueError("Número de concurso inválido nos resultados")
+        
+        # Datas como texto dd/mm/aaaa (planilha oficial) ou já convertidas (datetime)
+        is_text = date_values.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        parsed_dates = pd.Series(pd.NaT, index=date_values.index, dtype='datetime64[ns]')
+        if is_text.any():
+            parsed_dates[is_text] = pd.to_datetime(date_values[is_text], format='%d/%m/%Y', errors='coerce')
+        if (~is_text).any():
+            parsed_dates[~is_text] = pd.to_datetime(date_values[~is_text], errors='coerce')
+        
+        order = np.argsort(-contest_values, kind='stable')
+        frame = {
+            'Concurso': contest_values[order].astype(np.uint32),
+            'Data do Sorteio': parsed_dates.to_numpy(dtype='datetime64[ns]')[order]
+        }
+        for ball, column in enumerate(number_values[order].T, 1):
+            frame[f'Bola{ball}'] = column.astype(np.uint8)
+        return pd.DataFrame(frame)
+    
+    @staticmethod
+    def format_draw_date(value) -> str:
+        """Formats a draw date (datetime or dd/mm/yyyy text) for display"""
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return 'N/A'
+        if hasattr(value, 'strftime'):
+            return value.strftime('%d/%m/%Y')
+        return str(value)
+    
+    @staticmethod
+    def iter_draws(df: pd.DataFrame) -> Iterator[Tuple[Any, str, List[int]]]:
+        """
+        Iterates over the draws resolving the number columns once
+        Returns: Iterator of (contest, formatted date, sorted numbers)
+        """
+        number_columns = list(df.filter(regex='Bola|Dezena').columns)
+        numbers = np.sort(df[number_columns].to_numpy(dtype=float), axis=1)
+        contests = df['Concurso'].tolist() if 'Concurso' in df else ['N/A'] * len(df)
+        dates = df['Data do Sorteio'] if 'Data do Sorteio' in df else pd.Series([None] * len(df))
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            dates = dates.dt.strftime('%d/%m/%Y').fillna('N/A').tolist()
+        else:
+            dates = [DataManager.format_draw_date(value) for value in dates]
+        
+        for contest, date, row in zip(contests, dates, numbers):
+            yield contest, date, [int(n) for n in row if not np.isnan(n)]
+    
+    @staticmethod
+    def read_games(file_path: Optional[str] = None, chunk_size: int = 10000,
+                   modality: Optional[Modality] = None) -> Iterator[List[List[int]]]:
+        """
+        Reads games from a text file (one game per line) in chunks
+        Reads from stdin when file_path is None or "-". Invalid lines are skipped;
+        multi-number bets raise ValueError (they are analyzed by LotteryStatistics.analyze_bet).
+        Binary ticket sets (.ltk) are read straight from the memory map.
+        Returns: Iterator of lists with up to chunk_size games
+        """
+        if file_path and file_path.lower().endswith(DataManager.TICKET_SET_EXTENSION):
+            from lottery_combinations import unrank_games
+            header, ranks = DataManager.open_ticket_set(file_path)
+            for start in range(0, len(ranks), chunk_size):
+                yield unrank_games(ranks[start:start + chunk_size], header['picks'], header['pool_size']).tolist()
+            return
+        
+        if file_path in (None, '-'):
+            file = sys.stdin
+        else:
+            file = open(file_path, 'r', encoding='utf-8')
+        
+        try:
+            chunk = []
+            for line_number, line in enumerate(file, 1):
+                game = GameManager.parse_game_line(line, modality)
+                if game is None:
+                    if GameManager.parse_game_line(line, modality, allow_bets=True):
+                        # A multi-number bet scored as a single ticket would report wrong hits
+                        raise ValueError(f"Linha {line_number}: aposta de mais de {(modality or MEGA_SENA).picks} "
+                                         f"números; use o comando bet para apostas múltiplas")
+                    continue
+                chunk.append(game)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            if file is not sys.stdin:
+                file.close()
+    
     @staticmethod
     def export_games(games_history: str, file_path: str) -> Optional[str]:
         """
@@ -66,93 +391,375 @@ class DataManager:
         """
         return ', '.join(f"{num:02d}" for num in sorted(numeros))
     
-    @staticmethod
-    def export_as_results(self):
-        """Exportar simulações no formato dos resultados oficiais"""
-        # Verificar se há jogos no histórico
-        if not self.game_manager.games_history:
-            messagebox.showwarning("Aviso", "Nenhum jogo para exportar!")
-            return
-        
-        # Solicitar local para salvar
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
-            title="Exportar como Resultados"
-        )
-        
-        if not file_path:
-            return  # Usuário cancelou
-        
-        # Exportar no formato de resultados
-        error = self.data_manager.export_results_format(
-            self.game_manager.games_history, 
-            file_path
-        )
-        
-        if error:
-            messagebox.showerror("Erro", f"Erro ao exportar: {error}")
-        else:
-            messagebox.showinfo("Sucesso", "Jogos exportados com sucesso no formato de resultados oficiais!")
-
-    @staticmethod
-    def export_results_format(self, games_history, file_path: str) -> Optional[str]:
+    RESULTS_COLUMNS = [
+        'Concurso', 'Data do Sorteio', 'Bola1', 'Bola2', 'Bola3',
+        'Bola4', 'Bola5', 'Bola6', 'Arrecadacao_Total'
+    ]
+    EXPORT_FORMATS = ('.csv', '.parquet', '.xlsx', '.ltk')
+    
+    @timed()
+    def export_results_format(self, games_history, file_path: str,
+                              progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Optional[str]:
         """
         Exporta os jogos gerados no mesmo formato dos resultados da Mega Sena
         
         Args:
-            games_history: Lista de tuplas [(timestamp, numbers)]
-            file_path: Caminho do arquivo para salvar (formato Excel .xlsx)
+            games_history: Lista de tuplas [(timestamp, numbers)] ou de jogos
+            file_path: Caminho do arquivo para salvar (.xlsx, .csv, .parquet ou .ltk)
+            progress_callback: Função chamada com (linhas gravadas, total ou None)
             
         Returns:
             Mensagem de erro se houver, None caso contrário
         """
         try:
-            import pandas as pd
-            from datetime import datetime
+            # Sem extensão conhecida, mantém o padrão Excel
+            if not file_path.lower().endswith(self.EXPORT_FORMATS):
+                file_path += '.xlsx'
             
-            # Criar DataFrame vazio com as mesmas colunas dos resultados
-            df = pd.DataFrame(columns=[
-                'Concurso', 'Data do Sorteio', 'Bola1', 'Bola2', 'Bola3', 
-                'Bola4', 'Bola5', 'Bola6', 'Arrecadacao_Total'
-            ])
+            self.export_games_stream(games_history, file_path, progress_callback)
+            return None
+        except Exception as e:
+            return str(e)
+    
+    def export_games_stream(self, games: Iterable, file_path: str,
+                            progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                            chunk_size: int = 50000) -> int:
+        """
+        Grava os jogos no formato dos resultados sem montar um DataFrame
+        
+        As linhas são geradas sob demanda e gravadas em blocos, então a memória
+        usada não depende da quantidade de jogos. O formato vem da extensão:
+        .csv, .parquet (requer pyarrow), .xlsx (openpyxl em modo write-only)
+        ou .ltk (binário, ver export_ticket_set).
+        
+        Args:
+            games: Tuplas (timestamp, numbers), listas de números ou matriz (n, 6);
+                pode ser um iterador
+            file_path: Caminho do arquivo
+            progress_callback: Função chamada com (linhas gravadas, total ou None) a cada bloco
+            chunk_size: Linhas por bloco
             
-            # Preencher com os jogos gerados
-            for i, (timestamp, numbers) in enumerate(games_history, 1):
+        Returns:
+            Quantidade de linhas gravadas
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == self.TICKET_SET_EXTENSION:
+            # Formato binário: só os jogos, sem as colunas dos resultados
+            return self.export_ticket_set(games, file_path, progress_callback=progress_callback)
+        
+        total = len(games) if hasattr(games, '__len__') else None
+        rows = self._iter_result_rows(games)
+        
+        if extension == '.csv':
+            writer = self._write_csv
+        elif extension == '.parquet':
+            writer = self._write_parquet
+        elif extension == '.xlsx':
+            writer = self._write_xlsx
+        else:
+            raise ValueError(f"Formato não suportado: {extension or file_path}")
+        
+        return writer(rows, file_path, total, progress_callback, chunk_size)
+    
+    @staticmethod
+    def _iter_result_rows(games: Iterable) -> Iterator[tuple]:
+        """Gera as linhas (Concurso, Data do Sorteio, Bola1..Bola6, Arrecadacao_Total)"""
+        today = datetime.now().strftime('%d/%m/%Y')
+        last_day, last_date_str = None, today
+        
+        for i, item in enumerate(games, 1):
+            if isinstance(item, tuple) and len(item) == 2 and not isinstance(item[0], (int, np.integer)):
+                timestamp, numbers = item
                 if isinstance(timestamp, datetime):
-                    date_str = timestamp.strftime('%d/%m/%Y')
+                    # strftime só é chamado quando o dia muda
+                    day = (timestamp.year, timestamp.month, timestamp.day)
+                    if day != last_day:
+                        last_day, last_date_str = day, timestamp.strftime('%d/%m/%Y')
+                    date_str = last_date_str
                 else:
                     # Se for string, tenta extrair a data
                     try:
                         date_parts = timestamp.split('[')[1].split(']')[0].strip()
                         date_str = date_parts.split()[0]
-                    except:
-                        date_str = datetime.now().strftime('%d/%m/%Y')
-                
-                # Ordenar os números
-                sorted_numbers = sorted(numbers)
-                
-                # Criar linha para o DataFrame
-                row = {
-                    'Concurso': f'SIM-{i:04d}',  # Prefixo SIM para indicar que é simulado
-                    'Data do Sorteio': date_str,
-                }
-                
-                # Adicionar as bolas
-                for j, num in enumerate(sorted_numbers, 1):
-                    row[f'Bola{j}'] = num
-                    
-                # Adicionar arrecadação fictícia
-                row['Arrecadacao_Total'] = 0
-                
-                # Adicionar ao DataFrame
-                df.loc[len(df)] = row
+                    except Exception:
+                        date_str = today
+            else:
+                numbers, date_str = item, today
             
-            # Salvar como Excel
-            if not file_path.endswith('.xlsx'):
-                file_path += '.xlsx'
+            # Prefixo SIM para indicar que é simulado; arrecadação fictícia
+            yield (f'SIM-{i:04d}', date_str, *sorted(int(n) for n in numbers), 0)
+    
+    @staticmethod
+    def _write_csv(rows: Iterator[tuple], file_path: str, total: Optional[int],
+                   progress_callback: Optional[Callable], chunk_size: int) -> int:
+        written = 0
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(','.join(DataManager.RESULTS_COLUMNS) + '\n')
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                f.write(''.join(','.join(map(str, row)) + '\n' for row in chunk))
+                written += len(chunk)
+                if progress_callback:
+                    progress_callback(written, total)
+        return written
+    
+    @staticmethod
+    def _write_xlsx(rows: Iterator[tuple], file_path: str, total: Optional[int],
+                    progress_callback: Optional[Callable], chunk_size: int) -> int:
+        from openpyxl import Workbook
+        
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(DataManager.RESULTS_COLUMNS)
+        
+        written = 0
+        for row in rows:
+            sheet.append(row)
+            written += 1
+            if progress_callback and written % chunk_size == 0:
+                progress_callback(written, total)
+        
+        workbook.save(file_path)
+        if progress_callback:
+            progress_callback(written, total)
+        return written
+    
+    @staticmethod
+    def _write_parquet(rows: Iterator[tuple], file_path: str, total: Optional[int],
+                       progress_callback: Optional[Callable], chunk_size: int) -> int:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exportar em Parquet requer o pacote pyarrow")
+        
+        schema = pa.schema(
+            [('Concurso', pa.string()), ('Data do Sorteio', pa.string())]
+            + [(f'Bola{i}', pa.uint8()) for i in range(1, 7)]
+            + [('Arrecadacao_Total', pa.int64())]
+        )
+        
+        written = 0
+        with pq.ParquetWriter(file_path, schema) as writer:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                columns = list(zip(*chunk))
+                writer.write_batch(pa.record_batch(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                written += len(chunk)
+                if progress_callback:
+                    progress_callback(written, total)
+        return written
+    
+    # --- Conjuntos de jogos em formato binário (.ltk) ---
+    #
+    # Cabeçalho de 32 bytes seguido de um array uint32 little-endian com o
+    # índice de cada jogo (lottery_combinations.rank_game). O arquivo é aberto
+    # com numpy.memmap, então conferência e análise percorrem o arquivo sem
+    # carregá-lo na memória. Com a flag de ordenação, os índices estão em
+    # ordem crescente e o próprio array serve de índice para busca binária.
+    TICKET_SET_EXTENSION = '.ltk'
+    TICKET_SET_MAGIC = b'LTKS'
+    TICKET_SET_VERSION = 1
+    TICKET_SET_HEADER = struct.Struct('<4sHHBB6xQq')  # magic, versão, flags, universo, dezenas, jogos, criação
+    TICKET_SET_SORTED = 0x1
+    
+    @staticmethod
+    def _iter_rank_chunks(games, chunk_size: int) -> Iterator[np.ndarray]:
+        """Blocos uint32 de índices a partir de um GamesHistory, array de índices ou jogos"""
+        from lottery_combinations import rank_games
+        
+        if hasattr(games, 'ranks'):
+            ranks = games.ranks()
+            for start in range(0, len(ranks), chunk_size):
+                yield ranks[start:start + chunk_size]
+        elif isinstance(games, np.ndarray) and games.ndim == 1:
+            for start in range(0, len(games), chunk_size):
+                yield games[start:start + chunk_size].astype('<u4', copy=False)
+        else:
+            games = iter(games)
+            while True:
+                chunk = list(islice(games, chunk_size))
+                if not chunk:
+                    break
+                # Tuplas (timestamp, numbers) do histórico antigo
+                if isinstance(chunk[0], tuple) and len(chunk[0]) == 2:
+                    chunk = [numbers for _, numbers in chunk]
+                yield rank_games(chunk)
+    
+    @staticmethod
+    @timed()
+    def export_ticket_set(games, file_path: str, sort: bool = False, chunk_size: int = 1 << 20,
+                          progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> int:
+        """
+        Grava os jogos no formato binário .ltk
+        
+        Args:
+            games: GamesHistory, array de índices (uint32) ou jogos (pode ser um iterador)
+            file_path: Caminho do arquivo
+            sort: Ordena os índices (no próprio arquivo) e marca a flag de ordenação
+            chunk_size: Jogos gravados por bloco
+            progress_callback: Função chamada com (jogos gravados, total ou None)
+        Returns:
+            Quantidade de jogos gravados
+        """
+        from lottery_combinations import POOL_SIZE, PICKS
+        
+        total = len(games) if hasattr(games, '__len__') else None
+        header = DataManager.TICKET_SET_HEADER
+        count = 0
+        try:
+            with open(file_path, 'wb') as f:
+                # O cabeçalho é regravado no fim, com a quantidade de jogos
+                f.write(bytes(header.size))
+                for chunk in DataManager._iter_rank_chunks(games, chunk_size):
+                    chunk.astype('<u4', copy=False).tofile(f)
+                    count += len(chunk)
+                    if progress_callback:
+                        progress_callback(count, total)
                 
-            df.to_excel(file_path, index=False)
-            return None
-        except Exception as e:
-            return str(e)
\ No newline at end of file
+                flags = 0
+                if sort and count:
+                    f.flush()
+                    ranks = np.memmap(f.name, dtype='<u4', mode='r+', offset=header.size, shape=(count,))
+                    ranks.sort()
+                    ranks.flush()
+                    del ranks
+                if sort:
+                    flags |= DataManager.TICKET_SET_SORTED
+                
+                f.seek(0)
+                f.write(header.pack(DataManager.TICKET_SET_MAGIC, DataManager.TICKET_SET_VERSION, flags,
+                                    POOL_SIZE, PICKS, count, int(datetime.now().timestamp())))
+        except Exception:
+            # Um erro no meio da leitura (ex: linha inválida) não deixa um arquivo sem cabeçalho
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        return count
+    
+    @staticmethod
+    def open_ticket_set(file_path: str) -> Tuple[dict, np.ndarray]:
+        """
+        Abre um arquivo .ltk sem carregá-lo (numpy.memmap somente leitura)
+        
+        Returns:
+            Tupla (cabeçalho, array uint32 de índices mapeado do arquivo)
+        """
+        header = DataManager.TICKET_SET_HEADER
+        with open(file_path, 'rb') as f:
+            raw = f.read(header.size)
+        if len(raw) < header.size:
+            raise ValueError(f"Arquivo de jogos inválido: {file_path}")
+        
+        magic, version, flags, pool_size, picks, count, created_at = header.unpack(raw)
+        if magic != DataManager.TICKET_SET_MAGIC:
+            raise ValueError(f"Arquivo de jogos inválido: {file_path}")
+        if version > DataManager.TICKET_SET_VERSION:
+            raise ValueError(f"Versão {version} do arquivo de jogos não suportada")
+        if os.path.getsize(file_path) < header.size + 4 * count:
+            raise ValueError(f"Arquivo de jogos incompleto: {file_path}")
+        
+        info = {
+            'count': count,
+            'sorted': bool(flags & DataManager.TICKET_SET_SORTED),
+            'pool_size': pool_size,
+            'picks': picks,
+            'created_at': datetime.fromtimestamp(created_at)
+        }
+        if not count:
+            return info, np.empty(0, dtype='<u4')
+        return info, np.memmap(file_path, dtype='<u4', mode='r', offset=header.size, shape=(count,))
+    
+    @staticmethod
+    @timed()
+    def import_ticket_set(file_path: str, game_manager: GameManager, tag: str = 'importado') -> int:
+        """
+        Adiciona os jogos de um arquivo .ltk ao histórico do GameManager
+        
+        Returns:
+            Quantidade de jogos importados
+        """
+        _, ranks = DataManager.open_ticket_set(file_path)
+        game_manager.save_ranks(ranks, tag=tag)
+        return len(ranks)
+    
+    @staticmethod
+    @timed()
+    def check_ticket_set(file_path: str, draw_numbers: List[int], chunk_size: int = 1 << 22,
+                         max_listed: int = 50,
+                         progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> dict:
+        """
+        Confere um arquivo .ltk contra um sorteio, em blocos sobre o memmap
+        
+        Returns:
+            Dicionário no formato de GameManager.check_draw
+        """
+        from lottery_combinations import ranks_with_matches, total_combinations, unrank_game
+        
+        info, ranks = DataManager.open_ticket_set(file_path)
+        candidates, candidate_matches = ranks_with_matches(draw_numbers, min_matches=4)
+        hits = np.zeros(7, dtype=np.int64)
+        winners = []
+        
+        if info['sorted']:
+            # Busca binária de cada candidato (quadra ou mais) no arquivo ordenado
+            order = np.argsort(candidates)
+            candidates, candidate_matches = candidates[order], candidate_matches[order]
+            found = np.searchsorted(ranks, candidates, 'right') - np.searchsorted(ranks, candidates, 'left')
+            hits += np.bincount(candidate_matches, weights=found, minlength=7).astype(np.int64)
+            winning = np.flatnonzero((found > 0) & (candidate_matches >= 5))
+            winners = [(unrank_game(int(candidates[i])), int(candidate_matches[i]))
+                       for i in winning for _ in range(int(found[i]))]
+            winners.sort(key=lambda winner: -winner[1])
+            if progress_callback:
+                progress_callback(len(ranks), len(ranks))
+        else:
+            # Tabela de acertos por índice (1 byte por combinação possível):
+            # cada bloco do memmap é conferido com uma única indexação
+            table = np.zeros(total_combinations(), dtype=np.uint8)
+            table[candidates] = candidate_matches
+            for start in range(0, len(ranks), chunk_size):
+                chunk = ranks[start:start + chunk_size]
+                matches = table[chunk]
+                hits += np.bincount(matches, minlength=7)
+                if len(winners) < max_listed:
+                    winners.extend((unrank_game(int(chunk[i])), int(matches[i]))
+                                   for i in np.flatnonzero(matches >= 5)[:max_listed - len(winners)])
+                if progress_callback:
+                    progress_callback(start + len(chunk), len(ranks))
+        
+        return {
+            'tickets': info['count'],
+            'hits': {k: int(hits[k]) for k in (4, 5, 6)},
+            'winners': winners[:max_listed]
+        }
+    
+    @staticmethod
+    def ticket_set_contains(file_path: str, games: List[List[int]]) -> List[bool]:
+        """
+        Verifica se cada jogo está no arquivo .ltk
+        
+        Em arquivos ordenados usa busca binária sobre o memmap; nos demais,
+        percorre o arquivo em blocos.
+        """
+        from lottery_combinations import rank_games
+        
+        info, ranks = DataManager.open_ticket_set(file_path)
+        wanted = rank_games(games)
+        if info['sorted']:
+            positions = np.searchsorted(ranks, wanted)
+            found = positions < len(ranks)
+            found[found] = ranks[positions[found]] == wanted[found]
+            return found.tolist()
+        
+        found = np.zeros(len(wanted), dtype=bool)
+        for start in range(0, len(ranks), 1 << 22):
+            found |= np.isin(wanted, ranks[start:start + (1 << 22)])
+        return found.tolist()
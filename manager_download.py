@@ -0,0 +1,168 @@
+import os
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from manager_metrics import METRICS, timed
+
+
+class DownloadError(Exception):
+    """Falha definitiva de download (após esgotar as tentativas)"""
+
+
+class IncompleteDownload(Exception):
+    """A conexão terminou antes do fim do arquivo"""
+
+
+class DownloadManager:
+    """
+    Downloads em fluxo com sessão persistente, novas tentativas e retomada
+
+    O corpo da resposta é gravado em blocos (iter_content) em um arquivo
+    temporário, então a memória usada não depende do tamanho do arquivo.
+    Se a transferência for interrompida ou a conexão falhar, uma nova
+    tentativa é feita com espera exponencial e continua de onde parou com
+    um cabeçalho Range (validado por If-Range quando o servidor informa
+    ETag ou Last-Modified); se o servidor não aceitar, recomeça do zero.
+    """
+
+    DEFAULT_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    # Sem compressão: os bytes gravados, o Range e o Content-Length/Content-Range
+    # precisam contar os mesmos bytes
+    ACCEPT_ENCODING = 'identity'
+    # Respostas que valem uma nova tentativa
+    RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(self, retries: int = 5, backoff: float = 0.5, max_backoff: float = 30.0,
+                 timeout=(10, 30), chunk_size: int = 64 * 1024,
+                 headers: Optional[Dict[str, str]] = None, pool_size: int = 4):
+        """
+        Args:
+            retries: Novas tentativas após a primeira falha
+            backoff: Espera inicial em segundos (dobra a cada tentativa)
+            max_backoff: Espera máxima entre tentativas
+            timeout: Timeout de conexão e de leitura (por bloco, não do arquivo inteiro)
+            chunk_size: Tamanho dos blocos lidos da resposta
+            headers: Cabeçalhos enviados em todos os pedidos
+            pool_size: Conexões mantidas por host
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        # A sessão reaproveita conexões (keep-alive) entre downloads
+        self.session = requests.Session()
+        self.session.headers.update(headers or self.DEFAULT_HEADERS)
+        self.session.headers['Accept-Encoding'] = self.ACCEPT_ENCODING
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    @timed()
+    def download(self, url: str, file_path: str,
+                 progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """
+        Baixa url para file_path
+
+        O conteúdo é gravado em file_path + '.part' e só substitui file_path
+        quando o download termina, então um arquivo anterior nunca fica pela
+        metade.
+
+        Args:
+            url: Endereço do arquivo
+            file_path: Destino
+            progress_callback: Função chamada com (bytes recebidos, total ou None)
+                a cada bloco; exceções lançadas por ela (ex: cancelamento)
+                interrompem o download
+        Returns:
+            file_path
+        Raises:
+            DownloadError: Quando todas as tentativas falharam ou a resposta
+                não pode ser usada (ex: 404)
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        part_path = file_path + '.part'
+
+        # total e validador (ETag/Last-Modified) sobrevivem entre as tentativas
+        state = {'total': None, 'validator': None}
+        attempt = 0
+        completed = False
+        try:
+            with open(part_path, 'wb') as part:
+                while True:
+                    try:
+                        self._transfer(url, part, state, progress_callback)
+                        break
+                    except (requests.ConnectionError, requests.Timeout,
+                            requests.exceptions.ChunkedEncodingError, IncompleteDownload) as e:
+                        error = e
+                    except requests.HTTPError as e:
+                        if e.response is None or e.response.status_code not in self.RETRY_STATUS:
+                            raise DownloadError(str(e)) from e
+                        error = e
+                    except requests.RequestException as e:
+                        raise DownloadError(str(e)) from e
+
+                    attempt += 1
+                    if attempt > self.retries:
+                        raise DownloadError(f"Download falhou após {attempt} tentativas: {error}") from error
+                    time.sleep(min(self.backoff * 2 ** (attempt - 1), self.max_backoff))
+
+            METRICS.count('bytes.baixados', os.path.getsize(part_path))
+            os.replace(part_path, file_path)
+            completed = True
+            return file_path
+        finally:
+            if not completed and os.path.exists(part_path):
+                os.remove(part_path)
+
+    def _transfer(self, url: str, part, state: Dict, progress_callback: Optional[Callable[[int, Optional[int]], None]]):
+        """Uma tentativa: continua a partir do que já está gravado em part"""
+        received = part.tell()
+        headers = {}
+        if received:
+            headers['Range'] = f'bytes={received}-'
+            if state['validator']:
+                headers['If-Range'] = state['validator']
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+
+            if received and response.status_code != 206:
+                # O servidor ignorou o Range (ou o arquivo mudou): recomeça do zero
+                part.seek(0)
+                part.truncate()
+                received = 0
+
+            if response.status_code == 206:
+                # Content-Range: bytes início-fim/total
+                size = response.headers.get('Content-Range', '').rpartition('/')[2]
+                if size.isdigit():
+                    state['total'] = int(size)
+            else:
+                length = response.headers.get('Content-Length')
+                state['total'] = int(length) if length and length.isdigit() else None
+                state['validator'] = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            total = state['total']
+
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if not chunk:
+                    continue
+                part.write(chunk)
+                received += len(chunk)
+                if progress_callback:
+                    progress_callback(received, total)
+
+        if total is not None and received < total:
+            raise IncompleteDownload(f"{received} de {total} bytes recebidos")
@@ -1,22 +1,232 @@
 import random
-from typing import List, Set
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 
+from lottery_combinations import rank_game, unrank_game
+from lottery_modalities import MEGA_SENA, Modality
+from manager_metrics import METRICS, timed
+
+class GamesHistory:
+    """
+    Compact, columnar store for generated games
+    
+    Each game is kept as its combination rank: uint32 (4 bytes) when the
+    modality fits, uint64 otherwise. Timestamps (int64 seconds) and source
+    tags are run-length encoded: a batch saved together costs one run entry,
+    so 10M Mega-Sena tickets take about 40 MB.
+    
+    Iterating yields (datetime, numbers) tuples one at a time, which keeps
+    the old games_history list-of-tuples interface working.
+    """
+    __slots__ = ('modality', '_typecode', '_ranks', '_run_starts', '_run_times', '_run_tags', '_tags',
+                 '_lock', '_masks', '_generation')
+    
+    def __init__(self, modality: Optional[Modality] = None):
+        self.modality = modality or MEGA_SENA
+        if self.modality.rank_dtype is None:
+            raise ValueError(f"{self.modality.name}: combination ranks do not fit in 64 bits")
+        self._typecode = 'I' if self.modality.rank_dtype == 'uint32' else 'Q'
+        self._ranks = array(self._typecode)  # combination rank of each game
+        self._run_starts = array('Q')  # index of the first game of each run
+        self._run_times = array('q')   # run timestamp (seconds since epoch)
+        self._run_tags = array('B')    # run tag id (index into _tags)
+        self._tags: List[str] = []
+        self._lock = threading.Lock()
+        self._masks = None             # cached bit masks of the first games (see masks())
+        self._generation = 0           # incremented by clear() to invalidate in-flight caches
+    
+    def __len__(self) -> int:
+        return len(self._ranks)
+    
+    def __iter__(self) -> Iterator[Tuple[datetime, List[int]]]:
+        for i in range(len(self._ranks)):
+            yield self._entry(i)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.slice(*index.indices(len(self))[:2])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("games history index out of range")
+        return self._entry(index)
+    
+    def _entry(self, index: int) -> Tuple[datetime, List[int]]:
+        run = bisect_right(self._run_starts, index) - 1
+        return (datetime.fromtimestamp(self._run_times[run]), self._unrank(self._ranks[index]))
+    
+    def _rank(self, numbers: List[int]) -> int:
+        return rank_game(numbers, self.modality.pool_size)
+    
+    def _unrank(self, rank: int) -> List[int]:
+        return unrank_game(rank, self.modality.picks, self.modality.pool_size)
+    
+    def _start_run(self, timestamp: Optional[datetime], tag: str) -> None:
+        """Start a new run unless it would repeat the last one (caller holds the lock)"""
+        seconds = int((timestamp or datetime.now()).timestamp())
+        if tag not in self._tags:
+            self._tags.append(tag)
+        tag_id = self._tags.index(tag)
+        
+        if self._run_starts and self._run_times[-1] == seconds and self._run_tags[-1] == tag_id:
+            return
+        if self._run_starts and self._run_starts[-1] == len(self._ranks):
+            # Previous run is empty: reuse it
+            self._run_times[-1], self._run_tags[-1] = seconds, tag_id
+            return
+        self._run_starts.append(len(self._ranks))
+        self._run_times.append(seconds)
+        self._run_tags.append(tag_id)
+    
+    def append(self, numbers: List[int], timestamp: Optional[datetime] = None, tag: str = 'manual') -> None:
+        """Append a single game"""
+        with self._lock:
+            self._start_run(timestamp, tag)
+            self._ranks.append(self._rank(numbers))
+    
+    def extend(self, games: Iterable[List[int]], timestamp: Optional[datetime] = None, tag: str = 'manual') -> None:
+        """Append many games sharing the same timestamp and tag"""
+        with self._lock:
+            self._start_run(timestamp, tag)
+            self._ranks.extend(self._rank(numbers) for numbers in games)
+    
+    def extend_ranks(self, ranks, timestamp: Optional[datetime] = None, tag: str = 'manual') -> None:
+        """Append games given as combination ranks (e.g. a numpy uint32 array)"""
+        with self._lock:
+            self._start_run(timestamp, tag)
+            if isinstance(ranks, array) and ranks.typecode == self._typecode:
+                self._ranks.extend(ranks)
+            elif hasattr(ranks, 'astype'):
+                self._ranks.frombytes(ranks.astype(self.modality.rank_dtype).tobytes())
+            else:
+                self._ranks.extend(int(rank) for rank in ranks)
+    
+    def clear(self) -> None:
+        """Remove all games"""
+        with self._lock:
+            self._ranks = array(self._typecode)
+            self._run_starts = array('Q')
+            self._run_times = array('q')
+            self._run_tags = array('B')
+            self._masks = None
+            self._generation += 1
+    
+    def slice(self, start: int, stop: int) -> 'GamesHistory':
+        """Return a new history with the games in [start, stop)"""
+        result = GamesHistory(self.modality)
+        result._tags = list(self._tags)
+        result._ranks = self._ranks[start:stop]
+        first_run = max(bisect_right(self._run_starts, start) - 1, 0)
+        for run in range(first_run, len(self._run_starts)):
+            run_start = self._run_starts[run]
+            if run_start >= stop:
+                break
+            result._run_starts.append(max(run_start, start) - start)
+            result._run_times.append(self._run_times[run])
+            result._run_tags.append(self._run_tags[run])
+        return result
+    
+    def ranks(self):
+        """Combination ranks as a numpy array (zero-copy view; uint32 or uint64, see Modality.rank_dtype)"""
+        import numpy as np
+        dtype = self.modality.rank_dtype
+        return np.frombuffer(self._ranks, dtype=dtype) if len(self._ranks) else np.empty(0, dtype)
+    
+    def numbers_block(self, start: int = 0, stop: Optional[int] = None):
+        """Games in [start, stop) as a numpy uint8 (n, picks) block"""
+        from lottery_combinations import unrank_games
+        return unrank_games(self.ranks()[start:stop], self.modality.picks, self.modality.pool_size)
+    
+    def masks(self):
+        """
+        Bit masks of all games (uint32, uint64 or uint64 rows, see lottery_combinations.games_to_masks)
+        
+        Masks are cached and extended incrementally, so only games added
+        since the previous call are converted.
+        """
+        import numpy as np
+        from lottery_combinations import ranks_to_masks
+        
+        with self._lock:
+            generation = self._generation
+            words = self.modality.mask_words
+            cached = self._masks if self._masks is not None else \
+                np.empty(0 if words == 1 else (0, words), self.modality.mask_dtype)
+            # Copy the new ranks so appends are not blocked by an exported buffer
+            new_ranks = self._ranks[len(cached):]
+        if not new_ranks:
+            return cached
+        
+        new_masks = ranks_to_masks(np.frombuffer(new_ranks, dtype=self.modality.rank_dtype),
+                                   self.modality.picks, self.modality.pool_size)
+        masks = np.concatenate([cached, new_masks])
+        with self._lock:
+            # Keep the result only if the history was not cleared meanwhile
+            if self._generation == generation:
+                self._masks = masks
+        return masks
+    
+    def tags(self) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, stop, tag) for each run"""
+        for run, start in enumerate(self._run_starts):
+            stop = self._run_starts[run + 1] if run + 1 < len(self._run_starts) else len(self._ranks)
+            yield start, stop, self._tags[self._run_tags[run]]
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the columns"""
+        return sum(column.itemsize * len(column)
+                   for column in (self._ranks, self._run_starts, self._run_times, self._run_tags))
+    
+    def memory_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Memory used by the columns and the mask cache, allocated capacity included
+        Returns: Dict structure -> (bytes, items)
+        """
+        runs = (self._run_starts, self._run_times, self._run_tags)
+        usage = {
+            'Histórico de jogos (índices)': (sys.getsizeof(self._ranks), len(self._ranks)),
+            'Histórico de jogos (lotes)': (sum(sys.getsizeof(column) for column in runs) + sys.getsizeof(self._tags),
+                                    len(self._run_starts)),
+        }
+        masks = self._masks
+        if masks is not None:
+            usage['Histórico de jogos (cache de máscaras)'] = (masks.nbytes, len(masks))
+        return usage
+
+
 class GameManager:
-    def __init__(self):
+    def __init__(self, storage=None, modality: Optional[Modality] = None):
+        """
+        Args:
+            storage: Optional StorageManager where saved games are also persisted
+            modality: Lottery modality (defaults to Mega-Sena)
+        """
+        self.modality = modality or MEGA_SENA
+        self.storage = storage
         self.selected_numbers: Set[int] = set()
         self.favorite_numbers: Set[int] = set()
-        self.games_history: List[tuple] = []  # [(timestamp, numbers)]
+        self.games_history = GamesHistory(self.modality)  # iterates as [(timestamp, numbers)]
+        # Cache of the last parsed favorites text (complete tokens only)
+        self._parsed_head: str = ""
+        self._parsed_head_numbers: Optional[List[int]] = []
     
     def toggle_number(self, number: int) -> bool:
         """
         Toggle selection of a number
+        Up to modality.max_picks numbers can be selected (a multi-number bet,
+        e.g. 7 to 15 numbers on Mega-Sena)
         Returns: True if number was added, False if removed
         """
         if number in self.selected_numbers:
             self.selected_numbers.remove(number)
             return False
-        elif len(self.selected_numbers) < 6:  # Limitado a 6 números por jogo
+        elif len(self.selected_numbers) < self.modality.max_picks:  # Limitado à maior aposta múltipla
             self.selected_numbers.add(number)
             return True
         return False
@@ -25,27 +235,65 @@ class GameManager:
         """Get current selected numbers as sorted list"""
         return sorted(list(self.selected_numbers))
 
+    def describe_bet(self, numbers: List[int]) -> str:
+        """
+        Short description of a multi-number bet (simple games and cost)
+        Returns: Empty string for up to modality.picks numbers
+        """
+        size = len(numbers)
+        if size <= self.modality.picks:
+            return ""
+        cost = f"{self.modality.bet_cost(size):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        return f"Aposta com {size} números: {self.modality.bet_combinations(size)} jogos simples, R$ {cost}"
+
     # ... resto dos métodos da classe ...
     
     def parse_favorite_numbers(self, numbers_str: str) -> List[int]:
         """
         Parse favorite numbers from string input
+        
+        Parsing is incremental: the complete tokens (up to the last separator)
+        are cached, so while the user types only the new tokens are parsed.
         Returns: List of valid numbers
         """
+        # Remove espaços e divide por vírgula ou espaço
+        numbers_str = numbers_str.replace(' ', ',')
+        cut = numbers_str.rfind(',') + 1
+        head, tail = numbers_str[:cut], numbers_str[cut:]
+        
+        pool_size = self.modality.pool_size
+        if head.startswith(self._parsed_head):
+            delta = self._parse_tokens(head[len(self._parsed_head):], pool_size)
+            if delta is None or self._parsed_head_numbers is None:
+                head_numbers = None
+            else:
+                head_numbers = self._parsed_head_numbers + delta
+        else:
+            head_numbers = self._parse_tokens(head, pool_size)
+        self._parsed_head, self._parsed_head_numbers = head, head_numbers
+        
+        tail_numbers = self._parse_tokens(tail, pool_size)
+        if head_numbers is None or tail_numbers is None:
+            return []
+        
+        return sorted(set(head_numbers + tail_numbers))  # Remove duplicates and sort
+    
+    @staticmethod
+    def _parse_tokens(numbers_str: str, pool_size: int = 60) -> Optional[List[int]]:
+        """
+        Parse comma separated tokens
+        Returns: List of numbers in 1-pool_size, or None if any token is invalid
+        """
         try:
-            # Remove espaços e divide por vírgula ou espaço
-            numbers_str = numbers_str.replace(' ', ',')
             numbers = []
-            
             for num_str in numbers_str.split(','):
                 if num_str.strip():
                     num = int(num_str.strip())
-                    if 1 <= num <= 60:
+                    if 1 <= num <= pool_size:
                         numbers.append(num)
-            
-            return sorted(list(set(numbers)))  # Remove duplicates and sort
+            return numbers
         except ValueError:
-            return []
+            return None
     
     def format_favorite_numbers(self) -> str:
         """
@@ -56,7 +304,17 @@ class GameManager:
     
     def set_favorite_numbers(self, numbers: List[int]) -> None:
         """Set favorite numbers from a list"""
-        self.favorite_numbers = set(num for num in numbers if 1 <= num <= 60)
+        self.favorite_numbers = set(num for num in numbers if 1 <= num <= self.modality.pool_size)
+    
+    def update_favorites_from_text(self, numbers_str: str) -> Set[int]:
+        """
+        Set favorite numbers from the favorites text field
+        Returns: Numbers whose favorite state changed (empty if the set is unchanged)
+        """
+        new_favorites = set(self.parse_favorite_numbers(numbers_str))
+        changed = new_favorites ^ self.favorite_numbers
+        self.favorite_numbers = new_favorites
+        return changed
     
     def mark_favorites(self) -> bool:
         """
@@ -70,19 +328,104 @@ class GameManager:
         self.selected_numbers.clear()  # Clear selected numbers after marking as favorites
         return True
     
-    def generate_random_games(self, num_games: int) -> List[List[int]]:
-        """Generate specified number of random games"""
-        games = []
-        for _ in range(num_games):
-            numbers = sorted(random.sample(range(1, 61), 6))
-            self.save_game(numbers)
-            games.append(numbers)
+    @timed()
+    def generate_random_games(self, num_games: int, save: bool = True,
+                              rng: Optional[random.Random] = None) -> List[List[int]]:
+        """
+        Generate specified number of random games
+        Args:
+            save: Whether the games are added to games_history
+            rng: Source of randomness (defaults to the random module); pass a
+                seeded random.Random for reproducible games
+        """
+        numbers, picks = self.modality.numbers, self.modality.picks
+        sample = (rng or random).sample
+        games = [sorted(sample(numbers, picks)) for _ in range(num_games)]
+        METRICS.count('jogos.gerados', num_games)
+        if save:
+            self.save_games(games, tag='aleatorio')
         return games
     
-    def save_game(self, numbers: List[int]) -> None:
-        """Save a game to history"""
+    def save_game(self, numbers: List[int], tag: str = 'manual') -> Optional[int]:
+        """
+        Save a game to history
+        Returns: ticket id in the storage, or None when there is no storage
+        """
+        ticket_ids = self.save_games([numbers], tag=tag)
+        return ticket_ids[0] if ticket_ids else None
+    
+    @timed()
+    def save_games(self, games: Iterable[List[int]], tag: str = 'manual') -> Optional[range]:
+        """
+        Save a batch of games to history with a single timestamp
+        Returns: range of ticket ids in the storage, or None when there is no storage
+        """
+        # Ranks are computed once and shared by the history and the storage
+        pool_size = self.modality.pool_size
+        ranks = array(self.games_history._typecode, (rank_game(numbers, pool_size) for numbers in games))
+        return self.save_ranks(ranks, tag=tag)
+    
+    @timed()
+    def save_ranks(self, ranks, tag: str = 'manual') -> Optional[range]:
+        """
+        Save a batch of games given as combination ranks (array('I') or numpy uint32)
+        Returns: range of ticket ids in the storage, or None when there is no storage
+        """
         timestamp = datetime.now()
-        self.games_history.append((timestamp, numbers))
+        self.games_history.extend_ranks(ranks, timestamp=timestamp, tag=tag)
+        if self.storage is None:
+            return None
+        return self.storage.insert_tickets(ranks, tag=tag, created_at=timestamp)
+    
+    @timed()
+    def check_draw(self, draw_numbers: List[int], max_listed: int = 50) -> Dict:
+        """
+        Check every game in history against a single draw
+        
+        Games are compared as bit masks (uint32 or uint64, depending on the
+        modality) with a vectorized popcount; the masks are cached by
+        GamesHistory, so repeated checks only convert games added since the
+        last one.
+        
+        Args:
+            draw_numbers: The drawn numbers
+            max_listed: Maximum number of games listed in 'winners'
+        Returns:
+            Dict with 'tickets', 'hits' (prize tier matches -> count, e.g.
+            {6: senas, 5: quinas, 4: quadras}) and 'winners' ([(numbers, matches)]
+            for games in the two highest tiers)
+        """
+        import numpy as np
+        from lottery_combinations import count_matches
+        
+        tiers = self.modality.prize_tiers
+        masks = self.games_history.masks()
+        matches = count_matches(masks, draw_numbers)
+        counts = np.bincount(matches, minlength=self.modality.picks + 1)
+        winners = np.flatnonzero(matches >= sorted(tiers)[-2:][0])[:max_listed]
+        return {
+            'tickets': len(masks),
+            'hits': {k: int(counts[k]) for k in tiers},
+            'winners': [(self.games_history[int(i)][1], int(matches[i])) for i in winners]
+        }
+    
+    def clear_history(self) -> None:
+        """Remove all games from history"""
+        self.games_history.clear()
+    
+    def memory_usage(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Memory used by the game history and its caches (see manager_memory)
+        Returns: Dict structure -> (bytes, items)
+        """
+        from manager_memory import sizeof
+        
+        usage = self.games_history.memory_usage()
+        numbers = (self.selected_numbers, self.favorite_numbers, self._parsed_head_numbers)
+        usage['Números selecionados e favoritos'] = (
+            sum(sizeof(value) for value in numbers), len(self.selected_numbers) + len(self.favorite_numbers)
+        )
+        return usage
     
     def get_selected_numbers(self) -> List[int]:
         """Get current selected numbers as sorted list"""
@@ -106,9 +449,31 @@ class GameManager:
         numbers_str = " - ".join(f"{num:02d}" for num in sorted(numbers))
         return f"[{current_time}] {numbers_str}"
     
+    @staticmethod
+    def parse_game_line(line: str, modality: Optional[Modality] = None,
+                        allow_bets: bool = False) -> Optional[List[int]]:
+        """
+        Parse a game from a line of text (e.g. "01, 02, 03, 04, 05, 06")
+        Only the first run of separated numbers is read, so history lines
+        ("[timestamp]    -    01, 02, ...    -    ⚠️ ...") are accepted too.
+        A game has exactly modality.picks numbers; with allow_bets, multi-number
+        bets (up to modality.max_picks) are accepted as well.
+        Returns: Sorted numbers, or None if the line is not a valid game
+        """
+        match = re.search(r'\d+(?:[\s,;]+\d+)*', re.sub(r'\[.*?\]', ' ', line))
+        if not match:
+            return None
+        numbers = [int(num) for num in re.findall(r'\d+', match.group())]
+        modality = modality or MEGA_SENA
+        if allow_bets:
+            return sorted(numbers) if modality.is_valid_bet(numbers) else None
+        if not modality.is_valid_game(numbers) or len(numbers) != modality.picks:
+            return None
+        return sorted(numbers)
+    
     def validate_numbers(self, numbers: List[int]) -> List[int]:
         """
         Validate a list of numbers
-        Returns: List of valid numbers (1-60)
+        Returns: List of valid numbers (1 to the modality pool size)
         """
-        return [num for num in numbers if 1 <= num <= 60]
\ No newline at end of file
+        return [num for num in numbers if 1 <= num <= self.modality.pool_size]
\ No newline at end of file
@@ -0,0 +1,197 @@
+import sys
+import tracemalloc
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from manager_metrics import acquire_tracemalloc, release_tracemalloc
+
+
+class MemoryEntry(NamedTuple):
+    """Memória ocupada por uma estrutura"""
+    name: str
+    bytes: int
+    items: int
+
+    @property
+    def per_item(self) -> float:
+        return self.bytes / self.items if self.items else 0.0
+
+
+def sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Tamanho aproximado de obj em bytes, incluindo o conteúdo
+
+    Arrays numpy e array.array contam o buffer, DataFrames e Series usam
+    memory_usage(deep=True) e contêineres (dict, list, tuple, set) são
+    percorridos recursivamente, contando cada objeto uma única vez.
+    """
+    import numpy as np
+    import pandas as pd
+
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (np.ndarray, array)):
+        # getsizeof já inclui o buffer (ou só o cabeçalho, para views)
+        return sys.getsizeof(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(key, seen) + sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item, seen) for item in obj)
+    return size
+
+
+def item_count(obj: Any) -> int:
+    """Quantidade de itens de uma estrutura (linhas de um DataFrame ou matriz)"""
+    try:
+        return len(obj)
+    except TypeError:
+        return 0
+
+
+def text_widget_usage(text_area) -> MemoryEntry:
+    """
+    Tamanho do conteúdo de uma área de texto Tk
+
+    Conta os bytes UTF-8 do texto; a árvore interna do Tk usa um pouco
+    mais (por linha), então o valor é um limite inferior.
+    """
+    content = text_area.get("1.0", "end-1c")
+    lines = int(text_area.index("end-1c").split('.')[0]) if content else 0
+    return MemoryEntry('', len(content.encode('utf-8')), lines)
+
+
+def process_memory() -> Dict[str, int]:
+    """Memória residente do processo (atual e pico), em bytes, quando disponível"""
+    usage = {}
+    try:
+        with open('/proc/self/statm') as statm:
+            import os
+            usage['rss'] = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss é em KB no Linux e em bytes no macOS
+        usage['peak_rss'] = peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        pass
+    return usage
+
+
+def collect_memory(stats_manager=None, game_manager=None, text_areas: Optional[Dict[str, Any]] = None,
+                   extra: Optional[Dict[str, Any]] = None) -> List[MemoryEntry]:
+    """
+    Mede as principais estruturas em memória
+
+    Args:
+        stats_manager: LotteryStatistics (resultados, frequências e caches)
+        game_manager: GameManager (histórico de jogos e caches)
+        text_areas: Áreas de texto das abas, por nome
+        extra: Outras estruturas a medir, por nome (medidas com sizeof)
+    Returns:
+        Lista de MemoryEntry
+    """
+    entries = []
+    if stats_manager is not None:
+        entries += [MemoryEntry(name, size, items) for name, (size, items) in stats_manager.memory_usage().items()]
+    if game_manager is not None:
+        entries += [MemoryEntry(name, size, items) for name, (size, items) in game_manager.memory_usage().items()]
+    for name, text_area in (text_areas or {}).items():
+        entries.append(text_widget_usage(text_area)._replace(name=f"Aba {name} (texto)"))
+    for name, obj in (extra or {}).items():
+        entries.append(MemoryEntry(name, sizeof(obj), item_count(obj)))
+    return entries
+
+
+class AllocationTracker:
+    """
+    Diferença de alocações (tracemalloc) entre o início e o fim de um trecho
+
+    Exemplo:
+        with AllocationTracker() as tracker:
+            games = game_manager.generate_random_games(1_000_000)
+        print(tracker.format())
+    """
+
+    def __init__(self, limit: int = 10, frames: int = 1):
+        """
+        Args:
+            limit: Linhas de código com maior variação guardadas
+            frames: Quadros da pilha guardados por alocação (mais quadros, mais custo)
+        """
+        self.limit = limit
+        self.frames = frames
+        self.difference = 0
+        self.peak = 0
+        self.top: List[tracemalloc.StatisticDiff] = []
+
+    def __enter__(self):
+        # Compartilhado com as capturas de MetricsManager: nenhuma desliga o tracemalloc da outra
+        acquire_tracemalloc(self.frames)
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+        self._current = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            release_tracemalloc()
+
+        # Alocações do próprio tracemalloc não interessam
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(filters).compare_to(self._before.filter_traces(filters), 'lineno')
+        self.top = stats[:self.limit]
+        self.difference = current - self._current
+        self.peak = peak - self._current
+        self._before = None
+        return False
+
+    def format(self, title: str = "Alocações") -> str:
+        lines = [f"{title}: {format_bytes(self.difference, signed=True)} (pico {format_bytes(self.peak)})"]
+        for stat in self.top:
+            frame = stat.traceback[0]
+            lines.append(f"  {format_bytes(stat.size_diff, signed=True):>12} {stat.count_diff:>+10} blocos  "
+                         f"{frame.filename}:{frame.lineno}")
+        return "\n".join(lines)
+
+
+def format_bytes(size: float, signed: bool = False) -> str:
+    sign = ('+' if size >= 0 else '-') if signed else ('-' if size < 0 else '')
+    size = abs(size)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{sign}{size:.0f} {unit}" if unit == 'B' else f"{sign}{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_memory_report(entries: List[MemoryEntry], allocations: Optional[AllocationTracker] = None) -> str:
+    """Tabela de texto com bytes por estrutura e por item, o total e a memória do processo"""
+    lines = [f"{'estrutura':<45} {'tamanho':>12} {'itens':>12} {'bytes/item':>11}"]
+    for entry in sorted(entries, key=lambda entry: -entry.bytes):
+        items = f"{entry.items:,}".replace(',', '.')
+        lines.append(f"{entry.name:<45} {format_bytes(entry.bytes):>12} {items:>12} {entry.per_item:>11.1f}")
+    lines.append(f"{'Total medido':<45} {format_bytes(sum(entry.bytes for entry in entries)):>12}")
+
+    process = process_memory()
+    if process:
+        lines.append("")
+        if 'rss' in process:
+            lines.append(f"Memória do processo: {format_bytes(process['rss'])}")
+        if 'peak_rss' in process:
+            lines.append(f"Pico do processo: {format_bytes(process['peak_rss'])}")
+
+    if allocations is not None:
+        lines += ["", allocations.format("Alocações da última geração")]
+    return "\n".join(lines) + "\n"
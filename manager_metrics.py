@@ -0,0 +1,294 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Deque, Dict, List, Optional
+
+
+class _Timer:
+    """Mede um trecho e registra a duração em MetricsManager.record"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'MetricsManager', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """Contexto vazio usado quando as métricas estão desligadas"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+# O tracemalloc é global ao processo: quem o usa (capturas das ações, AllocationTracker)
+# registra-se aqui, e ele só é desligado quando o último usuário termina
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def acquire_tracemalloc(frames: int = 1) -> None:
+    """Liga o tracemalloc, se preciso, e registra mais um usuário"""
+    import tracemalloc
+
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def release_tracemalloc() -> None:
+    """Libera um usuário; o último desliga o tracemalloc se foi ligado por acquire_tracemalloc"""
+    import tracemalloc
+
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class _Capture:
+    """Tempo, cProfile e tracemalloc de uma ação (ver MetricsManager.capture)"""
+
+    def __init__(self, metrics: 'MetricsManager', name: str):
+        self.metrics = metrics
+        self.name = name
+        self.profiler = None
+
+    def __enter__(self):
+        import cProfile
+        import tracemalloc
+
+        # Só uma ação é perfilada por vez; as demais são apenas cronometradas
+        if self.metrics._profile_lock.acquire(blocking=False):
+            acquire_tracemalloc()
+            tracemalloc.reset_peak()
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.record(self.name, elapsed)
+        if self.profiler is None:
+            return False
+
+        import io
+        import pstats
+        import tracemalloc
+
+        try:
+            self.profiler.disable()
+            current, peak = tracemalloc.get_traced_memory()
+            release_tracemalloc()
+
+            output = io.StringIO()
+            pstats.Stats(self.profiler, stream=output).sort_stats('cumulative').print_stats(self.metrics.PROFILE_LINES)
+            self.metrics._store_profile(self.name, {
+                'seconds': elapsed,
+                'memory_delta': current - self.memory_start,
+                'memory_peak': peak - self.memory_start,
+                'profile': output.getvalue(),
+                'finished_at': time.time(),
+            })
+        finally:
+            self.metrics._profile_lock.release()
+        return False
+
+
+class MetricsManager:
+    """
+    Instrumentação leve dos caminhos principais
+
+    Registra a duração das operações (as últimas SAMPLES de cada uma, para
+    p50/p95) e contadores como concursos lidos e jogos gerados. Desligado,
+    cada ponto instrumentado custa apenas a verificação de self.enabled.
+    Com profiling ligado, capture() também grava um cProfile e o pico de
+    memória (tracemalloc) de cada ação da interface.
+    """
+
+    SAMPLES = 1024
+    # Linhas do cProfile guardadas por ação
+    PROFILE_LINES = 25
+
+    def __init__(self, enabled: bool = False, profiling: bool = False):
+        self.enabled = enabled
+        self.profiling = profiling
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._calls: Dict[str, int] = {}
+        self._totals: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._profiles: Dict[str, Dict] = {}
+
+    def enable(self, enabled: bool = True, profiling: Optional[bool] = None) -> None:
+        """Liga ou desliga as métricas (e opcionalmente o profiling por ação)"""
+        self.enabled = enabled
+        if profiling is not None:
+            self.profiling = profiling
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
+            self._totals.clear()
+            self._counters.clear()
+            self._profiles.clear()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Registra uma duração medida por fora"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.SAMPLES)
+            samples.append(seconds)
+            self._calls[name] = self._calls.get(name, 0) + 1
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Soma amount ao contador name (ex: 'jogos.gerados')"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def measure(self, name: str):
+        """
+        Contexto que cronometra um trecho
+
+        Exemplo:
+            with METRICS.measure('ui.resultados'):
+                ...
+        """
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def capture(self, name: str):
+        """Como measure, mas com cProfile e tracemalloc quando o profiling está ligado"""
+        if not self.enabled:
+            return _NULL_TIMER
+        if not self.profiling:
+            return _Timer(self, name)
+        return _Capture(self, name)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """
+        Decorador que cronometra cada chamada da função
+
+        Args:
+            name: Nome da operação (padrão: Classe.método)
+        """
+        def decorate(func):
+            label = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def _store_profile(self, name: str, capture: Dict) -> None:
+        with self._lock:
+            self._profiles[name] = capture
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            Dicionário operação -> {'calls', 'total', 'mean', 'p50', 'p95', 'max'} (segundos)
+        """
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            calls, totals = dict(self._calls), dict(self._totals)
+
+        def percentile(values: List[float], fraction: float) -> float:
+            # Nearest-rank sobre as últimas SAMPLES medições
+            return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+        return {
+            name: {
+                'calls': calls[name],
+                'total': totals[name],
+                'mean': totals[name] / calls[name],
+                'p50': percentile(values, 0.50),
+                'p95': percentile(values, 0.95),
+                'max': values[-1],
+            }
+            for name, values in samples.items()
+        }
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def profiles(self) -> Dict[str, Dict]:
+        """Última captura (cProfile e memória) de cada ação"""
+        with self._lock:
+            return dict(self._profiles)
+
+    def report(self, include_profiles: bool = False) -> str:
+        """Texto com a latência por operação, os contadores e, opcionalmente, os perfis"""
+        if not self.enabled and not self._calls:
+            return ("Métricas desligadas.\n"
+                    "Ative pela aba Desempenho, com --metrics na linha de comando "
+                    "ou com a variável LOTTERY_METRICS=1.\n")
+
+        lines = [f"{'operação':<45} {'chamadas':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'máx (ms)':>10} {'total (s)':>10}"]
+        for name, stats in sorted(self.summary().items(), key=lambda item: -item[1]['total']):
+            lines.append(
+                f"{name:<45} {stats['calls']:>8} {stats['p50'] * 1000:>10.2f} {stats['p95'] * 1000:>10.2f} "
+                f"{stats['max'] * 1000:>10.2f} {stats['total']:>10.3f}"
+            )
+
+        counters = self.counters()
+        if counters:
+            lines += ["", "Contadores:"]
+            lines += [f"  {name}: {value:,}".replace(',', '.') for name, value in sorted(counters.items())]
+
+        if include_profiles:
+            for name, capture in sorted(self.profiles().items()):
+                lines += [
+                    "", "=" * 80,
+                    f"{name}: {capture['seconds'] * 1000:.1f} ms, memória "
+                    f"{capture['memory_delta'] / 1024:+.0f} KB (pico {capture['memory_peak'] / 1024:.0f} KB)",
+                    capture['profile'].strip()
+                ]
+        return "\n".join(lines) + "\n"
+
+
+# Instância usada por todos os gerenciadores
+METRICS = MetricsManager(
+    enabled=os.environ.get('LOTTERY_METRICS', '') not in ('', '0'),
+    profiling=os.environ.get('LOTTERY_PROFILE', '') not in ('', '0')
+)
+timed = METRICS.timed
@@ -2,6 +2,8 @@ import pandas as pd
 from typing import Optional, Dict, List
 from datetime import datetime
 
+from manager_metrics import timed
+
 class SearchManager:
     def __init__(self):
         self.search_types = {
@@ -9,21 +11,37 @@ class SearchManager:
             "Ano": self._search_by_year,
             "Mês": self._search_by_month,
         }
+        # Buscas sobre a tabela de características dos sorteios (LotteryStatistics.draw_features)
+        self.feature_search_types = {
+            "Soma": self._search_by_sum,
+            "Característica": self._search_by_features,
+        }
     
-    def search(self, df: pd.DataFrame, search_type: str, search_value: str) -> pd.DataFrame:
+    @timed()
+    def search(self, df: pd.DataFrame, search_type: str, search_value: str,
+               features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         """
         Realiza a busca no DataFrame com base no tipo e valor da busca
         
         Args:
             df: DataFrame com os resultados
-            search_type: Tipo de busca ('Concurso', 'Ano', 'Mês')
-            search_value: Valor a ser buscado
+            search_type: Tipo de busca ('Concurso', 'Ano', 'Mês', 'Soma', 'Característica')
+            search_value: Valor a ser buscado (na soma, um valor ou faixa como
+                "150-200"; nas características, condições como "primos=2, consecutivos=1-2")
+            features: Tabela de características com o mesmo índice de df
+                (obrigatória nas buscas 'Soma' e 'Característica')
             
         Returns:
             DataFrame filtrado com os resultados da busca
         """
         if df.empty or not search_value.strip():
             return df
+        
+        feature_search = self.feature_search_types.get(search_type)
+        if feature_search:
+            if features is None:
+                raise ValueError(f"A busca por {search_type.lower()} precisa da tabela de características")
+            return feature_search(df, features, search_value.strip())
             
         search_func = self.search_types.get(search_type)
         if not search_func:
@@ -44,7 +62,7 @@ class SearchManager:
         try:
             # Converte a coluna de data para datetime se necessário
             if not pd.api.types.is_datetime64_any_dtype(df['Data do Sorteio']):
-                df['Data do Sorteio'] = pd.to_datetime(df['Data do Sorteio'])
+                df['Data do Sorteio'] = pd.to_datetime(df['Data do Sorteio'], dayfirst=True)
             
             return df[df['Data do Sorteio'].dt.year.astype(str).str.contains(value, na=False)]
         except Exception as e:
@@ -55,7 +73,7 @@ class SearchManager:
         try:
             # Converte a coluna de data para datetime se necessário
             if not pd.api.types.is_datetime64_any_dtype(df['Data do Sorteio']):
-                df['Data do Sorteio'] = pd.to_datetime(df['Data do Sorteio'])
+                df['Data do Sorteio'] = pd.to_datetime(df['Data do Sorteio'], dayfirst=True)
             
             # Aceita tanto número do mês quanto nome
             if value.isdigit():
@@ -75,6 +93,26 @@ class SearchManager:
         except Exception as e:
             raise ValueError(f"Erro na busca por mês: {str(e)}")
     
+    def _search_by_sum(self, df: pd.DataFrame, features: pd.DataFrame, value: str) -> pd.DataFrame:
+        """Busca pela soma dos números (valor exato ou faixa mínimo-máximo)"""
+        from lottery_features import parse_range
+        
+        return self._filter_features(df, features, {'sum': parse_range(value)})
+    
+    def _search_by_features(self, df: pd.DataFrame, features: pd.DataFrame, value: str) -> pd.DataFrame:
+        """Busca por condições sobre as características, ex: soma=150-200, primos=2"""
+        from lottery_features import parse_conditions
+        
+        return self._filter_features(df, features, parse_conditions(value))
+    
+    @staticmethod
+    def _filter_features(df: pd.DataFrame, features: pd.DataFrame, ranges) -> pd.DataFrame:
+        """Linhas de df cujas características estão dentro das faixas (uma comparação por coluna)"""
+        from lottery_features import within_ranges
+        
+        return df[within_ranges(features.loc[df.index], ranges)]
+    
+    @timed()
     def format_search_results(self, filtered_df: pd.DataFrame) -> str:
         """
         Formata os resultados da busca para exibição
@@ -88,19 +126,12 @@ class SearchManager:
         if filtered_df.empty:
             return "Nenhum resultado encontrado para a busca."
         
+        from manager_data import DataManager
+        
         results_text = "Resultados da pesquisa:\n\n"
         
-        for _, row in filtered_df.iterrows():
-            concurso = row.get('Concurso', 'N/A')
-            data_sorteio = row.get('Data do Sorteio', 'N/A')
-            
-            # Extrai os números do sorteio
-            numeros = []
-            for i in range(1, 7):
-                col_name = f'Bola{i}' if f'Bola{i}' in filtered_df.columns else f'Dezena {i}'
-                if col_name in filtered_df.columns and pd.notna(row[col_name]):
-                    numeros.append(int(row[col_name]))
-            
+        # As colunas das dezenas são resolvidas uma única vez por DataManager.iter_draws
+        for concurso, data_sorteio, numeros in DataManager.iter_draws(filtered_df):
             if numeros:
                 numeros_str = ' - '.join(f"{num:02d}" for num in sorted(numeros))
                 results_text += f"Concurso {concurso} ({data_sorteio})\n"
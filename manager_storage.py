@@ -0,0 +1,336 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from lottery_combinations import ranks_with_matches, unrank_game
+from manager_metrics import timed
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    contest    INTEGER PRIMARY KEY,
+    draw_date  TEXT,
+    n1 INTEGER, n2 INTEGER, n3 INTEGER, n4 INTEGER, n5 INTEGER, n6 INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_results_date ON results(draw_date);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    id              INTEGER PRIMARY KEY,
+    created_at      INTEGER NOT NULL,
+    tag             TEXT NOT NULL,
+    rank            INTEGER NOT NULL,
+    quadras         INTEGER,
+    quinas          INTEGER,
+    senas           INTEGER,
+    checked_contest INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_rank ON tickets(rank);
+CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_at);
+
+CREATE TABLE IF NOT EXISTS checks (
+    contest    INTEGER PRIMARY KEY,
+    checked_at INTEGER NOT NULL,
+    tickets    INTEGER NOT NULL,
+    quadras    INTEGER NOT NULL,
+    quinas     INTEGER NOT NULL,
+    senas      INTEGER NOT NULL
+);
+"""
+
+
+class StorageManager:
+    """
+    Armazenamento persistente (SQLite) de resultados e jogos gerados
+
+    O banco usa WAL, as inserções são feitas em lote com executemany e os
+    jogos são guardados pelo índice da combinação (ver lottery_combinations),
+    indexado para que a conferência contra um sorteio seja uma busca por
+    índice e não uma varredura da tabela.
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.lotteryapp', 'lotteryapp.db')
+    BATCH_SIZE = 50000
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or self.DEFAULT_PATH
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # A conexão é compartilhada entre a interface e as tarefas em segundo plano
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Cache maior deixa as inserções em lote no índice de rank bem mais rápidas
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Resultados ---
+
+    @timed()
+    def save_results(self, results_df) -> int:
+        """
+        Grava (ou atualiza) os resultados de um DataFrame no formato oficial
+
+        Returns:
+            Quantidade de concursos gravados
+        """
+        number_columns = list(results_df.filter(regex='Bola|Dezena').columns)[:6]
+        dates = _to_iso_dates(results_df['Data do Sorteio'])
+        rows = [
+            (int(contest), date, *(int(n) for n in numbers))
+            for contest, date, *numbers in zip(
+                results_df['Concurso'], dates, *(results_df[col] for col in number_columns)
+            )
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (contest, draw_date, n1, n2, n3, n4, n5, n6) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    @timed()
+    def load_results(self):
+        """
+        Carrega os resultados gravados
+
+        Returns:
+            DataFrame com Concurso (uint32), Data do Sorteio (datetime64) e Bola1..Bola6 (uint8),
+            do mais recente ao mais antigo
+        """
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT contest, draw_date, n1, n2, n3, n4, n5, n6 FROM results ORDER BY contest DESC"
+            ).fetchall()
+
+        columns = list(zip(*rows)) if rows else [()] * 8
+        df = pd.DataFrame({
+            'Concurso': np.array(columns[0], dtype=np.uint32),
+            'Data do Sorteio': pd.to_datetime(pd.Series(columns[1], dtype=object), format='%Y-%m-%d'),
+        })
+        for ball, numbers in enumerate(columns[2:], 1):
+            df[f'Bola{ball}'] = np.array(numbers, dtype=np.uint8)
+        return df
+
+    def results_page(self, offset: int = 0, limit: int = 100,
+                     start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Tuple]:
+        """
+        Página de resultados (mais recentes primeiro), opcionalmente por período
+
+        Args:
+            start_date, end_date: Datas ISO (AAAA-MM-DD), inclusivas
+        Returns:
+            Lista de tuplas (concurso, data ISO, n1..n6)
+        """
+        query = "SELECT contest, draw_date, n1, n2, n3, n4, n5, n6 FROM results WHERE 1=1"
+        params: list = []
+        if start_date:
+            query += " AND draw_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND draw_date <= ?"
+            params.append(end_date)
+        query += " ORDER BY contest DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def latest_contest(self) -> Optional[int]:
+        with self._lock:
+            return self._conn.execute("SELECT MAX(contest) FROM results").fetchone()[0]
+
+    # --- Jogos gerados ---
+
+    @timed()
+    def insert_tickets(self, ranks: Iterable[int], tag: str = 'manual',
+                       created_at: Optional[datetime] = None) -> range:
+        """
+        Grava jogos (pelo índice da combinação) em lotes
+
+        Returns:
+            Intervalo com os ids atribuídos, na ordem dos jogos
+        """
+        seconds = int((created_at or datetime.now()).timestamp())
+        if hasattr(ranks, 'tolist'):
+            # Arrays numpy: converte de uma vez para inteiros do Python
+            ranks = ranks.tolist()
+
+        with self._lock, self._conn:
+            # Reserva a escrita antes de ler o maior id, para os ids serem contíguos
+            self._conn.execute("BEGIN IMMEDIATE")
+            first_id = (self._conn.execute("SELECT MAX(id) FROM tickets").fetchone()[0] or 0) + 1
+            count = 0
+            batch = []
+            for rank in ranks:
+                batch.append((seconds, tag, int(rank)))
+                if len(batch) >= self.BATCH_SIZE:
+                    self._insert_ticket_batch(first_id + count, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._insert_ticket_batch(first_id + count, batch)
+                count += len(batch)
+        return range(first_id, first_id + count)
+
+    def _insert_ticket_batch(self, first_id: int, batch: List[Tuple]) -> None:
+        self._conn.executemany(
+            "INSERT INTO tickets (id, created_at, tag, rank) VALUES (?, ?, ?, ?)",
+            ((first_id + i, *row) for i, row in enumerate(batch))
+        )
+
+    def count_tickets(self, tag: Optional[str] = None) -> int:
+        with self._lock:
+            if tag is None:
+                return self._conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM tickets WHERE tag = ?", (tag,)).fetchone()[0]
+
+    def tickets_page(self, after_id: int = 0, limit: int = 1000,
+                     tag: Optional[str] = None) -> List[Tuple[int, datetime, str, List[int]]]:
+        """
+        Página de jogos por chave (id > after_id), sem OFFSET
+
+        Returns:
+            Lista de tuplas (id, data de criação, tag, números)
+        """
+        query = "SELECT id, created_at, tag, rank FROM tickets WHERE id > ?"
+        params: list = [after_id]
+        if tag is not None:
+            query += " AND tag = ?"
+            params.append(tag)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [(ticket_id, datetime.fromtimestamp(created_at), ticket_tag, unrank_game(rank))
+                for ticket_id, created_at, ticket_tag, rank in rows]
+
+    def iter_ticket_ranks(self, batch_size: int = 200000) -> Iterator[Tuple[List[int], List[int]]]:
+        """Percorre todos os jogos em blocos de (ids, índices das combinações)"""
+        after_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, rank FROM tickets WHERE id > ? ORDER BY id LIMIT ?",
+                    (after_id, batch_size)
+                ).fetchall()
+            if not rows:
+                break
+            ids, ranks = map(list, zip(*rows))
+            yield ids, ranks
+            after_id = ids[-1]
+
+    def save_ticket_analysis(self, rows: Iterable[Tuple[int, int, int, int, int]]) -> None:
+        """
+        Grava a análise dos jogos
+
+        Args:
+            rows: Tuplas (id, quadras, quinas, senas, último concurso conferido)
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE tickets SET quadras = ?, quinas = ?, senas = ?, checked_contest = ? WHERE id = ?",
+                ((quadras, quinas, senas, contest, ticket_id)
+                 for ticket_id, quadras, quinas, senas, contest in rows)
+            )
+
+    @timed()
+    def find_matching_tickets(self, draw_numbers: Sequence[int],
+                              min_matches: int = 4) -> List[Tuple[int, List[int], int]]:
+        """
+        Busca os jogos com pelo menos min_matches acertos em um sorteio
+
+        Em vez de varrer os jogos, gera todas as combinações com min_matches
+        ou mais números do sorteio (21.790 para quadra) e as cruza com o índice
+        de tickets.rank, então o custo não depende da quantidade de jogos.
+
+        Returns:
+            Lista de tuplas (id, números, acertos)
+        """
+        ranks, matches = ranks_with_matches(draw_numbers, min_matches)
+        candidates = zip(ranks.tolist(), matches.tolist())
+
+        with self._lock:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS candidates (rank INTEGER PRIMARY KEY, matches INTEGER)"
+            )
+            self._conn.execute("DELETE FROM candidates")
+            self._conn.executemany("INSERT INTO candidates (rank, matches) VALUES (?, ?)", candidates)
+            rows = self._conn.execute(
+                "SELECT t.id, t.rank, c.matches FROM candidates c "
+                "JOIN tickets t ON t.rank = c.rank ORDER BY t.id"
+            ).fetchall()
+            self._conn.execute("DELETE FROM candidates")
+            self._conn.commit()
+
+        return [(ticket_id, unrank_game(rank), matches) for ticket_id, rank, matches in rows]
+
+    def last_checked_contest(self) -> Optional[int]:
+        """Último concurso conferido com check_draw"""
+        with self._lock:
+            return self._conn.execute("SELECT MAX(contest) FROM checks").fetchone()[0]
+
+    @timed()
+    def check_draw(self, contest: int, draw_numbers: Sequence[int], max_listed: int = 50) -> Dict:
+        """
+        Confere todos os jogos gravados contra um novo sorteio
+
+        Usa find_matching_tickets (busca pelo índice), soma os acertos aos
+        jogos já analisados que ainda não viram este concurso e registra o
+        resumo na tabela checks.
+
+        Returns:
+            Dicionário no formato de GameManager.check_draw
+        """
+        matching = self.find_matching_tickets(draw_numbers, min_matches=4)
+        hits = {k: 0 for k in (4, 5, 6)}
+        for _, _, matches in matching:
+            hits[matches] += 1
+
+        with self._lock, self._conn:
+            tickets = self._conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+            self._conn.executemany(
+                "UPDATE tickets SET quadras = quadras + ?, quinas = quinas + ?, senas = senas + ?, "
+                "checked_contest = ? WHERE id = ? AND checked_contest < ?",
+                ((int(matches == 4), int(matches == 5), int(matches == 6), contest, ticket_id, contest)
+                 for ticket_id, _, matches in matching)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checks (contest, checked_at, tickets, quadras, quinas, senas) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (contest, int(datetime.now().timestamp()), tickets, hits[4], hits[5], hits[6])
+            )
+
+        return {
+            'tickets': tickets,
+            'hits': hits,
+            'winners': [(numbers, matches) for _, numbers, matches in matching if matches >= 5][:max_listed]
+        }
+
+
+def _to_iso_dates(dates) -> List[Optional[str]]:
+    """Converte a coluna 'Data do Sorteio' (texto dd/mm/aaaa ou datetime) para AAAA-MM-DD"""
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        parsed = dates
+    else:
+        parsed = pd.to_datetime(dates, format='%d/%m/%Y', errors='coerce')
+    return [None if pd.isna(value) else value.strftime('%Y-%m-%d') for value in parsed]
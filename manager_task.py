@@ -0,0 +1,173 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from manager_metrics import METRICS
+
+
+class TaskCancelled(Exception):
+    """Lançada dentro de uma tarefa quando ela foi cancelada"""
+
+
+class Task:
+    """Referência para uma operação executada em segundo plano"""
+
+    def __init__(self, name: str, results: queue.Queue):
+        self.name = name
+        self.future: Optional[Future] = None
+        self.on_success: Optional[Callable[[Any], None]] = None
+        self.on_error: Optional[Callable[[Exception], None]] = None
+        self.on_progress: Optional[Callable[[int, int, str], None]] = None
+        self.on_cancel: Optional[Callable[[], None]] = None
+        self._results = results
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Solicita o cancelamento; a tarefa para no próximo ponto de verificação"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check_cancelled(self) -> None:
+        """Interrompe a tarefa com TaskCancelled se ela foi cancelada"""
+        if self.cancelled:
+            raise TaskCancelled(self.name)
+
+    def report_progress(self, done: int, total: int, text: str = "") -> None:
+        """
+        Envia o progresso para a interface (chamado de dentro da tarefa)
+
+        Também serve como ponto de cancelamento.
+        """
+        self.check_cancelled()
+        self._results.put(('progress', self, (done, total, text)))
+
+
+class TaskManager:
+    """
+    Executa operações demoradas fora do mainloop do Tk
+
+    As tarefas rodam em um pool de threads e os resultados voltam por uma
+    fila que é consumida com master.after. Todos os callbacks (on_success, on_error,
+    on_progress e on_cancel) são executados na thread da interface, então
+    podem atualizar widgets e abrir messageboxes com segurança.
+    """
+
+    def __init__(self, master, max_workers: int = 4, poll_interval: int = 50):
+        self.master = master
+        self.poll_interval = poll_interval
+        self._results: queue.Queue = queue.Queue()
+        self._thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lottery-task")
+        self._active: Dict[str, Task] = {}
+        self.master.after(self.poll_interval, self._drain)
+
+    def submit(self, name: str, func: Callable, *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[int, int, str], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None,
+               coalesce: Optional[str] = 'replace', **kwargs) -> Optional[Task]:
+        """
+        Agenda uma tarefa
+
+        Args:
+            name: Nome da tarefa, usado para agrupar pedidos repetidos
+            func: Função a executar; recebe o Task como primeiro argumento
+                (para progresso e cancelamento)
+            on_success: Chamado com o resultado
+            on_error: Chamado com a exceção lançada pela tarefa
+            on_progress: Chamado com (feito, total, texto)
+            on_cancel: Chamado quando a tarefa termina cancelada
+            coalesce: O que fazer se já existe uma tarefa com o mesmo nome:
+                'replace' cancela a anterior, 'ignore' descarta o novo pedido
+                e None executa as duas
+
+        Returns:
+            O Task criado, ou None se o pedido foi descartado
+        """
+        current = self._active.get(name)
+        if current is not None:
+            if coalesce == 'ignore':
+                return None
+            if coalesce == 'replace':
+                current.cancel()
+
+        task = Task(name, self._results)
+        task.on_success = on_success
+        task.on_error = on_error
+        task.on_progress = on_progress
+        task.on_cancel = on_cancel
+        self._active[name] = task
+
+        task.future = self._thread_pool.submit(self._run, task, func, args, kwargs)
+        # Uma tarefa cancelada ainda na fila do pool nunca chega a _run: o desfecho é publicado aqui
+        task.future.add_done_callback(lambda future: self._on_done(task, future))
+        return task
+
+    def cancel(self, name: Optional[str] = None) -> None:
+        """Cancela a tarefa com o nome informado, ou todas se name for None"""
+        tasks = list(self._active.values()) if name is None else [self._active.get(name)]
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+
+    def is_running(self, name: str) -> bool:
+        """Indica se existe uma tarefa ativa com o nome informado"""
+        return name in self._active
+
+    def shutdown(self) -> None:
+        """Cancela as tarefas e encerra o pool"""
+        self.cancel()
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task: Task, func: Callable, args: tuple, kwargs: dict) -> None:
+        """Executa a tarefa na thread do pool e publica o desfecho na fila"""
+        try:
+            task.check_cancelled()
+            # Com as métricas ligadas, cada ação é cronometrada (e perfilada, se pedido)
+            with METRICS.capture(f"tarefa.{task.name}"):
+                result = func(task, *args, **kwargs)
+        except TaskCancelled:
+            self._results.put(('cancelled', task, None))
+        except Exception as e:
+            self._results.put(('error', task, e))
+        else:
+            self._results.put(('done', task, result))
+
+    def _on_done(self, task: Task, future: Future) -> None:
+        """Publica o cancelamento de uma tarefa que não chegou a executar (as demais publicam em _run)"""
+        if future.cancelled():
+            self._results.put(('cancelled', task, None))
+
+    def _drain(self) -> None:
+        """Consome a fila de resultados dentro do mainloop"""
+        try:
+            while True:
+                kind, task, payload = self._results.get_nowait()
+
+                if kind == 'progress':
+                    if not task.cancelled and task.on_progress:
+                        task.on_progress(*payload)
+                    continue
+
+                if self._active.get(task.name) is task:
+                    del self._active[task.name]
+
+                if kind == 'cancelled' or task.cancelled:
+                    # Resultados de tarefas canceladas ou substituídas são descartados
+                    if task.on_cancel:
+                        task.on_cancel()
+                elif kind == 'error':
+                    if task.on_error:
+                        task.on_error(payload)
+                elif task.on_success:
+                    task.on_success(payload)
+        except queue.Empty:
+            pass
+        finally:
+            self.master.after(self.poll_interval, self._drain)
@@ -3,6 +3,41 @@ import customtkinter as ctk
 from typing import List, Dict, Set, Optional, Tuple, Callable
 
 
+class NumberGridView:
+    """
+    Guarda o último estado renderizado de cada botão do grid numérico
+    
+    O estado de um botão é a tupla (fg_color, border_color, border_width);
+    render só reconfigura os botões cujo estado mudou desde a última chamada.
+    """
+    
+    def __init__(self, buttons: Dict[int, ctk.CTkButton]):
+        self.buttons = buttons
+        self._rendered: Dict[int, Tuple] = {}
+    
+    def render(self, states: Dict[int, Tuple]) -> int:
+        """
+        Aplica os estados informados (todos ou apenas alguns números)
+        
+        Returns:
+            Quantidade de botões reconfigurados
+        """
+        changed = 0
+        for number, state in states.items():
+            if self._rendered.get(number) == state:
+                continue
+            
+            fg_color, border_color, border_width = state
+            options = {'fg_color': fg_color, 'border_width': border_width}
+            if border_color:
+                options['border_color'] = border_color
+            self.buttons[number].configure(**options)
+            
+            self._rendered[number] = state
+            changed += 1
+        return changed
+
+
 class UIManager:
     def __init__(self, master: ctk.CTk):
         self.master = master
@@ -134,11 +169,11 @@ class UIManager:
         }
     
     def create_tabs(self, parent: ctk.CTkFrame) -> Dict:
-        """Cria e retorna as abas de histórico, resultados e estatísticas"""
+        """Cria e retorna as abas de histórico, resultados, estatísticas e desempenho"""
         notebook = ctk.CTkTabview(parent)
         notebook.pack(pady=10, fill="both", expand=True)
         
-        tabs = ["Histórico", "Resultados", "Estatísticas"]
+        tabs = ["Histórico", "Resultados", "Estatísticas", "Desempenho"]
         for tab in tabs:
             notebook.add(tab)
         
@@ -174,7 +209,7 @@ class UIManager:
             search_type.set(choice)  # Update search type
         
         # Combo
-        search_options = ["Concurso", "Ano", "Mês"]
+        search_options = ["Concurso", "Ano", "Mês", "Soma", "Característica"]
         search_combo = ctk.CTkOptionMenu(
             frame,
             values=search_options,
@@ -208,6 +243,31 @@ class UIManager:
             'search_type': search_type
         }
     
+    def create_performance_panel(self, parent: ctk.CTkFrame, toggle_command: Callable,
+                                 refresh_command: Callable, reset_command: Callable,
+                                 memory_command: Callable) -> Dict:
+        """Cria o painel da aba de desempenho (ligar métricas, profiling, atualizar, limpar e memória)"""
+        frame = ctk.CTkFrame(parent)
+        frame.pack(fill="x", padx=10, pady=5)
+        
+        metrics_var = ctk.BooleanVar(value=False)
+        profiling_var = ctk.BooleanVar(value=False)
+        
+        ctk.CTkCheckBox(
+            frame, text="Medir operações", variable=metrics_var, command=toggle_command
+        ).pack(side="left", padx=5)
+        ctk.CTkCheckBox(
+            frame, text="Perfilar ações (cProfile + memória)", variable=profiling_var, command=toggle_command
+        ).pack(side="left", padx=5)
+        ctk.CTkButton(frame, text="Atualizar", command=refresh_command, width=100).pack(side="left", padx=5)
+        ctk.CTkButton(frame, text="Limpar", command=reset_command, width=100).pack(side="left", padx=5)
+        ctk.CTkButton(frame, text="Memória", command=memory_command, width=100).pack(side="left", padx=5)
+        
+        return {
+            'metrics_var': metrics_var,
+            'profiling_var': profiling_var
+        }
+    
     # In manager_ui.py, add the following method to the UIManager class
 
     def create_favorites_panel(self, parent: ctk.CTkFrame, favorite_numbers_var: ctk.StringVar) -> ctk.CTkFrame:
@@ -231,9 +291,34 @@ class UIManager:
             placeholder_text="Ex: 1, 2, 3, 4, 5, 6"
         )
         favorites_entry.pack(side="left", padx=5, fill="x", expand=True)
-        
+
         return frame
 
+    def create_progress_panel(self, parent: ctk.CTkFrame, cancel_command: Callable) -> Dict:
+        """Cria a barra de progresso usada pelas operações demoradas"""
+        frame = ctk.CTkFrame(parent)
+        frame.pack(pady=(0, 5), fill="x")
+
+        progress_label = ctk.CTkLabel(frame, text="", width=250, anchor="w")
+        progress_label.pack(side="left", padx=5)
+
+        progress_bar = ctk.CTkProgressBar(frame)
+        progress_bar.pack(side="left", padx=5, fill="x", expand=True)
+        progress_bar.set(0)
+
+        cancel_button = ctk.CTkButton(
+            frame,
+            text="Cancelar",
+            command=cancel_command,
+            width=100
+        )
+        cancel_button.pack(side="right", padx=5)
+
+        return {
+            'progress_bar': progress_bar,
+            'progress_label': progress_label
+        }
+
     # Modify the create_control_panel method to include the favorites panel
     def create_control_panel(self, parent: ctk.CTkFrame, buttons_config: list) -> Dict:
         """Criar o painel de controle com entrada de quantidade e botões organizados por categoria"""
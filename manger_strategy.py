@@ -2,6 +2,8 @@ import random
 from typing import List, Dict, Set, Optional, Tuple
 import pandas as pd
 from lottery_statistics import LotteryStatistics
+from lottery_modalities import MEGA_SENA, Modality
+from manager_metrics import METRICS, timed
 
 class StrategyManager:
     """Gerenciador de estratégias avançadas para filtragem e geração de jogos"""
@@ -9,12 +11,18 @@ class StrategyManager:
     def __init__(self, stats_manager: Optional[LotteryStatistics] = None):
         self.stats_manager = stats_manager
         self.filtered_numbers: Set[int] = set()
-        self.base_numbers: Set[int] = set(range(1, 61))
+        self.base_numbers: Set[int] = set(self.modality.numbers)
+        
+    @property
+    def modality(self) -> Modality:
+        """Modalidade das estatísticas atuais (Mega Sena se não houver)"""
+        return self.stats_manager.modality if self.stats_manager else MEGA_SENA
         
     def set_stats_manager(self, stats_manager: LotteryStatistics) -> None:
         """Define o gerenciador de estatísticas"""
         self.stats_manager = stats_manager
         self.filtered_numbers = set()  # Reinicia o filtro quando atualiza as estatísticas
+        self.base_numbers = set(self.modality.numbers)
         
     def select_most_frequent(self, count: int = 30) -> Set[int]:
         """
@@ -68,8 +76,8 @@ class StrategyManager:
         if not keep_patterns:
             keep_patterns = ["3p-3i", "4p-2i", "2p-4i"]
             
-        even_numbers = {num for num in range(1, 61) if num % 2 == 0}
-        odd_numbers = {num for num in range(1, 61) if num % 2 != 0}
+        even_numbers = {num for num in self.modality.numbers if num % 2 == 0}
+        odd_numbers = {num for num in self.modality.numbers if num % 2 != 0}
         
         return {
             'even': even_numbers,
@@ -90,8 +98,8 @@ class StrategyManager:
         if not self.stats_manager:
             # Se não houver estatísticas, retorna todos os grupos
             return {
-                f"{i*10+1}-{(i+1)*10}": {j for j in range(i*10+1, (i+1)*10+1)}
-                for i in range(6)
+                f"{start}-{end}": set(range(start, end + 1))
+                for start, end in self.modality.groups
             }
         
         decade_analysis = self.stats_manager.analyze_decade_groups()
@@ -104,6 +112,7 @@ class StrategyManager:
         
         return decades_to_keep
     
+    @timed()
     def apply_all_filters(self, cercar_count: int = 12, top_count: int = 30, 
                          recent_count: int = 5, min_decade_pct: float = 16.0) -> Tuple[Set[int], Dict]:
         """
@@ -119,10 +128,10 @@ class StrategyManager:
             Tuple contendo conjunto de números resultantes e informações de filtro
         """
         if not self.stats_manager:
-            return set(range(1, 61)), {}
+            return set(self.modality.numbers), {}
         
-        # 1. Iniciar com todos os números (1-60)
-        all_numbers = set(range(1, 61))
+        # 1. Iniciar com todos os números do volante
+        all_numbers = set(self.modality.numbers)
         
         # 2. Pegar os mais frequentes
         top_frequent = self.select_most_frequent(top_count)
@@ -145,8 +154,10 @@ class StrategyManager:
         self.filtered_numbers = filtered_set
         return filtered_set, filter_info
     
+    @timed()
     def generate_strategic_games(self, num_games: int, favorite_numbers: List[int], 
-                                filtered_numbers: Optional[Set[int]] = None) -> List[List[int]]:
+                                filtered_numbers: Optional[Set[int]] = None,
+                                rng: Optional[random.Random] = None) -> List[List[int]]:
         """
         Gera jogos estratégicos baseados em favoritos e filtros
         
@@ -154,13 +165,16 @@ class StrategyManager:
             num_games: Quantidade de jogos a gerar
             favorite_numbers: Lista de números favoritos a priorizar
             filtered_numbers: Conjunto de números pré-filtrados (opcional)
+            rng: Gerador usado nos sorteios (padrão: o módulo random); com um
+                random.Random semeado a geração é reproduzível
         
         Returns:
             Lista de jogos gerados
         """
+        rng = rng or random
         if not self.stats_manager:
             # Se não houver estatísticas, gera jogos aleatórios
-            return [sorted(random.sample(range(1, 61), 6)) for _ in range(num_games)]
+            return [sorted(rng.sample(self.modality.numbers, self.modality.picks)) for _ in range(num_games)]
         
         games = set()  # Usar set para garantir jogos únicos
         
@@ -185,6 +199,8 @@ class StrategyManager:
             if parity_analysis and 'patterns' in parity_analysis:
                 parity_patterns = list(parity_analysis['patterns'].keys())[:3]
         
+        picks = self.modality.picks
+        
         # Obter distribuição de dezenas alvo
         decade_target = {}
         if self.stats_manager:
@@ -193,10 +209,10 @@ class StrategyManager:
                 total = sum(decade_analysis['decades'].values())
                 for decade, pct in decade_analysis['decades'].items():
                     # Convertemos para número inteiro de 0-2 para cada grupo de dezena
-                    decade_target[decade] = round((pct / total) * 6)
+                    decade_target[decade] = round((pct / total) * picks)
                 
-                # Garantir que a soma seja 6
-                adjustment_needed = 6 - sum(decade_target.values())
+                # Garantir que a soma seja a quantidade de números do jogo
+                adjustment_needed = picks - sum(decade_target.values())
                 if adjustment_needed != 0:
                     # Ajustar os grupos mais frequentes
                     sorted_decades = sorted(decade_target.items(), key=lambda x: (-decade_analysis['decades'][x[0]], x[0]))
@@ -210,9 +226,9 @@ class StrategyManager:
         
         while len(games) < num_games and attempts < max_attempts:
             # Escolher padrão de paridade aleatório
-            pattern = random.choice(parity_patterns)
+            pattern = rng.choice(parity_patterns)
             even_target = int(pattern.split('p-')[0])
-            odd_target = 6 - even_target
+            odd_target = picks - even_target
             
             # Gerar jogo seguindo o padrão e priorizando favoritos
             game = self._generate_single_game(
@@ -220,7 +236,8 @@ class StrategyManager:
                 other_numbers=other_numbers,
                 even_target=even_target,
                 odd_target=odd_target,
-                decade_target=decade_target
+                decade_target=decade_target,
+                rng=rng
             )
             
             if game:
@@ -230,12 +247,71 @@ class StrategyManager:
             
             attempts += 1
         
+        METRICS.count('jogos.gerados', len(games))
         # Converter de volta para lista de listas
         return [list(game) for game in games]
-    
+
+    @timed()
+    def generate_diverse_games(self, num_games: int, favorite_numbers: List[int],
+                               candidate_count: Optional[int] = None, max_overlap: Optional[int] = None,
+                               rng: Optional[random.Random] = None) -> List[List[int]]:
+        """
+        Gera jogos estratégicos e escolhe os que menos se sobrepõem
+
+        Jogos gerados por generate_strategic_games costumam dividir 3 ou 4
+        números entre si; aqui é gerado um conjunto maior de candidatos e a
+        carteira é escolhida por cobertura de pares e trios (ver lottery_portfolio).
+
+        Args:
+            num_games: Quantidade de jogos a gerar
+            favorite_numbers: Lista de números favoritos a priorizar
+            candidate_count: Candidatos gerados (padrão: 20 por jogo)
+            max_overlap: Máximo de números em comum entre dois jogos (opcional)
+            rng: Gerador usado nos sorteios (padrão: o módulo random)
+
+        Returns:
+            Lista de jogos, na ordem em que foram escolhidos
+        """
+        from lottery_portfolio import select_portfolio
+
+        candidates = self.generate_strategic_games(candidate_count or num_games * 20, favorite_numbers, rng=rng)
+        if not candidates:
+            return []
+        portfolio = select_portfolio(candidates, num_games, self.modality.pool_size, max_overlap=max_overlap)
+        return portfolio['games'].tolist()
+
+    @timed()
+    def filter_by_features(self, games: List[List[int]], ranges: Optional[Dict[str, Tuple[int, int]]] = None,
+                           coverage: float = 0.9) -> List[List[int]]:
+        """
+        Mantém os jogos cujas características caem nas faixas do histórico
+
+        As características (soma, consecutivos, primos, linhas do volante...)
+        de todos os jogos são calculadas de uma vez, com as mesmas funções da
+        tabela dos sorteios (ver LotteryStatistics.draw_features).
+
+        Args:
+            games: Jogos a filtrar
+            ranges: Característica -> (mínimo, máximo); padrão: a faixa central
+                de cada característica nos sorteios (LotteryStatistics.feature_ranges)
+            coverage: Fração dos sorteios dentro das faixas padrão
+
+        Returns:
+            Jogos aprovados, na ordem original
+        """
+        if not self.stats_manager or not games:
+            return list(games)
+        from lottery_features import within_ranges
+
+        if ranges is None:
+            ranges = self.stats_manager.feature_ranges(coverage)
+        keep = within_ranges(self.stats_manager.game_features(games), ranges)
+        METRICS.count('jogos.descartados', int(len(keep) - keep.sum()))
+        return [game for game, kept in zip(games, keep) if kept]
+
     def _generate_single_game(self, valid_favorites: Set[int], other_numbers: Set[int],
                              even_target: int, odd_target: int, 
-                             decade_target: Dict[str, int]) -> List[int]:
+                             decade_target: Dict[str, int], rng=random) -> List[int]:
         """
         Gera um único jogo seguindo os critérios de estratégia
         
@@ -245,10 +321,13 @@ class StrategyManager:
             even_target: Quantidade alvo de números pares
             odd_target: Quantidade alvo de números ímpares
             decade_target: Dicionário com quantidade alvo por grupo de dezenas
+            rng: Gerador usado nos embaralhamentos
         
         Returns:
-            Lista de 6 números para o jogo
+            Lista com os números do jogo
         """
+        modality = self.modality
+        picks = modality.picks
         game = []
         even_count = 0
         odd_count = 0
@@ -257,7 +336,7 @@ class StrategyManager:
         # Função auxiliar para verificar se um número pode ser adicionado
         def can_add(num: int) -> bool:
             is_even = num % 2 == 0
-            decade = f"{((num-1)//10)*10+1:02d}-{((num-1)//10+1)*10}"
+            decade = modality.group_label(modality.group_index(num))
             
             if is_even and even_count >= even_target:
                 return False
@@ -269,44 +348,44 @@ class StrategyManager:
         
         # Primeiro, adicionar favoritos que atendem aos critérios
         favorites_list = list(valid_favorites)
-        random.shuffle(favorites_list)
+        rng.shuffle(favorites_list)
         
         for num in favorites_list:
-            if len(game) < 6 and num not in game and can_add(num):
+            if len(game) < picks and num not in game and can_add(num):
                 game.append(num)
                 if num % 2 == 0:
                     even_count += 1
                 else:
                     odd_count += 1
                     
-                decade = f"{((num-1)//10)*10+1:02d}-{((num-1)//10+1)*10}"
+                decade = modality.group_label(modality.group_index(num))
                 if decade in decade_counts:
                     decade_counts[decade] += 1
         
         # Completar com outros números filtrados
         others_list = list(other_numbers)
-        random.shuffle(others_list)
+        rng.shuffle(others_list)
         
         for num in others_list:
-            if len(game) < 6 and num not in game and can_add(num):
+            if len(game) < picks and num not in game and can_add(num):
                 game.append(num)
                 if num % 2 == 0:
                     even_count += 1
                 else:
                     odd_count += 1
                     
-                decade = f"{((num-1)//10)*10+1:02d}-{((num-1)//10+1)*10}"
+                decade = modality.group_label(modality.group_index(num))
                 if decade in decade_counts:
                     decade_counts[decade] += 1
         
-        # Se não conseguiu completar 6 números, preenche aleatoriamente
-        if len(game) < 6:
-            remaining = set(range(1, 61)) - set(game)
+        # Se não conseguiu completar o jogo, preenche aleatoriamente
+        if len(game) < picks:
+            remaining = set(modality.numbers) - set(game)
             remaining_list = list(remaining)
-            random.shuffle(remaining_list)
+            rng.shuffle(remaining_list)
             
             for num in remaining_list:
-                if len(game) < 6 and num not in game:
+                if len(game) < picks and num not in game:
                     game.append(num)
         
-        return sorted(game)
\ No newline at end of file
+        return sorted(game)
@@ -0,0 +1,192 @@
+"""
+DownloadManager contra um servidor local que simula transferências lentas e interrompidas
+
+Cada caminho do servidor é um cenário; o download precisa terminar com um
+arquivo idêntico ao original ou falhar com DownloadError, sem deixar o
+arquivo de destino (nem o .part) pela metade.
+"""
+import gzip
+import os
+import tempfile
+import threading
+import time
+import unittest
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from manager_download import DownloadError, DownloadManager
+
+BODY = bytes(range(256)) * 800  # 200 KiB
+ETAG = '"resultados-v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        scenario = self.path.strip('/')
+        server = self.server
+        with server.lock:
+            server.hits[scenario] += 1
+            hit = server.hits[scenario]
+            server.accept_encoding.append(self.headers.get('Accept-Encoding', ''))
+
+        if scenario == 'ok':
+            self._send_range_aware()
+        elif scenario == 'slow':
+            self._send(200, BODY, pause=0.01, block=8 * 1024)
+        elif scenario == 'truncated':
+            # Primeira resposta cai no meio; as seguintes respeitam o Range
+            if hit == 1:
+                self._send(200, BODY, cut=len(BODY) // 3)
+            else:
+                self._send_range_aware()
+        elif scenario == 'ignore-range':
+            # Cai no meio na primeira vez e depois sempre devolve o arquivo inteiro (200)
+            self._send(200, BODY, cut=len(BODY) // 2 if hit == 1 else None)
+        elif scenario == 'always-truncated':
+            self._send(200, BODY, cut=len(BODY) // 2)
+        elif scenario == 'unavailable':
+            if hit <= 2:
+                self._send(503, b'indisponivel')
+            else:
+                self._send_range_aware()
+        elif scenario == 'gzip':
+            # Comprime quando o cliente aceita gzip; a primeira resposta cai no meio
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = gzip.compress(BODY)
+                self._send(200, body, cut=len(body) // 2 if hit == 1 else None,
+                           extra={'Content-Encoding': 'gzip'})
+            elif hit == 1:
+                self._send(200, BODY, cut=len(BODY) // 2)
+            else:
+                self._send_range_aware()
+        else:
+            self._send(404, b'nao encontrado')
+
+    def _send_range_aware(self):
+        requested = self.headers.get('Range')
+        if requested and self.headers.get('If-Range', ETAG) == ETAG:
+            start = int(requested.split('=')[1].split('-')[0])
+            self._send(206, BODY[start:], extra={
+                'Content-Range': f'bytes {start}-{len(BODY) - 1}/{len(BODY)}'})
+        else:
+            self._send(200, BODY)
+
+    def _send(self, status, body, cut=None, pause=0.0, block=None, extra=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.send_header('Accept-Ranges', 'bytes')
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        if cut is not None:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+
+        payload = body if cut is None else body[:cut]
+        block = block or len(payload) or 1
+        for start in range(0, len(payload), block):
+            self.wfile.write(payload[start:start + block])
+            self.wfile.flush()
+            if pause:
+                time.sleep(pause)
+
+
+class DownloadManagerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}/'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.hits = defaultdict(int)
+        self.server.accept_encoding = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'resultados.xlsx')
+        self.manager = DownloadManager(retries=3, backoff=0, timeout=(5, 5), chunk_size=4096)
+
+    def tearDown(self):
+        self.manager.close()
+        self.directory.cleanup()
+
+    def _download(self, scenario):
+        progress = []
+        self.manager.download(self.base_url + scenario, self.path,
+                              lambda received, total: progress.append((received, total)))
+        return progress
+
+    def _assert_identical(self):
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), BODY)
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    def _assert_failed(self, scenario):
+        with self.assertRaises(DownloadError):
+            self._download(scenario)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    def test_complete(self):
+        progress = self._download('ok')
+        self._assert_identical()
+        self.assertEqual(progress[-1], (len(BODY), len(BODY)))
+
+    def test_slow(self):
+        self._download('slow')
+        self._assert_identical()
+
+    def test_truncated_resumes_with_range(self):
+        progress = self._download('truncated')
+        self._assert_identical()
+        self.assertEqual(self.server.hits['truncated'], 2)
+        # A retomada continua a contagem em vez de recomeçar
+        self.assertTrue(all(a[0] < b[0] for a, b in zip(progress, progress[1:])))
+
+    def test_range_ignored_restarts(self):
+        self._download('ignore-range')
+        self._assert_identical()
+
+    def test_unavailable_then_ok(self):
+        self._download('unavailable')
+        self._assert_identical()
+        self.assertEqual(self.server.hits['unavailable'], 3)
+
+    def test_compressed_transfer_resumes(self):
+        self._download('gzip')
+        self._assert_identical()
+        self.assertTrue(all(value == 'identity' for value in self.server.accept_encoding))
+
+    def test_not_found(self):
+        self._assert_failed('missing')
+        self.assertEqual(self.server.hits['missing'], 1)
+
+    def test_retries_exhausted(self):
+        self._assert_failed('always-truncated')
+        self.assertEqual(self.server.hits['always-truncated'], self.manager.retries + 1)
+
+    def test_keeps_previous_file_on_failure(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'anterior')
+        with self.assertRaises(DownloadError):
+            self._download('missing')
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'anterior')
+
+
+if __name__ == '__main__':
+    unittest.main()